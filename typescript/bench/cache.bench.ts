@@ -0,0 +1,87 @@
+/**
+ * Microbenchmark: createCache insert/get throughput
+ *
+ * Compares the old eviction path, which scanned the whole Map for the oldest
+ * timestamp on every insert into a full cache, with the linked-list engine.
+ * Each size is filled to capacity and then measured on inserts that evict,
+ * on hits, and on a cleanup() pass.
+ *
+ * Run with: npm run bench:cache
+ */
+
+import { createCache } from '../src/utils/cache';
+
+const SIZES = [1_000, 100_000, 1_000_000];
+const OPS = 200_000;
+/** The legacy path is O(n) per evicting insert; cap its total scan work */
+const LEGACY_SCAN_BUDGET = 50_000_000;
+
+interface LegacyEntry<T> { value: T; timestamp: number; expiresAt: number; }
+
+/** The pre-linked-list createCache set/get, kept for comparison */
+function createLegacyCache<T>(maxSize: number, ttl = 5 * 60 * 1000) {
+  const store = new Map<string, LegacyEntry<T>>();
+  const evictOldest = (): void => {
+    let oldestKey: string | null = null;
+    let oldestTime = Infinity;
+    for (const [key, entry] of store) {
+      if (entry.timestamp < oldestTime) { oldestTime = entry.timestamp; oldestKey = key; }
+    }
+    if (oldestKey) store.delete(oldestKey);
+  };
+  return {
+    get(key: string): T | undefined {
+      const entry = store.get(key);
+      if (!entry || Date.now() > entry.expiresAt) return undefined;
+      return entry.value;
+    },
+    set(key: string, value: T): void {
+      while (store.size >= maxSize) evictOldest();
+      const now = Date.now();
+      store.set(key, { value, timestamp: now, expiresAt: now + ttl });
+    }
+  };
+}
+
+let sink: unknown;
+
+function time(ops: number, fn: (i: number) => void): number {
+  const start = process.hrtime.bigint();
+  for (let i = 0; i < ops; i++) fn(i);
+  return Number(process.hrtime.bigint() - start) / ops;
+}
+
+const row = (name: string, ns: number | null): void => {
+  const value = ns === null ? 'skipped'.padStart(10) : `${ns.toFixed(0).padStart(7)} ns/op  ${(1e9 / ns / 1e6).toFixed(2).padStart(7)} Mops/s`;
+  console.log(`  ${name.padEnd(34)} ${value}`);
+};
+
+const keys = (prefix: string, n: number): string[] => Array.from({ length: n }, (_, i) => `${prefix}${i}`);
+
+for (const size of SIZES) {
+  console.log(`\ncreateCache, maxSize ${size.toLocaleString()}\n`);
+  const fill = keys('fill:', size);
+  const fresh = keys('new:', OPS);
+  const absent = keys('absent:', OPS);
+  // After OPS evicting inserts the newest min(size, OPS) fresh keys are resident
+  const resident = Math.min(size, OPS);
+  const hitKeys = Array.from({ length: OPS }, () => fresh[OPS - 1 - Math.floor(Math.random() * resident)]);
+
+  const cache = createCache<number>({ maxSize: size });
+  row('fill to capacity', time(size, i => cache.set(fill[i], i)));
+  row('insert with eviction', time(OPS, i => cache.set(fresh[i], i)));
+  row('get (hits)', time(OPS, i => { sink = cache.get(hitKeys[i]); }));
+  row('get (misses)', time(OPS, i => { sink = cache.get(absent[i]); }));
+  row('cleanup() with nothing expired', time(1000, () => { sink = cache.cleanup(); }));
+  row('stats()', time(1000, () => { sink = cache.stats(); }));
+
+  const legacy = createLegacyCache<number>(size);
+  for (let i = 0; i < size; i++) legacy.set(fill[i], i);
+  const legacyOps = Math.min(OPS, Math.floor(LEGACY_SCAN_BUDGET / size));
+  row('legacy insert with eviction', legacyOps >= 10 ? time(legacyOps, i => legacy.set(fresh[i], i)) : null);
+  const legacyHits = Array.from({ length: OPS }, () => fill[legacyOps + Math.floor(Math.random() * (size - legacyOps))]);
+  row('legacy get (hits)', time(OPS, i => { sink = legacy.get(legacyHits[i]); }));
+}
+
+console.log('');
+void sink;
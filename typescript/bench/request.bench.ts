@@ -0,0 +1,70 @@
+/**
+ * Microbenchmark: request envelope construction
+ *
+ * Compares the old per-call path (URL object, header spreads, body serialized
+ * on every attempt) with precompiled routes, cached headers and a body that is
+ * serialized once and reused across retries. Also compares response cache
+ * keys built with JSON.stringify against the canonical key builder.
+ *
+ * Run with: npm run bench
+ */
+
+import { compileRoute } from '../src/utils/routes';
+import { buildQueryString, encodeBody } from '../src/client/envelope';
+import { requestCacheKey } from '../src/utils/cachekey';
+
+const ITERATIONS = 200_000;
+const ATTEMPTS = 4; // first try + 3 retries
+const BASE_URL = 'https://www.moltbook.com/api/v1';
+const API_KEY = 'moltbook_bench12345678901234567890';
+const CUSTOM_HEADERS = { 'X-Agent': 'bench' };
+const QUERY = { sort: 'new', limit: 25, offset: 50, submolt: 'general', t: undefined };
+const BODY = { submolt: 'general', title: 'Benchmark post', content: 'x'.repeat(4000) };
+
+function bench(name: string, fn: () => void): number {
+  for (let i = 0; i < ITERATIONS / 10; i++) fn();
+  const start = process.hrtime.bigint();
+  for (let i = 0; i < ITERATIONS; i++) fn();
+  const ns = Number(process.hrtime.bigint() - start) / ITERATIONS;
+  console.log(`  ${name.padEnd(36)} ${ns.toFixed(0).padStart(7)} ns/op`);
+  return ns;
+}
+
+let sink: unknown;
+
+function legacyEnvelope(id: string, withBody: boolean): void {
+  const url = new URL(`/posts/${id}`, BASE_URL);
+  Object.entries(QUERY).forEach(([key, value]) => { if (value !== undefined) url.searchParams.append(key, String(value)); });
+  const headers: Record<string, string> = { 'Content-Type': 'application/json', 'User-Agent': 'MoltbookSDK/1.0.0 TypeScript', ...CUSTOM_HEADERS };
+  headers['Authorization'] = `Bearer ${API_KEY}`;
+  const target = url.toString();
+  for (let attempt = 0; attempt < ATTEMPTS; attempt++) sink = [target, headers, withBody ? JSON.stringify(BODY) : undefined];
+}
+
+const POST = compileRoute('/posts/:id');
+const DEFAULT_HEADERS = Object.freeze({ 'Content-Type': 'application/json', 'User-Agent': 'MoltbookSDK/1.0.0 TypeScript', ...CUSTOM_HEADERS, Authorization: `Bearer ${API_KEY}` });
+
+function compiledEnvelope(id: string, withBody: boolean): void {
+  const route = POST(id);
+  const url = BASE_URL + route.path + buildQueryString(QUERY);
+  const body = withBody ? encodeBody(BODY) : undefined;
+  const headers = body ? { ...DEFAULT_HEADERS, 'Content-Length': String(body.byteLength) } : DEFAULT_HEADERS;
+  for (let attempt = 0; attempt < ATTEMPTS; attempt++) sink = [url, headers, body];
+}
+
+console.log(`\nRequest envelope (${ITERATIONS.toLocaleString()} iterations, ${ATTEMPTS} attempts each)\n`);
+const legacyGet = bench('legacy GET', () => legacyEnvelope('abc123', false));
+const compiledGet = bench('compiled GET', () => compiledEnvelope('abc123', false));
+const legacyPost = bench('legacy POST (4 KB body)', () => legacyEnvelope('abc123', true));
+const compiledPost = bench('compiled POST (4 KB body)', () => compiledEnvelope('abc123', true));
+console.log(`\n  GET speedup:  ${(legacyGet / compiledGet).toFixed(2)}x`);
+console.log(`  POST speedup: ${(legacyPost / compiledPost).toFixed(2)}x\n`);
+
+const REORDERED = { submolt: 'general', offset: 50, sort: 'new', limit: 25, t: undefined };
+console.log(`Response cache key (${ITERATIONS.toLocaleString()} iterations)\n`);
+bench('JSON.stringify', () => { sink = `GET:/posts:${JSON.stringify(QUERY)}`; });
+bench('requestCacheKey', () => { sink = requestCacheKey('GET', '/posts', QUERY); });
+bench('requestCacheKey (keys out of order)', () => { sink = requestCacheKey('GET', '/posts', REORDERED); });
+bench('requestCacheKey (hashed)', () => { sink = requestCacheKey('GET', '/posts', QUERY, { hash: true }); });
+console.log('');
+void sink;
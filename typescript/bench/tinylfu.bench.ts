@@ -0,0 +1,94 @@
+/**
+ * Benchmark: hit rate of createTinyLFUCache vs createLRUCache
+ *
+ * Replays access traces against both caches at a few sizes. With no
+ * arguments it uses built-in traces shaped like agent traffic: a skewed
+ * working set of profiles and submolts, the same traffic broken up by
+ * `posts.iterate` crawls, and a plain loop. Recorded traces (one cache key per
+ * line, e.g. collected with a logging middleware) can be passed as arguments.
+ *
+ * Run with: npm run bench:tinylfu [-- trace.txt ...]
+ */
+
+import { readFileSync } from 'node:fs';
+import { basename } from 'node:path';
+import { createLRUCache } from '../src/utils/cache';
+import type { Cache } from '../src/utils/cache';
+import { createTinyLFUCache } from '../src/utils/tinylfu';
+
+const SIZES = [250, 1_000, 4_000];
+const ACCESSES = 500_000;
+const HOT_KEYS = 20_000;
+const CRAWL_EVERY = 25_000;
+const CRAWL_LENGTH = 10_000;
+
+/** Deterministic PRNG so runs are comparable */
+const mulberry32 = (seed: number) => () => {
+  seed = (seed + 0x6d2b79f5) | 0;
+  let t = Math.imul(seed ^ (seed >>> 15), 1 | seed);
+  t = (t + Math.imul(t ^ (t >>> 7), 61 | t)) ^ t;
+  return ((t ^ (t >>> 14)) >>> 0) / 4294967296;
+};
+
+/** Zipf sampler over `n` ranks with exponent `s` */
+const zipf = (n: number, s: number, random: () => number) => {
+  const cdf = new Float64Array(n);
+  let total = 0;
+  for (let i = 0; i < n; i++) cdf[i] = total += 1 / Math.pow(i + 1, s);
+  return (): number => {
+    const target = random() * total;
+    let lo = 0;
+    let hi = n - 1;
+    while (lo < hi) {
+      const mid = (lo + hi) >>> 1;
+      if (cdf[mid] < target) lo = mid + 1; else hi = mid;
+    }
+    return lo;
+  };
+};
+
+const hotKey = (rank: number): string => (rank % 4 === 0 ? `GET:/submolts/s${rank}` : `GET:/agents/profile:a${rank}`);
+
+function workingSet(): string[] {
+  const next = zipf(HOT_KEYS, 0.9, mulberry32(1));
+  return Array.from({ length: ACCESSES }, () => hotKey(next()));
+}
+
+function withCrawls(): string[] {
+  const next = zipf(HOT_KEYS, 0.9, mulberry32(2));
+  const trace: string[] = [];
+  let post = 0;
+  while (trace.length < ACCESSES) {
+    for (let i = 0; i < CRAWL_EVERY; i++) trace.push(hotKey(next()));
+    // A crawl touches every post once, interleaved with the odd profile lookup
+    for (let i = 0; i < CRAWL_LENGTH; i++) trace.push(i % 10 === 0 ? hotKey(next()) : `GET:/posts/p${post++}`);
+  }
+  return trace.slice(0, ACCESSES);
+}
+
+function loop(): string[] {
+  return Array.from({ length: ACCESSES }, (_, i) => `GET:/posts/p${i % 5_000}`);
+}
+
+function hitRate(cache: Cache<true>, trace: string[]): number {
+  for (const key of trace) if (cache.get(key) === undefined) cache.set(key, true);
+  return cache.stats().hitRate;
+}
+
+const traces: Array<[string, string[]]> = process.argv.length > 2
+  ? process.argv.slice(2).map(file => [basename(file), readFileSync(file, 'utf8').split('\n').filter(Boolean)])
+  : [['zipf working set', workingSet()], ['working set + crawls', withCrawls()], ['loop of 5,000', loop()]];
+
+const percent = (rate: number): string => `${(rate * 100).toFixed(1).padStart(5)}%`;
+
+for (const [name, trace] of traces) {
+  console.log(`\n${name} (${trace.length.toLocaleString()} accesses, ${new Set(trace).size.toLocaleString()} keys)\n`);
+  console.log(`  ${'maxSize'.padEnd(10)} ${'LRU'.padStart(8)} ${'TinyLFU'.padStart(8)}`);
+  for (const size of SIZES) {
+    const lru = hitRate(createLRUCache<true>(size), trace);
+    const tinylfu = hitRate(createTinyLFUCache<true>(size), trace);
+    console.log(`  ${size.toLocaleString().padEnd(10)} ${percent(lru).padStart(8)} ${percent(tinylfu).padStart(8)}`);
+  }
+}
+
+console.log('');
@@ -2,13 +2,42 @@
  * HTTP Client for Moltbook API
  */
 
-import { RequestConfig, RateLimitInfo, ApiErrorResponse } from '../types';
-import { MoltbookError, AuthenticationError, RateLimitError, NotFoundError, ValidationError, ForbiddenError, NetworkError } from '../utils/errors';
+import { RequestConfig, RateLimitInfo, ApiErrorResponse, PoolOptions, PoolStats, CoalescingStats, RateLimiterOptions, RateLimiterStats, RequestOptions, RequestLane, SchedulerOptions, SchedulerStats, RetryBudgetOptions, RetryBudgetStats, CircuitBreakerOptions, CircuitStats, HedgingOptions, HedgingStats, RevalidationStats, CompressionOptions, CompressionStats, RouteLatencyStats, TimeoutOptions, Http2Options, Http2Stats } from '../types';
+import { Transport, TransportRequest, PooledTransport, fetchTransport, createPooledTransport } from './transport';
+import { Http2Transport, createHttp2Transport } from './http2';
+import { RequestEnvelope, normalizeBaseUrl, buildQueryString, encodeBody } from './envelope';
+import type { RoutePath } from '../utils/routes';
+import { RateLimiter, createRateLimiter } from '../utils/ratelimit';
+import { Scheduler, createScheduler } from '../utils/scheduler';
+import { RetryBudget, createRetryBudget, decorrelatedJitter } from '../utils/retry';
+import { CircuitBreaker, createCircuitBreaker } from '../utils/breaker';
+import { HedgingPolicy, createHedgingPolicy } from '../utils/hedging';
+import { parseJsonArrayStream } from '../utils/stream';
+import { ResponseCacheOptions, createResponseCache } from '../utils/cache';
+import { Compression, createCompression } from '../utils/compression';
+import { Middleware, MiddlewareManager, SyntheticResponse, createMiddlewareManager, isSyntheticResponse } from '../utils/middleware';
+import { EventEmitter, getGlobalEmitter } from '../utils/events';
+import { LatencyRecorder, createLatencyRecorder } from '../utils/histogram';
+import { Span, Tracer, instrumentResource } from '../utils/tracing';
+import { abortableSleep, createAbortScope, deadlineError, toDeadline } from '../utils/abort';
+import { EVENTS, MAX_RETRY_DELAY, USER_AGENT } from '../utils/constants';
+import { MoltbookError, AuthenticationError, RateLimitError, NotFoundError, ValidationError, ForbiddenError, NetworkError, TimeoutError, CircuitOpenError } from '../utils/errors';
 
 const DEFAULT_BASE_URL = 'https://www.moltbook.com/api/v1';
 const DEFAULT_TIMEOUT = 30000;
 const DEFAULT_RETRIES = 3;
 const DEFAULT_RETRY_DELAY = 1000;
+const NAMED_SEGMENTS = new Set(['me', 'profile', 'register', 'status']);
+
+/** Fallback for raw paths: collapse ids and names so that `/posts/abc/upvote` becomes `/posts/:id/upvote` */
+function routeTemplate(path: string): string {
+  const segments = path.split('/');
+  if (segments[2] && !NAMED_SEGMENTS.has(segments[2])) segments[2] = ':id';
+  return segments.join('/');
+}
+
+type Path = string | RoutePath;
+const pathOf = (path: Path): { path: string; route?: string } => typeof path === 'string' ? { path } : { path: path.path, route: path.template };
 
 export interface HttpClientConfig {
   apiKey?: string;
@@ -17,6 +46,56 @@ export interface HttpClientConfig {
   retries?: number;
   retryDelay?: number;
   headers?: Record<string, string>;
+  /** Keep-alive connection pool; the global fetch is used when omitted */
+  pool?: PoolOptions;
+  /** Multiplex requests over one HTTP/2 session per origin; takes precedence over `pool` */
+  http2?: Http2Options | boolean;
+  /** Custom transport, takes precedence over `http2` and `pool` */
+  transport?: Transport;
+  /** Share one in-flight promise between identical concurrent GETs (default: true) */
+  coalesceRequests?: boolean;
+  /** Queue requests client-side from X-RateLimit headers; false disables (default: enabled) */
+  rateLimit?: RateLimiterOptions | false;
+  /** Concurrency cap and interactive/background lanes */
+  scheduler?: SchedulerOptions;
+  /** Upper bound for a single backoff sleep (ms) */
+  maxRetryDelay?: number;
+  /** Share of recent traffic that may be retries */
+  retryBudget?: RetryBudgetOptions;
+  /** Per-route circuit breaker; false disables */
+  circuitBreaker?: CircuitBreakerOptions | false;
+  /** Send a second attempt for slow GETs; disabled when omitted */
+  hedging?: HedgingOptions;
+  /** Keep GET bodies with their ETag/Last-Modified validators and revalidate them */
+  cache?: ResponseCacheOptions | boolean;
+  /** Per-route compressed/decoded byte accounting and request body compression */
+  compression?: CompressionOptions | boolean;
+  /** Middlewares to install, in order; more can be added with use() */
+  middleware?: Middleware[];
+  /** Receives request:start/end/error, retry and rate:limit events (default: the global emitter) */
+  events?: EventEmitter;
+  /** Record per-route latency histograms, see getRouteMetrics() */
+  metrics?: boolean;
+  /** Record spans for requests, queueing, attempts, backoff and decoding */
+  tracer?: Tracer;
+  /** Per-phase limits for each attempt; `timeout` still bounds the attempt as a whole */
+  timeouts?: TimeoutOptions;
+}
+
+/** Filled in by the attempt loop for the request's end event */
+interface Outcome {
+  status: number;
+  retries: number;
+}
+
+interface CachedResponse {
+  data: unknown;
+  etag: string | null;
+  lastModified: string | null;
+  bytes: number;
+  tags?: readonly string[];
+  /** When the request that fetched or last revalidated the body was sent */
+  storedAt: number;
 }
 
 export class HttpClient {
@@ -25,31 +104,116 @@ export class HttpClient {
   private timeout: number;
   private retries: number;
   private retryDelay: number;
+  private maxRetryDelay: number;
   private customHeaders: Record<string, string>;
+  private defaultHeaders!: Readonly<Record<string, string>>;
   private rateLimitInfo: RateLimitInfo | null = null;
+  private transport: Transport;
+  private pool: PooledTransport | null = null;
+  private h2: Http2Transport | null = null;
+  private coalesceRequests: boolean;
+  private inflight = new Map<string, Promise<unknown>>();
+  private coalesced = 0;
+  private limiter: RateLimiter | null;
+  private scheduler: Scheduler;
+  private retryBudget: RetryBudget;
+  private breaker: CircuitBreaker | null;
+  private hedging: HedgingPolicy | null;
+  private responseCache: ReturnType<typeof createResponseCache> | null;
+  private revalidation = { hits: 0, misses: 0, bytesSaved: 0, invalidated: 0 };
+  private compression: Compression | null;
+  private middleware: MiddlewareManager = createMiddlewareManager();
+  private events: EventEmitter;
+  private latency: LatencyRecorder | null;
+  private tracer: Tracer | null;
+  private timeouts: TimeoutOptions;
 
   constructor(config: HttpClientConfig = {}) {
     this.apiKey = config.apiKey || process.env.MOLTBOOK_API_KEY;
-    this.baseUrl = config.baseUrl || process.env.MOLTBOOK_BASE_URL || DEFAULT_BASE_URL;
+    this.baseUrl = normalizeBaseUrl(config.baseUrl || process.env.MOLTBOOK_BASE_URL || DEFAULT_BASE_URL);
     this.timeout = config.timeout || DEFAULT_TIMEOUT;
     this.retries = config.retries ?? DEFAULT_RETRIES;
     this.retryDelay = config.retryDelay || DEFAULT_RETRY_DELAY;
+    this.maxRetryDelay = config.maxRetryDelay || MAX_RETRY_DELAY;
     this.customHeaders = config.headers || {};
+    this.updateDefaultHeaders();
+    if (!config.transport && config.http2) this.h2 = createHttp2Transport(config.http2 === true ? {} : config.http2);
+    else if (!config.transport && config.pool) this.pool = createPooledTransport(config.pool);
+    this.transport = config.transport || this.h2?.send || this.pool?.send || fetchTransport;
+    this.coalesceRequests = config.coalesceRequests ?? true;
+    this.limiter = config.rateLimit === false ? null : createRateLimiter(config.rateLimit);
+    this.scheduler = createScheduler({ ...config.scheduler, remainingBudget: () => this.remainingBudget() });
+    this.retryBudget = createRetryBudget(config.retryBudget);
+    this.breaker = config.circuitBreaker === false ? null : createCircuitBreaker(config.circuitBreaker);
+    this.hedging = config.hedging ? createHedgingPolicy(config.hedging) : null;
+    this.responseCache = config.cache ? createResponseCache(config.cache === true ? {} : config.cache) : null;
+    this.compression = config.compression ? createCompression(config.compression === true ? {} : config.compression) : null;
+    config.middleware?.forEach(m => this.middleware.use(m));
+    this.events = config.events ?? getGlobalEmitter();
+    this.latency = config.metrics ? createLatencyRecorder() : null;
+    this.tracer = config.tracer ?? null;
+    this.timeouts = config.timeouts ?? {};
   }
 
-  setApiKey(apiKey: string): void { this.apiKey = apiKey; }
+  /** Trace the methods of a resource bound to this client; a no-op without a tracer */
+  instrument(resource: object, name: string): void { if (this.tracer) instrumentResource(resource, name, this.tracer); }
+  /** Install a middleware; returns a function that removes it */
+  use(middleware: Middleware): () => void { return this.middleware.use(middleware); }
+  setApiKey(apiKey: string): void { this.apiKey = apiKey; this.updateDefaultHeaders(); this.responseCache?.cache.clear(); }
+  /** Drop cached GET responses tagged with any of `tags`; resource mutations call this for you */
+  invalidate(tags: readonly string[]): void { this.responseCache?.invalidate(tags); }
   getRateLimitInfo(): RateLimitInfo | null { return this.rateLimitInfo; }
+  getPoolStats(): PoolStats | null { return this.pool?.stats() ?? null; }
+  getHttp2Stats(): Http2Stats | null { return this.h2?.stats() ?? null; }
+  getRateLimiterStats(): RateLimiterStats | null { return this.limiter?.stats() ?? null; }
+  getSchedulerStats(): SchedulerStats { return this.scheduler.stats(); }
+  getRetryBudgetStats(): RetryBudgetStats { return this.retryBudget.stats(); }
+  getCircuitStats(): Record<string, CircuitStats> { return this.breaker?.stats() ?? {}; }
+  getHedgingStats(): HedgingStats | null { return this.hedging?.stats() ?? null; }
+  getRevalidationStats(): RevalidationStats | null {
+    if (!this.responseCache) return null;
+    const { size, bytes = 0, bytesEvicted = 0 } = this.responseCache.cache.stats();
+    return { ...this.revalidation, entries: size, bytes, bytesEvicted };
+  }
+  getCompressionStats(): CompressionStats | null { return this.compression?.stats() ?? null; }
+  getRouteMetrics(): Record<string, RouteLatencyStats> | null { return this.latency?.stats() ?? null; }
+  getCoalescingStats(): CoalescingStats { return { inflight: this.inflight.size, coalesced: this.coalesced }; }
+  close(): void { this.pool?.close(); this.h2?.close(); this.responseCache?.close(); void this.tracer?.flush(); }
+
+  /** Build the shared header set once; requests without extra headers reuse it as-is */
+  private updateDefaultHeaders(): void {
+    const headers: Record<string, string> = { 'Content-Type': 'application/json', 'User-Agent': USER_AGENT, ...this.customHeaders };
+    if (this.apiKey) headers['Authorization'] = `Bearer ${this.apiKey}`;
+    this.defaultHeaders = Object.freeze(headers);
+  }
 
-  private buildHeaders(additionalHeaders?: Record<string, string>): Record<string, string> {
-    const headers: Record<string, string> = { 'Content-Type': 'application/json', 'User-Agent': 'MoltbookSDK/1.0.0 TypeScript', ...this.customHeaders, ...additionalHeaders };
+  private buildHeaders(additionalHeaders?: Record<string, string>, contentLength?: number): Readonly<Record<string, string>> {
+    if (!additionalHeaders && contentLength === undefined) return this.defaultHeaders;
+    const headers: Record<string, string> = { ...this.defaultHeaders, ...additionalHeaders };
+    if (contentLength !== undefined) headers['Content-Length'] = String(contentLength);
     if (this.apiKey) headers['Authorization'] = `Bearer ${this.apiKey}`;
     return headers;
   }
 
   private buildUrl(path: string, query?: Record<string, string | number | undefined>): string {
-    const url = new URL(path, this.baseUrl);
-    if (query) Object.entries(query).forEach(([key, value]) => { if (value !== undefined) url.searchParams.append(key, String(value)); });
-    return url.toString();
+    return this.baseUrl + path + buildQueryString(query);
+  }
+
+  private compile(config: RequestConfig, resend = false): RequestEnvelope {
+    let body = encodeBody(config.body);
+    let headers = config.headers;
+    const route = `${config.method} ${config.route ?? routeTemplate(config.path)}`;
+    if (body && this.compression) {
+      const encoded = this.compression.encodeRequest(route, body, resend);
+      body = encoded.body;
+      if (encoded.encoding) headers = { ...headers, 'Content-Encoding': encoded.encoding };
+    }
+    return {
+      url: this.buildUrl(config.path, config.query),
+      route,
+      headers: this.buildHeaders(headers, body?.byteLength),
+      ...(body && { body })
+    };
   }
 
   private parseRateLimitHeaders(headers: Headers): void {
@@ -58,9 +222,17 @@ export class HttpClient {
     const reset = headers.get('X-RateLimit-Reset');
     if (limit && remaining && reset) {
       this.rateLimitInfo = { limit: parseInt(limit, 10), remaining: parseInt(remaining, 10), resetAt: new Date(parseInt(reset, 10) * 1000) };
+      const date = headers.get('Date');
+      this.limiter?.update(this.rateLimitInfo, date ? new Date(date) : null);
     }
   }
 
+  private remainingBudget(): number | null {
+    const stats = this.limiter?.stats();
+    if (!stats || stats.limit === null || stats.tokens === null || stats.limit === 0) return null;
+    return stats.tokens / stats.limit;
+  }
+
   private async handleErrorResponse(response: Response): Promise<never> {
     let errorData: ApiErrorResponse;
     try { errorData = await response.json(); } catch { errorData = { success: false, error: `HTTP ${response.status}: ${response.statusText}` }; }
@@ -76,44 +248,285 @@ export class HttpClient {
     }
   }
 
+  private isServerFailure(error: unknown): boolean {
+    return error instanceof NetworkError || error instanceof TimeoutError || (error instanceof MoltbookError && error.statusCode >= 500);
+  }
+
   private shouldRetry(error: unknown, attempt: number): boolean {
     if (attempt >= this.retries) return false;
     if (error instanceof MoltbookError && error.statusCode >= 400 && error.statusCode < 500) return error instanceof RateLimitError;
-    return error instanceof NetworkError || (error instanceof MoltbookError && error.statusCode >= 500);
+    return (error instanceof NetworkError || (error instanceof MoltbookError && error.statusCode >= 500)) && this.retryBudget.tryRetry();
   }
 
-  private getRetryDelay(attempt: number, error?: unknown): number {
+  private getRetryDelay(previous: number, error?: unknown): number {
     if (error instanceof RateLimitError) return error.retryAfter * 1000;
-    return this.retryDelay * Math.pow(2, attempt);
+    return decorrelatedJitter(this.retryDelay, previous, this.maxRetryDelay);
+  }
+
+  /** Take a scheduler slot and a rate-limit token for an extra attempt, or null if either would mean queueing */
+  private trySpare(lane: RequestLane): (() => void) | null {
+    const release = this.scheduler.tryAcquire(lane);
+    if (!release) return null;
+    if (this.limiter && !this.limiter.tryAcquire()) { release(); return null; }
+    return () => { this.limiter?.release(); release(); };
+  }
+
+  /** Send one attempt, racing a hedged copy of slow GETs and aborting the loser */
+  private dispatch(route: string, lane: RequestLane, url: string, init: TransportRequest): Promise<Response> {
+    const hedging = this.hedging;
+    const delay = hedging && init.method === 'GET' ? hedging.delayFor(route) : null;
+    const started = Date.now();
+    if (!hedging || delay === null) {
+      return this.transport(url, init).then(response => { hedging?.record(route, Date.now() - started); return response; });
+    }
+    const primary = new AbortController();
+    const secondary = new AbortController();
+    const forward = (): void => { primary.abort(init.signal!.reason); secondary.abort(init.signal!.reason); };
+    // Kept for the whole attempt: the winner's body is still read under the attempt's timers after
+    // this resolves. The attempt signal is dropped with its scope, so the listener goes with it
+    init.signal?.addEventListener('abort', forward, { once: true });
+    return new Promise<Response>((resolve, reject) => {
+      let settled = false;
+      let pending = 1;
+      const onResponse = (winner: AbortController, loser: AbortController) => (response: Response): void => {
+        if (settled) { response.body?.cancel().catch(() => {}); return; }
+        settled = true;
+        clearTimeout(timer);
+        loser.abort();
+        hedging.record(route, Date.now() - started);
+        if (winner === secondary) hedging.won();
+        resolve(response);
+      };
+      const onError = (error: unknown): void => {
+        if (--pending > 0 || settled) return;
+        clearTimeout(timer);
+        reject(error);
+      };
+      this.transport(url, { ...init, signal: primary.signal }).then(onResponse(primary, secondary), onError);
+      const timer = setTimeout(() => {
+        if (settled) return;
+        // The hedge is a real request: it takes its own slot and token, held until it settles
+        const release = this.trySpare(lane);
+        if (!release) return;
+        if (!hedging.tryHedge()) { release(); return; }
+        pending++;
+        this.transport(url, { ...init, signal: secondary.signal }).finally(release).then(onResponse(secondary, primary), onError);
+      }, delay);
+    });
+  }
+
+  /** Conditional GET: send the stored validators and serve the stored body on 304 */
+  private async decodeCacheable(response: Response, key: string, cached: CachedResponse | undefined, config: RequestConfig, storedAt: number): Promise<unknown> {
+    if (response.status === 304 && cached) {
+      this.revalidation.hits++;
+      this.revalidation.bytesSaved += cached.bytes;
+      this.responseCache!.cache.set(key, { ...cached, storedAt });
+      return cached.data;
+    }
+    const text = await response.text();
+    const data = text ? JSON.parse(text) : undefined;
+    const etag = response.headers.get('ETag');
+    const lastModified = response.headers.get('Last-Modified');
+    this.revalidation.misses++;
+    if (etag || lastModified) {
+      const tags = typeof config.tags === 'function' ? config.tags(data) : config.tags;
+      this.responseCache!.cache.set(key, { data, etag, lastModified, bytes: Buffer.byteLength(text), tags, storedAt });
+    }
+    else if (cached) this.responseCache!.cache.delete(key);
+    return data;
+  }
+
+  request<T>(config: RequestConfig): Promise<T> {
+    return this.middleware.size() === 0 ? this.execute<T>(config) : this.intercept<T>(config);
+  }
+
+  /** Run the request chain, send (or short-circuit) what it prepared, then the response chain; any throw goes through the error chain */
+  private async intercept<T>(original: RequestConfig): Promise<T> {
+    let config = original;
+    try {
+      const chained = this.middleware.runRequest(original);
+      // Only a chain with an async interceptor costs an extra await
+      const prepared = chained instanceof Promise ? await chained : chained;
+      if (isSyntheticResponse(prepared)) return await this.middleware.runResponse(prepared.data as T, config);
+      config = prepared;
+      const data = await this.execute<T>(config);
+      return await this.middleware.runResponse(data, config);
+    } catch (error) {
+      throw error instanceof Error ? await this.middleware.runError(error, config) : error;
+    }
+  }
+
+  private async execute<T>(config: RequestConfig): Promise<T> {
+    let decode: ((response: Response) => Promise<T>) | undefined;
+    if (this.responseCache && config.method === 'GET' && this.responseCache.shouldCache('GET', config.path)) {
+      const key = this.responseCache.getCacheKey('GET', config.path, config.query);
+      const storedAt = Date.now();
+      let cached = this.responseCache.cache.get(key) as CachedResponse | undefined;
+      // A mutation since the body was fetched may not have changed a second-granular Last-Modified yet
+      if (cached && this.responseCache.isStale(cached.storedAt, cached.tags)) {
+        this.responseCache.cache.delete(key);
+        this.revalidation.invalidated++;
+        cached = undefined;
+      }
+      if (cached) {
+        const validators: Record<string, string> = {};
+        if (cached.etag) validators['If-None-Match'] = cached.etag;
+        if (cached.lastModified) validators['If-Modified-Since'] = cached.lastModified;
+        config = { ...config, headers: { ...config.headers, ...validators } };
+      }
+      decode = response => this.decodeCacheable(response, key, cached, config, storedAt) as Promise<T>;
+    }
+    const envelope = this.compile(config);
+    // Calls with their own signal or deadline must not share another caller's fate
+    if (config.method !== 'GET' || !this.coalesceRequests || config.signal || config.deadline !== undefined) return this.send<T>(config, envelope, decode);
+    const key = `${envelope.url} ${envelope.headers['Authorization'] ?? ''}`;
+    const pending = this.inflight.get(key);
+    if (pending) { this.coalesced++; return pending as Promise<T>; }
+    const promise = this.send<T>(config, envelope, decode).finally(() => this.inflight.delete(key));
+    this.inflight.set(key, promise);
+    return promise;
   }
 
-  private sleep(ms: number): Promise<void> { return new Promise(resolve => setTimeout(resolve, ms)); }
+  /** Stream the elements of a list response's `data` array as they are decoded */
+  async *stream<T>(path: Path, query?: Record<string, string | number | undefined>, options: RequestOptions = {}): AsyncGenerator<T, void, unknown> {
+    const config: RequestConfig = { method: 'GET', ...pathOf(path), query, ...options };
+    const response = await this.send<Response>(config, this.compile(config), async r => r);
+    // The body outlives send() and its attempt timers, so cancellation, the deadline and the timeouts are re-applied while it is read
+    const scope = createAbortScope(options.signal, toDeadline(options.deadline));
+    try {
+      scope.after(this.timeout, () => new TimeoutError(undefined, this.timeout));
+      if (this.timeouts.body) scope.after(this.timeouts.body, () => new TimeoutError('Response body took too long', this.timeouts.body));
+      if (response.body) yield* parseJsonArrayStream<T>(response.body, 'data', scope.signal);
+    } finally {
+      scope.dispose();
+    }
+  }
+
+  /** Run a request through its attempts, reporting start/end/error events and latency */
+  private async send<T>(config: RequestConfig, envelope: RequestEnvelope, decode: (response: Response) => Promise<T> = r => r.json() as Promise<T>): Promise<T> {
+    const { route } = envelope;
+    const { method, path } = config;
+    const outcome: Outcome = { status: 0, retries: 0 };
+    const started = performance.now();
+    const span = this.tracer?.startSpan(route, { kind: 'client', attributes: { 'http.request.method': method, 'url.template': route.slice(method.length + 1), 'url.full': envelope.url } });
+    this.events.emit(EVENTS.REQUEST_START, { method, path, route, timestamp: Date.now() });
+    try {
+      const data = await (span ? this.tracer!.withSpan(span, () => this.attempt(config, envelope, decode, outcome)) : this.attempt(config, envelope, decode, outcome));
+      const event = { method, path, route, duration: performance.now() - started, status: outcome.status, retries: outcome.retries };
+      this.latency?.end(event);
+      this.events.emit(EVENTS.REQUEST_END, event);
+      return data;
+    } catch (error) {
+      span?.recordError(error);
+      const event = { method, path, route, error: error as Error, duration: performance.now() - started, retries: outcome.retries };
+      this.latency?.error(event);
+      this.events.emit(EVENTS.REQUEST_ERROR, event);
+      if (error instanceof AuthenticationError) this.events.emit(EVENTS.AUTH_ERROR, { message: error.message });
+      throw error;
+    } finally {
+      span?.setAttribute('http.response.status_code', outcome.status || undefined);
+      span?.setAttribute('moltbook.retries', outcome.retries);
+      span?.end();
+    }
+  }
+
+  /** Child span of the active request span, or null when tracing is off */
+  private child(name: string, attributes?: Record<string, string | number>): Span | null {
+    return this.tracer?.startSpan(name, { attributes }) ?? null;
+  }
 
-  async request<T>(config: RequestConfig): Promise<T> {
-    const url = this.buildUrl(config.path, config.query);
-    const headers = this.buildHeaders(config.headers);
+  private async attempt<T>(config: RequestConfig, envelope: RequestEnvelope, decode: (response: Response) => Promise<T>, outcome: Outcome): Promise<T> {
+    const { url, route } = envelope;
+    let { headers, body } = envelope;
     let lastError: unknown;
-    for (let attempt = 0; attempt <= this.retries; attempt++) {
-      try {
-        const controller = new AbortController();
-        const timeoutId = setTimeout(() => controller.abort(), this.timeout);
-        const response = await fetch(url, { method: config.method, headers, body: config.body ? JSON.stringify(config.body) : undefined, signal: controller.signal });
-        clearTimeout(timeoutId);
-        this.parseRateLimitHeaders(response.headers);
-        if (!response.ok) await this.handleErrorResponse(response);
-        return await response.json() as T;
-      } catch (error) {
-        lastError = error;
-        if (error instanceof TypeError && error.message.includes('fetch')) lastError = new NetworkError('Network request failed');
-        if (!this.shouldRetry(lastError, attempt)) throw lastError;
-        await this.sleep(this.getRetryDelay(attempt, lastError));
+    let delay = this.retryDelay;
+    const deadline = toDeadline(config.deadline);
+    // Caller cancellation and the deadline cover queueing, every attempt and every backoff sleep
+    const call = config.signal || deadline !== undefined ? createAbortScope(config.signal, deadline) : null;
+    this.retryBudget.recordRequest();
+    try {
+      for (let attempt = 0; attempt <= this.retries; attempt++) {
+        if (call?.signal.aborted) throw call.signal.reason;
+        if (this.breaker && !this.breaker.allow(route)) throw new CircuitOpenError(route, this.breaker.retryIn(route));
+        const queued = this.child('queue', { 'moltbook.lane': config.lane ?? 'interactive' });
+        let release: () => void;
+        try {
+          release = await this.scheduler.acquire(config.lane ?? 'interactive', route, call?.signal);
+          try { await this.limiter?.acquire(call?.signal); } catch (error) { release(); throw error; }
+        } catch (error) {
+          queued?.recordError(error);
+          throw error;
+        } finally {
+          queued?.end();
+        }
+        const network = this.child('attempt', { 'moltbook.attempt': attempt + 1 });
+        const scope = createAbortScope(call?.signal);
+        try {
+          scope.after(this.timeout, () => new TimeoutError(undefined, this.timeout));
+          const firstByte = this.timeouts.firstByte;
+          const headersArrived = firstByte ? scope.after(firstByte, () => new TimeoutError('No response headers in time', firstByte)) : undefined;
+          let wireBytes: number | null = null;
+          const onBodyBytes = this.compression ? (bytes: number) => { wireBytes = bytes; } : undefined;
+          let response = await this.dispatch(route, config.lane ?? 'interactive', url, { method: config.method, headers, body, signal: scope.signal, onBodyBytes, connectTimeout: this.timeouts.connect }).finally(() => this.limiter?.release());
+          headersArrived?.();
+          if (this.timeouts.body) scope.after(this.timeouts.body, () => new TimeoutError('Response body took too long', this.timeouts.body));
+          outcome.status = response.status;
+          network?.setAttribute('http.response.status_code', response.status);
+          network?.end();
+          this.parseRateLimitHeaders(response.headers);
+          if (this.compression) {
+            this.compression.observe(response.headers);
+            response = this.compression.measure(route, response, () => wireBytes);
+          }
+          if (!response.ok && response.status !== 304) await this.handleErrorResponse(response);
+          const decoding = this.child('decode');
+          const data = await decode(response).finally(() => decoding?.end());
+          this.breaker?.success(route);
+          return data;
+        } catch (error) {
+          network?.recordError(error);
+          network?.end();
+          // A cancelled call or a passed deadline ends the whole call, not just this attempt
+          if (call?.signal.aborted) throw call.signal.reason;
+          lastError = scope.signal.aborted ? scope.signal.reason : error;
+          if (error instanceof TypeError && error.message.includes('fetch')) lastError = new NetworkError('Network request failed');
+          if (this.isServerFailure(lastError)) this.breaker?.failure(route); else this.breaker?.success(route);
+          if (lastError instanceof RateLimitError) {
+            this.limiter?.block(lastError.retryAfter * 1000);
+            this.events.emit(EVENTS.RATE_LIMIT, { limit: this.rateLimitInfo?.limit ?? 0, remaining: 0, resetAt: new Date(Date.now() + lastError.retryAfter * 1000) });
+          }
+          if (lastError instanceof MoltbookError && lastError.statusCode === 415 && headers['Content-Encoding']) {
+            // The server refused the encoded body: resend it as plain JSON without spending an attempt
+            this.compression!.disable();
+            ({ headers, body } = this.compile(config, true));
+            release();
+            attempt--;
+            continue;
+          }
+          if (!this.shouldRetry(lastError, attempt)) throw lastError;
+          release();
+          delay = this.getRetryDelay(delay, lastError);
+          // No point sleeping past the deadline only to fail afterwards
+          if (deadline !== undefined && Date.now() + delay >= deadline) throw deadlineError();
+          outcome.retries++;
+          const retry = { route, attempt: attempt + 1, maxAttempts: this.retries, delay, error: lastError as Error };
+          this.latency?.retry(retry);
+          this.events.emit(EVENTS.RETRY, retry);
+          const backoff = this.child('backoff', { 'moltbook.delay_ms': delay });
+          await abortableSleep(delay, call?.signal).finally(() => backoff?.end());
+        } finally {
+          scope.dispose();
+          release();
+        }
       }
+      throw lastError;
+    } finally {
+      call?.dispose();
     }
-    throw lastError;
   }
 
-  async get<T>(path: string, query?: Record<string, string | number | undefined>): Promise<T> { return this.request<T>({ method: 'GET', path, query }); }
-  async post<T>(path: string, body?: unknown): Promise<T> { return this.request<T>({ method: 'POST', path, body }); }
-  async patch<T>(path: string, body?: unknown): Promise<T> { return this.request<T>({ method: 'PATCH', path, body }); }
-  async delete<T>(path: string): Promise<T> { return this.request<T>({ method: 'DELETE', path }); }
+  async get<T>(path: Path, query?: Record<string, string | number | undefined>, options: RequestOptions = {}): Promise<T> { return this.request<T>({ method: 'GET', ...pathOf(path), query, ...options }); }
+  async post<T>(path: Path, body?: unknown, options: RequestOptions = {}): Promise<T> { return this.request<T>({ method: 'POST', ...pathOf(path), body, ...options }); }
+  async patch<T>(path: Path, body?: unknown, options: RequestOptions = {}): Promise<T> { return this.request<T>({ method: 'PATCH', ...pathOf(path), body, ...options }); }
+  async delete<T>(path: Path, options: RequestOptions = {}): Promise<T> { return this.request<T>({ method: 'DELETE', ...pathOf(path), ...options }); }
 }
@@ -5,7 +5,10 @@
 import { HttpClient, HttpClientConfig } from './HttpClient';
 import { Agents, Posts, Comments, Submolts, Feed, Search } from '../resources';
 import { ConfigurationError } from '../utils/errors';
-import type { MoltbookClientConfig, RateLimitInfo } from '../types';
+import { createVoteQueue, VoteQueue } from '../utils/votes';
+import { openOutbox, Outbox } from '../utils/outbox';
+import type { Middleware } from '../utils/middleware';
+import type { MoltbookClientConfig, RateLimitInfo, PoolStats, CoalescingStats, RateLimiterStats, SchedulerStats, RetryBudgetStats, CircuitStats, HedgingStats, RevalidationStats, CompressionStats, RouteLatencyStats, Http2Stats, OutboxOptions } from '../types';
 
 export class MoltbookClient {
   private httpClient: HttpClient;
@@ -15,16 +18,22 @@ export class MoltbookClient {
   readonly submolts: Submolts;
   readonly feed: Feed;
   readonly search: Search;
+  /** Collapses bursts of votes on the same post or comment into their net effect */
+  readonly votes: VoteQueue;
 
   constructor(config: MoltbookClientConfig = {}) {
     this.validateConfig(config);
-    this.httpClient = new HttpClient({ apiKey: config.apiKey, baseUrl: config.baseUrl, timeout: config.timeout, retries: config.retries, retryDelay: config.retryDelay, headers: config.headers });
-    this.agents = new Agents(this.httpClient);
-    this.posts = new Posts(this.httpClient);
-    this.comments = new Comments(this.httpClient);
-    this.submolts = new Submolts(this.httpClient);
+    this.httpClient = new HttpClient({ apiKey: config.apiKey, baseUrl: config.baseUrl, timeout: config.timeout, retries: config.retries, retryDelay: config.retryDelay, headers: config.headers, pool: config.pool, http2: config.http2, coalesceRequests: config.coalesceRequests, rateLimit: config.rateLimit, scheduler: config.scheduler, maxRetryDelay: config.maxRetryDelay, retryBudget: config.retryBudget, circuitBreaker: config.circuitBreaker, hedging: config.hedging, cache: config.cache, compression: config.compression, middleware: config.middleware, events: config.events, metrics: config.metrics, tracer: config.tracer, timeouts: config.timeouts });
+    this.agents = new Agents(this.httpClient, config.loaders);
+    this.posts = new Posts(this.httpClient, config.loaders);
+    this.comments = new Comments(this.httpClient, config.loaders);
+    this.submolts = new Submolts(this.httpClient, config.loaders);
     this.feed = new Feed(this.httpClient);
     this.search = new Search(this.httpClient);
+    this.votes = createVoteQueue((target, id, direction) => {
+      const resource = target === 'post' ? this.posts : this.comments;
+      return direction === 'up' ? resource.upvote(id, { lane: 'background' }) : resource.downvote(id, { lane: 'background' });
+    }, config.votes);
   }
 
   private validateConfig(config: MoltbookClientConfig): void {
@@ -34,16 +43,45 @@ export class MoltbookClient {
     }
     if (config.timeout !== undefined && (typeof config.timeout !== 'number' || config.timeout <= 0)) throw new ConfigurationError('timeout must be a positive number');
     if (config.retries !== undefined && (typeof config.retries !== 'number' || config.retries < 0)) throw new ConfigurationError('retries must be a non-negative number');
+    if (config.scheduler?.maxConcurrent !== undefined && (typeof config.scheduler.maxConcurrent !== 'number' || config.scheduler.maxConcurrent < 1)) throw new ConfigurationError('scheduler.maxConcurrent must be at least 1');
+    if (config.pool?.maxConnections !== undefined && (typeof config.pool.maxConnections !== 'number' || config.pool.maxConnections < 1)) throw new ConfigurationError('pool.maxConnections must be at least 1');
   }
 
+  /** Install a request/response middleware; returns a function that removes it */
+  use(middleware: Middleware): () => void { return this.httpClient.use(middleware); }
+
   setApiKey(apiKey: string): void {
     if (!apiKey.startsWith('moltbook_')) throw new ConfigurationError('apiKey must start with "moltbook_"');
     this.httpClient.setApiKey(apiKey);
+    // Loaded entities carry per-agent fields such as isFollowing and isSubscribed
+    for (const resource of [this.agents, this.posts, this.comments, this.submolts]) resource.loader.clearAll();
   }
 
+  /** Drop cached GET responses tagged with any of `tags`, e.g. after a write made outside the resources */
+  invalidate(tags: readonly string[]): void { this.httpClient.invalidate(tags); }
+
   getRateLimitInfo(): RateLimitInfo | null { return this.httpClient.getRateLimitInfo(); }
   getRateLimitRemaining(): number | null { return this.httpClient.getRateLimitInfo()?.remaining ?? null; }
   getRateLimitReset(): Date | null { return this.httpClient.getRateLimitInfo()?.resetAt ?? null; }
+  getRateLimiterStats(): RateLimiterStats | null { return this.httpClient.getRateLimiterStats(); }
+  getSchedulerStats(): SchedulerStats { return this.httpClient.getSchedulerStats(); }
+  getRetryBudgetStats(): RetryBudgetStats { return this.httpClient.getRetryBudgetStats(); }
+  getCircuitStats(): Record<string, CircuitStats> { return this.httpClient.getCircuitStats(); }
+  getHedgingStats(): HedgingStats | null { return this.httpClient.getHedgingStats(); }
+  getRevalidationStats(): RevalidationStats | null { return this.httpClient.getRevalidationStats(); }
+  getCompressionStats(): CompressionStats | null { return this.httpClient.getCompressionStats(); }
+  getRouteMetrics(): Record<string, RouteLatencyStats> | null { return this.httpClient.getRouteMetrics(); }
+  /**
+   * Open a durable outbox for `posts.create` / `comments.create`: writes are
+   * journaled to `options.path` before they are sent and replayed after a crash.
+   */
+  async openOutbox(options: Omit<OutboxOptions, 'rateLimit'>): Promise<Outbox> {
+    return openOutbox(write => write.kind === 'post' ? this.posts.create(write.data, { lane: 'background' }) : this.comments.create(write.data, { lane: 'background' }), { ...options, rateLimit: () => this.httpClient.getRateLimitInfo() });
+  }
+  getPoolStats(): PoolStats | null { return this.httpClient.getPoolStats(); }
+  getHttp2Stats(): Http2Stats | null { return this.httpClient.getHttp2Stats(); }
+  getCoalescingStats(): CoalescingStats { return this.httpClient.getCoalescingStats(); }
+  close(): void { this.httpClient.close(); }
   isRateLimited(): boolean { const remaining = this.getRateLimitRemaining(); return remaining !== null && remaining <= 0; }
   async createPost(data: { submolt: string; title: string; content?: string; url?: string; }) { return this.posts.create(data); }
   async createComment(data: { postId: string; content: string; parentId?: string; }) { return this.comments.create(data); }
@@ -0,0 +1,35 @@
+/**
+ * Compiled request envelopes for Moltbook API
+ */
+
+export interface RequestEnvelope {
+  url: string;
+  /** Route template used for scheduling, breakers and metrics, e.g. `GET /posts/:id` */
+  route: string;
+  headers: Readonly<Record<string, string>>;
+  /** Serialized once and reused by every retry */
+  body?: Uint8Array;
+}
+
+const encoder = new TextEncoder();
+
+/** Strip trailing slashes so paths can be appended by plain concatenation */
+export function normalizeBaseUrl(baseUrl: string): string {
+  return baseUrl.replace(/\/+$/, '');
+}
+
+/** Build `?a=1&b=2` without going through URL/URLSearchParams; undefined values are skipped */
+export function buildQueryString(query?: Record<string, string | number | undefined>): string {
+  if (!query) return '';
+  let result = '';
+  for (const key in query) {
+    const value = query[key];
+    if (value === undefined) continue;
+    result += (result ? '&' : '?') + encodeURIComponent(key) + '=' + encodeURIComponent(value);
+  }
+  return result;
+}
+
+export function encodeBody(body: unknown): Uint8Array | undefined {
+  return body === undefined ? undefined : encoder.encode(JSON.stringify(body));
+}
@@ -0,0 +1,209 @@
+/**
+ * HTTP/2 transport for Moltbook API
+ */
+
+import * as http2 from 'node:http2';
+import { Readable, pipeline } from 'node:stream';
+import type { Http2Options, Http2Stats } from '../types';
+import type { Transport, TransportRequest } from './transport';
+import { createDecoder } from '../utils/compression';
+import { TimeoutError } from '../utils/errors';
+
+export interface Http2Transport {
+  send: Transport;
+  stats(): Http2Stats;
+  close(): void;
+}
+
+const DEFAULT_SESSION_IDLE_TIMEOUT = 30000;
+const DEFAULT_CONNECT_TIMEOUT = 10000;
+const ACCEPT_ENCODING = 'gzip, deflate, br';
+/** Connection-specific headers are illegal in HTTP/2 (RFC 9113 §8.2.2) */
+const FORBIDDEN_HEADERS = new Set(['connection', 'keep-alive', 'proxy-connection', 'transfer-encoding', 'upgrade', 'host']);
+const { NGHTTP2_REFUSED_STREAM, NGHTTP2_CANCEL } = http2.constants;
+
+interface Session {
+  session: http2.ClientHttp2Session;
+  origin: string;
+  active: number;
+  /** Set once the peer sent GOAWAY; no new streams go to this session */
+  draining: boolean;
+}
+
+type Waiter = () => void;
+
+const toHeaders = (raw: http2.IncomingHttpHeaders): Headers => {
+  const headers = new Headers();
+  for (const [key, value] of Object.entries(raw)) {
+    if (key.startsWith(':')) continue;
+    if (Array.isArray(value)) value.forEach(v => headers.append(key, v));
+    else if (value !== undefined) headers.set(key, String(value));
+  }
+  return headers;
+};
+
+const abortError = (signal: AbortSignal): unknown => signal.reason ?? Object.assign(new Error('This operation was aborted'), { name: 'AbortError' });
+
+/**
+ * Multiplexes every request to an origin over one HTTP/2 session. `https:`
+ * origins negotiate h2 via ALPN, `http:` origins speak h2c with prior
+ * knowledge. A GOAWAY retires the session: in-flight streams finish, new
+ * ones open a fresh session, and streams the server refused are replayed.
+ */
+export function createHttp2Transport(options: Http2Options = {}): Http2Transport {
+  const { sessionIdleTimeout = DEFAULT_SESSION_IDLE_TIMEOUT, connectTimeout = DEFAULT_CONNECT_TIMEOUT, maxConcurrentStreams } = options;
+  const sessions = new Map<string, Session>();
+  const waiters = new Map<string, Waiter[]>();
+  const counters = { sessionsOpened: 0, streamsOpened: 0, peakStreams: 0, goaways: 0, refusedRetries: 0, resets: 0 };
+  let activeStreams = 0;
+
+  const retire = (entry: Session): void => {
+    entry.draining = true;
+    if (sessions.get(entry.origin) === entry) sessions.delete(entry.origin);
+    // Anyone queued for this session's stream slots moves to a new session
+    const queued = waiters.get(entry.origin);
+    if (queued) { waiters.delete(entry.origin); queued.forEach(wake => wake()); }
+  };
+
+  const connect = (origin: string, timeout: number): Session => {
+    const session = http2.connect(origin);
+    const entry: Session = { session, origin, active: 0, draining: false };
+    counters.sessionsOpened++;
+    const connectTimer = setTimeout(() => session.destroy(new TimeoutError('Connection timed out', timeout)), timeout);
+    session.once('connect', () => clearTimeout(connectTimer));
+    session.once('close', () => clearTimeout(connectTimer));
+    session.setTimeout(sessionIdleTimeout, () => { if (entry.active === 0) session.close(); });
+    session.on('goaway', () => { counters.goaways++; retire(entry); });
+    session.on('close', () => retire(entry));
+    session.on('error', () => retire(entry));
+    session.unref();
+    sessions.set(origin, entry);
+    return entry;
+  };
+
+  const streamLimit = (entry: Session): number =>
+    Math.min(maxConcurrentStreams ?? Infinity, entry.session.remoteSettings?.maxConcurrentStreams ?? Infinity);
+
+  /** Reserve a stream slot on a live session, waiting for one when the stream limit is reached */
+  const acquire = async (origin: string, init: TransportRequest): Promise<Session> => {
+    const signal = init.signal;
+    while (true) {
+      if (signal?.aborted) throw abortError(signal);
+      const entry = sessions.get(origin) ?? connect(origin, init.connectTimeout ?? connectTimeout);
+      if (entry.active < streamLimit(entry)) {
+        entry.active++;
+        activeStreams++;
+        entry.session.ref();
+        counters.peakStreams = Math.max(counters.peakStreams, entry.active);
+        return entry;
+      }
+      await new Promise<void>((resolve, reject) => {
+        const queue = waiters.get(origin) ?? [];
+        const onAbort = (): void => {
+          const index = queue.indexOf(wake);
+          if (index !== -1) queue.splice(index, 1);
+          reject(abortError(signal!));
+        };
+        const wake: Waiter = () => { signal?.removeEventListener('abort', onAbort); resolve(); };
+        signal?.addEventListener('abort', onAbort, { once: true });
+        queue.push(wake);
+        waiters.set(origin, queue);
+      });
+    }
+  };
+
+  const releaseStream = (entry: Session): void => {
+    entry.active--;
+    activeStreams--;
+    if (entry.active === 0) entry.session.unref();
+    const queue = waiters.get(entry.origin);
+    const next = queue?.shift();
+    if (queue && queue.length === 0) waiters.delete(entry.origin);
+    next?.();
+  };
+
+  const requestHeaders = (url: URL, init: TransportRequest): http2.OutgoingHttpHeaders => {
+    const headers: http2.OutgoingHttpHeaders = { ':method': init.method, ':path': url.pathname + url.search, 'accept-encoding': ACCEPT_ENCODING };
+    for (const [key, value] of Object.entries(init.headers)) {
+      const name = key.toLowerCase();
+      if (!FORBIDDEN_HEADERS.has(name)) headers[name] = value;
+    }
+    return headers;
+  };
+
+  const attempt = async (url: URL, init: TransportRequest, replayed: boolean): Promise<Response> => {
+    const entry = await acquire(url.origin, init);
+    let stream: http2.ClientHttp2Stream;
+    try {
+      stream = entry.session.request(requestHeaders(url, init), { endStream: init.body === undefined });
+    } catch (error) {
+      // GOAWAY raced the request; the replay opens a new session
+      releaseStream(entry);
+      retire(entry);
+      if ((error as NodeJS.ErrnoException).code === 'ERR_HTTP2_GOAWAY_SESSION' && !replayed) return attempt(url, init, true);
+      throw new TypeError('fetch failed', { cause: error });
+    }
+    counters.streamsOpened++;
+    stream.once('close', () => releaseStream(entry));
+
+    return new Promise<Response>((resolve, reject) => {
+      let responded = false;
+      const onAbort = (): void => {
+        stream.close(NGHTTP2_CANCEL);
+        if (!responded) reject(abortError(init.signal!));
+      };
+      init.signal?.addEventListener('abort', onAbort, { once: true });
+      stream.once('close', () => init.signal?.removeEventListener('abort', onAbort));
+
+      stream.on('error', error => {
+        if (stream.rstCode !== undefined && stream.rstCode !== 0) counters.resets++;
+        if (responded) return;
+        // The server never processed a refused stream, so it is always safe to replay once
+        if (stream.rstCode === NGHTTP2_REFUSED_STREAM && !replayed && !init.signal?.aborted) {
+          counters.refusedRetries++;
+          attempt(url, init, true).then(resolve, reject);
+          return;
+        }
+        if (init.signal?.aborted) reject(abortError(init.signal));
+        else reject(error instanceof TimeoutError ? error : new TypeError('fetch failed', { cause: error }));
+      });
+
+      stream.once('response', raw => {
+        responded = true;
+        const status = Number(raw[':status']);
+        const hasBody = init.method !== 'HEAD' && status !== 204 && status !== 304;
+        let body: ReadableStream<Uint8Array> | null = null;
+        if (hasBody) {
+          const onBodyBytes = init.onBodyBytes;
+          if (onBodyBytes) {
+            let bytes = 0;
+            stream.on('data', (chunk: Buffer) => { bytes += chunk.length; });
+            stream.once('end', () => onBodyBytes(bytes));
+          }
+          const decoder = createDecoder(raw['content-encoding'] as string | undefined);
+          body = Readable.toWeb(decoder ? pipeline(stream, decoder, () => {}) : stream) as ReadableStream<Uint8Array>;
+        } else {
+          stream.resume();
+        }
+        resolve(new Response(body, { status, headers: toHeaders(raw) }));
+      });
+
+      if (init.body !== undefined) stream.end(init.body);
+    });
+  };
+
+  return {
+    send: (url, init) => attempt(new URL(url), init, false),
+
+    stats(): Http2Stats {
+      let queued = 0;
+      for (const queue of waiters.values()) queued += queue.length;
+      return { sessions: sessions.size, activeStreams, queued, ...counters };
+    },
+
+    close(): void {
+      for (const entry of sessions.values()) entry.session.close();
+      sessions.clear();
+    }
+  };
+}
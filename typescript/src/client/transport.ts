@@ -0,0 +1,135 @@
+/**
+ * HTTP transports for Moltbook API
+ */
+
+import * as http from 'node:http';
+import * as https from 'node:https';
+import { Readable, pipeline } from 'node:stream';
+import type { PoolOptions, PoolStats } from '../types';
+import { createDecoder } from '../utils/compression';
+import { TimeoutError } from '../utils/errors';
+
+export interface TransportRequest {
+  method: string;
+  headers: Readonly<Record<string, string>>;
+  body?: string | Uint8Array;
+  signal?: AbortSignal;
+  /** Called with the encoded body size once a response body has been received in full */
+  onBodyBytes?: (bytes: number) => void;
+  /** Fail if a new socket takes longer than this to connect (ms); reused sockets are exempt */
+  connectTimeout?: number;
+}
+
+/** A fetch-compatible function that sends one HTTP request */
+export type Transport = (url: string, init: TransportRequest) => Promise<Response>;
+
+export interface PooledTransport {
+  send: Transport;
+  stats(): PoolStats;
+  close(): void;
+}
+
+const DEFAULT_MAX_CONNECTIONS = 16;
+const DEFAULT_MAX_IDLE_CONNECTIONS = 8;
+const DEFAULT_KEEP_ALIVE_TIMEOUT = 30000;
+const DEFAULT_KEEP_ALIVE_PROBE_DELAY = 1000;
+const ACCEPT_ENCODING = 'gzip, deflate, br';
+
+/** Transport backed by the global fetch */
+export const fetchTransport: Transport = (url, init) => fetch(url, init);
+
+const countSockets = (sockets: NodeJS.ReadOnlyDict<unknown[]>): number => {
+  let total = 0;
+  for (const name in sockets) total += sockets[name]?.length ?? 0;
+  return total;
+};
+
+const toHeaders = (raw: http.IncomingHttpHeaders): Headers => {
+  const headers = new Headers();
+  for (const [key, value] of Object.entries(raw)) {
+    if (Array.isArray(value)) value.forEach(v => headers.append(key, v));
+    else if (value !== undefined) headers.set(key, value);
+  }
+  return headers;
+};
+
+const withAcceptEncoding = (headers: Readonly<Record<string, string>>): Readonly<Record<string, string>> =>
+  'Accept-Encoding' in headers || 'accept-encoding' in headers ? headers : { ...headers, 'Accept-Encoding': ACCEPT_ENCODING };
+
+/**
+ * Keep-alive transport on node:http agents. Sockets are reused LIFO so that
+ * surplus idle connections age out after `keepAliveTimeout`. Like fetch, it
+ * negotiates gzip/deflate/br and hands back the decoded body.
+ */
+export function createPooledTransport(options: PoolOptions = {}): PooledTransport {
+  const agentOptions: http.AgentOptions = {
+    keepAlive: true,
+    keepAliveMsecs: options.keepAliveProbeDelay ?? DEFAULT_KEEP_ALIVE_PROBE_DELAY,
+    maxSockets: options.maxConnections ?? DEFAULT_MAX_CONNECTIONS,
+    maxTotalSockets: options.maxTotalConnections ?? Infinity,
+    maxFreeSockets: options.maxIdleConnections ?? DEFAULT_MAX_IDLE_CONNECTIONS,
+    timeout: options.keepAliveTimeout ?? DEFAULT_KEEP_ALIVE_TIMEOUT,
+    scheduling: 'lifo'
+  };
+  const httpAgent = new http.Agent(agentOptions);
+  const httpsAgent = new https.Agent(agentOptions);
+  let requests = 0;
+  let reused = 0;
+
+  const send: Transport = (url, init) => new Promise<Response>((resolve, reject) => {
+    const target = new URL(url);
+    const secure = target.protocol === 'https:';
+    const req = (secure ? https : http).request(target, { method: init.method, headers: withAcceptEncoding(init.headers), agent: secure ? httpsAgent : httpAgent, signal: init.signal }, res => {
+      requests++;
+      if (req.reusedSocket) reused++;
+      const status = res.statusCode ?? 0;
+      const hasBody = init.method !== 'HEAD' && status !== 204 && status !== 304;
+      if (!hasBody) res.resume();
+      let body: ReadableStream<Uint8Array> | null = null;
+      if (hasBody) {
+        const onBodyBytes = init.onBodyBytes;
+        if (onBodyBytes) {
+          let bytes = 0;
+          res.on('data', (chunk: Buffer) => { bytes += chunk.length; });
+          res.on('end', () => onBodyBytes(bytes));
+        }
+        const decoder = createDecoder(res.headers['content-encoding']);
+        body = Readable.toWeb(decoder ? pipeline(res, decoder, () => {}) : res) as ReadableStream<Uint8Array>;
+      }
+      resolve(new Response(body, { status, statusText: res.statusMessage ?? '', headers: toHeaders(res.headers) }));
+    });
+    const connectTimeout = init.connectTimeout;
+    if (connectTimeout) {
+      req.on('socket', socket => {
+        if (!socket.connecting) return;
+        const timer = setTimeout(() => req.destroy(new TimeoutError('Connection timed out', connectTimeout)), connectTimeout);
+        const clear = (): void => clearTimeout(timer);
+        socket.once('connect', clear);
+        socket.once('close', clear);
+      });
+    }
+    // Mirror fetch: aborts surface as AbortError, everything else as TypeError
+    req.on('error', error => reject(error.name === 'AbortError' || error instanceof TimeoutError ? error : new TypeError('fetch failed', { cause: error })));
+    req.end(init.body);
+  });
+
+  return {
+    send,
+
+    stats(): PoolStats {
+      return {
+        active: countSockets(httpAgent.sockets) + countSockets(httpsAgent.sockets),
+        idle: countSockets(httpAgent.freeSockets) + countSockets(httpsAgent.freeSockets),
+        queued: countSockets(httpAgent.requests) + countSockets(httpsAgent.requests),
+        requests,
+        reused,
+        connectionsOpened: requests - reused
+      };
+    },
+
+    close(): void {
+      httpAgent.destroy();
+      httpsAgent.destroy();
+    }
+  };
+}
@@ -4,8 +4,32 @@
 
 export { MoltbookClient } from './client/MoltbookClient';
 export { HttpClient } from './client/HttpClient';
+export { createPooledTransport, fetchTransport } from './client/transport';
+export type { Transport, TransportRequest, PooledTransport } from './client/transport';
+export { createHttp2Transport } from './client/http2';
+export type { Http2Transport } from './client/http2';
+export { createMiddlewareManager, respondWith, isSyntheticResponse, createLoggingMiddleware, createTimingMiddleware, createRateLimitMiddleware, createCacheMiddleware, createRetryMiddleware, createAuthMiddleware, createRequestIdMiddleware, createCompressionMiddleware } from './utils/middleware';
+export type { Middleware, MiddlewareManager, RequestInterceptor, ResponseInterceptor, ErrorInterceptor, SyntheticResponse, RequestTiming } from './utils/middleware';
+export { createEventEmitter, getGlobalEmitter, setGlobalEmitter, onRequestStart, onRequestEnd, onRequestError, onRateLimit, onRetry } from './utils/events';
+export type { EventEmitter, EventMap, RequestStartEvent, RequestEndEvent, RequestErrorEvent, RateLimitEvent, RetryEvent } from './utils/events';
+export { createHistogram, createLatencyRecorder } from './utils/histogram';
+export type { Histogram, LatencyRecorder } from './utils/histogram';
+export { createTracer, createFileSpanExporter, toOtlpJson } from './utils/tracing';
+export type { Tracer, TracerOptions, Span, SpanData, SpanExporter, SpanKind } from './utils/tracing';
+export { createLoader } from './utils/loader';
+export type { Loader } from './utils/loader';
+export { createVoteQueue } from './utils/votes';
+export type { VoteQueue, VoteSender, VoteTarget, VoteDirection } from './utils/votes';
+export { openOutbox } from './utils/outbox';
+export type { Outbox, OutboxEntry, OutboxWrite, OutboxSender } from './utils/outbox';
+export { createTieredCache } from './utils/diskcache';
+export type { TieredCache, DiskCacheOptions, DiskCacheStats } from './utils/diskcache';
+export { createTinyLFUCache } from './utils/tinylfu';
+export type { TinyLFUOptions } from './utils/tinylfu';
+export { cacheKey, requestCacheKey, hash64 } from './utils/cachekey';
+export type { CacheKeyOptions } from './utils/cachekey';
 export { Agents, Posts, Comments, Submolts, Feed, Search } from './resources';
-export { MoltbookError, AuthenticationError, ForbiddenError, NotFoundError, ValidationError, RateLimitError, ConflictError, NetworkError, TimeoutError, ConfigurationError, isMoltbookError, isRateLimitError, isAuthenticationError } from './utils/errors';
+export { MoltbookError, AuthenticationError, ForbiddenError, NotFoundError, ValidationError, RateLimitError, ConflictError, NetworkError, TimeoutError, CircuitOpenError, ConfigurationError, isMoltbookError, isRateLimitError, isAuthenticationError } from './utils/errors';
 export * from './types';
 import { MoltbookClient } from './client/MoltbookClient';
 export default MoltbookClient;
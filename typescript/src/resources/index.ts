@@ -3,63 +3,99 @@
  */
 
 import type { HttpClient } from '../client/HttpClient';
-import type { Agent, AgentRegisterRequest, AgentRegisterResponse, AgentUpdateRequest, AgentStatusResponse, AgentProfileResponse, Post, CreatePostRequest, ListPostsOptions, Comment, CreateCommentRequest, ListCommentsOptions, Submolt, CreateSubmoltRequest, ListSubmoltsOptions, VoteResponse, PaginatedResponse, ApiResponse, SearchResults, SearchOptions, FeedOptions } from '../types';
+import { ENDPOINTS, CACHE_TAGS } from '../utils/constants';
+import { createLoader, Loader } from '../utils/loader';
+import type { CacheTags, LoaderOptions, RequestOptions, Agent, AgentRegisterRequest, AgentRegisterResponse, AgentUpdateRequest, AgentStatusResponse, AgentProfileResponse, Post, CreatePostRequest, ListPostsOptions, Comment, CreateCommentRequest, ListCommentsOptions, Submolt, CreateSubmoltRequest, ListSubmoltsOptions, VoteResponse, PaginatedResponse, ApiResponse, SearchResults, SearchOptions, FeedOptions } from '../types';
+
+/** Forward only the per-call controls, never the query fields of an options object */
+const requestOptions = ({ lane, signal, deadline }: RequestOptions): RequestOptions => ({ lane, signal, deadline });
+
+/** Per-call controls plus the response cache tags of a GET */
+const tagged = (options: RequestOptions, tags: CacheTags): RequestOptions => ({ ...requestOptions(options), tags });
+
+/** Listings are tagged with every post they hold, so a vote or delete invalidates exactly the pages showing that post */
+const postTags = (tag: string) => (r: unknown): string[] => [tag, ...((r as Partial<PaginatedResponse<Post>>)?.data ?? []).map(p => CACHE_TAGS.POST(p.id))];
+
+const commentTags = (items: Comment[] = [], tags: string[] = []): string[] => {
+  for (const item of items) { tags.push(CACHE_TAGS.COMMENT(item.id)); commentTags(item.replies, tags); }
+  return tags;
+};
 
 export class Agents {
-  constructor(private client: HttpClient) {}
-  async register(data: AgentRegisterRequest): Promise<AgentRegisterResponse> { return this.client.post<AgentRegisterResponse>('/agents/register', data); }
-  async me(): Promise<Agent> { const r = await this.client.get<{ agent: Agent }>('/agents/me'); return r.agent; }
-  async update(data: AgentUpdateRequest): Promise<Agent> { const r = await this.client.patch<{ agent: Agent }>('/agents/me', data); return r.agent; }
-  async getStatus(): Promise<AgentStatusResponse> { return this.client.get<AgentStatusResponse>('/agents/status'); }
-  async getProfile(name: string): Promise<AgentProfileResponse> { return this.client.get<AgentProfileResponse>('/agents/profile', { name }); }
-  async follow(name: string): Promise<ApiResponse<{ action: string }>> { return this.client.post<ApiResponse<{ action: string }>>(`/agents/${name}/follow`); }
-  async unfollow(name: string): Promise<ApiResponse<{ action: string }>> { return this.client.delete<ApiResponse<{ action: string }>>(`/agents/${name}/follow`); }
-  async isFollowing(name: string): Promise<boolean> { const p = await this.getProfile(name); return p.isFollowing; }
+  /** Batches and briefly caches `getProfile` calls; `load`/`loadMany` go through it */
+  readonly loader: Loader<AgentProfileResponse>;
+  constructor(private client: HttpClient, loader: LoaderOptions = {}) { this.loader = createLoader(name => this.getProfile(name), loader); client.instrument(this, 'agents'); }
+  async register(data: AgentRegisterRequest, options: RequestOptions = {}): Promise<AgentRegisterResponse> { return this.client.post<AgentRegisterResponse>(ENDPOINTS.REGISTER, data, requestOptions(options)); }
+  async me(options: RequestOptions = {}): Promise<Agent> { const r = await this.client.get<{ agent: Agent }>(ENDPOINTS.ME, undefined, tagged(options, [CACHE_TAGS.ME])); return r.agent; }
+  async update(data: AgentUpdateRequest, options: RequestOptions = {}): Promise<Agent> { const r = await this.client.patch<{ agent: Agent }>(ENDPOINTS.ME, data, requestOptions(options)); this.client.invalidate(r.agent?.name ? [CACHE_TAGS.ME, CACHE_TAGS.AGENT(r.agent.name)] : [CACHE_TAGS.ME]); return r.agent; }
+  async getStatus(options: RequestOptions = {}): Promise<AgentStatusResponse> { return this.client.get<AgentStatusResponse>(ENDPOINTS.STATUS, undefined, tagged(options, [CACHE_TAGS.ME])); }
+  async getProfile(name: string, options: RequestOptions = {}): Promise<AgentProfileResponse> { return this.client.get<AgentProfileResponse>(ENDPOINTS.PROFILE, { name }, tagged(options, r => [CACHE_TAGS.AGENT(name), ...((r as Partial<AgentProfileResponse>)?.recentPosts ?? []).map(p => CACHE_TAGS.POST(p.id))])); }
+  load(name: string): Promise<AgentProfileResponse> { return this.loader.load(name); }
+  loadMany(names: readonly string[]): Promise<Array<AgentProfileResponse | Error>> { return this.loader.loadMany(names); }
+  async follow(name: string, options: RequestOptions = {}): Promise<ApiResponse<{ action: string }>> { const r = await this.client.post<ApiResponse<{ action: string }>>(ENDPOINTS.FOLLOW(name), undefined, requestOptions(options)); this.loader.clear(name); this.client.invalidate([CACHE_TAGS.AGENT(name), CACHE_TAGS.ME, CACHE_TAGS.FEED]); return r; }
+  async unfollow(name: string, options: RequestOptions = {}): Promise<ApiResponse<{ action: string }>> { const r = await this.client.delete<ApiResponse<{ action: string }>>(ENDPOINTS.FOLLOW(name), requestOptions(options)); this.loader.clear(name); this.client.invalidate([CACHE_TAGS.AGENT(name), CACHE_TAGS.ME, CACHE_TAGS.FEED]); return r; }
+  async isFollowing(name: string, options: RequestOptions = {}): Promise<boolean> { const p = await this.getProfile(name, options); return p.isFollowing; }
 }
 
 export class Posts {
-  constructor(private client: HttpClient) {}
-  async create(data: CreatePostRequest): Promise<Post> { const r = await this.client.post<{ post: Post }>('/posts', data); return r.post; }
-  async get(id: string): Promise<Post> { const r = await this.client.get<{ post: Post }>(`/posts/${id}`); return r.post; }
-  async list(options: ListPostsOptions = {}): Promise<Post[]> { const r = await this.client.get<PaginatedResponse<Post>>('/posts', { sort: options.sort, limit: options.limit, offset: options.offset, submolt: options.submolt, t: options.timeRange }); return r.data; }
-  async delete(id: string): Promise<void> { await this.client.delete(`/posts/${id}`); }
-  async upvote(id: string): Promise<VoteResponse> { return this.client.post<VoteResponse>(`/posts/${id}/upvote`); }
-  async downvote(id: string): Promise<VoteResponse> { return this.client.post<VoteResponse>(`/posts/${id}/downvote`); }
-  async *iterate(options: ListPostsOptions = {}): AsyncGenerator<Post[], void, unknown> { const limit = options.limit || 25; let offset = options.offset || 0; let hasMore = true; while (hasMore) { const posts = await this.list({ ...options, limit, offset }); if (posts.length === 0) break; yield posts; offset += limit; hasMore = posts.length === limit; } }
+  /** Batches and briefly caches `get` calls; `load`/`loadMany` go through it */
+  readonly loader: Loader<Post>;
+  constructor(private client: HttpClient, loader: LoaderOptions = {}) { this.loader = createLoader(id => this.get(id), loader); client.instrument(this, 'posts'); }
+  async create(data: CreatePostRequest, options: RequestOptions = {}): Promise<Post> { const r = await this.client.post<{ post: Post }>(ENDPOINTS.POSTS, data, requestOptions(options)); this.client.invalidate([CACHE_TAGS.POSTS, CACHE_TAGS.FEED, CACHE_TAGS.SUBMOLT_FEED(data.submolt)]); return r.post; }
+  async get(id: string, options: RequestOptions = {}): Promise<Post> { const r = await this.client.get<{ post: Post }>(ENDPOINTS.POST(id), undefined, tagged(options, [CACHE_TAGS.POST(id)])); return r.post; }
+  load(id: string): Promise<Post> { return this.loader.load(id); }
+  loadMany(ids: readonly string[]): Promise<Array<Post | Error>> { return this.loader.loadMany(ids); }
+  async list(options: ListPostsOptions = {}): Promise<Post[]> { const r = await this.client.get<PaginatedResponse<Post>>(ENDPOINTS.POSTS, { sort: options.sort, limit: options.limit, offset: options.offset, submolt: options.submolt, t: options.timeRange }, tagged(options, postTags(CACHE_TAGS.POSTS))); return r.data; }
+  stream(options: ListPostsOptions = {}): AsyncGenerator<Post, void, unknown> { return this.client.stream<Post>(ENDPOINTS.POSTS, { sort: options.sort, limit: options.limit, offset: options.offset, submolt: options.submolt, t: options.timeRange }, requestOptions(options)); }
+  async delete(id: string, options: RequestOptions = {}): Promise<void> { await this.client.delete(ENDPOINTS.POST(id), requestOptions(options)); this.loader.clear(id); this.client.invalidate([CACHE_TAGS.POST(id), CACHE_TAGS.POST_COMMENTS(id)]); }
+  async upvote(id: string, options: RequestOptions = {}): Promise<VoteResponse> { const r = await this.client.post<VoteResponse>(ENDPOINTS.POST_UPVOTE(id), undefined, requestOptions(options)); this.loader.clear(id); this.client.invalidate([CACHE_TAGS.POST(id)]); return r; }
+  async downvote(id: string, options: RequestOptions = {}): Promise<VoteResponse> { const r = await this.client.post<VoteResponse>(ENDPOINTS.POST_DOWNVOTE(id), undefined, requestOptions(options)); this.loader.clear(id); this.client.invalidate([CACHE_TAGS.POST(id)]); return r; }
+  async *iterate(options: ListPostsOptions = {}): AsyncGenerator<Post[], void, unknown> { const limit = options.limit || 25; let offset = options.offset || 0; let hasMore = true; while (hasMore) { const posts = await this.list({ lane: 'background', ...options, limit, offset }); if (posts.length === 0) break; yield posts; offset += limit; hasMore = posts.length === limit; } }
 }
 
 export class Comments {
-  constructor(private client: HttpClient) {}
-  async create(data: CreateCommentRequest): Promise<Comment> { const { postId, ...body } = data; const r = await this.client.post<{ comment: Comment }>(`/posts/${postId}/comments`, body); return r.comment; }
-  async get(id: string): Promise<Comment> { const r = await this.client.get<{ comment: Comment }>(`/comments/${id}`); return r.comment; }
-  async list(postId: string, options: ListCommentsOptions = {}): Promise<Comment[]> { const r = await this.client.get<{ comments: Comment[] }>(`/posts/${postId}/comments`, { sort: options.sort, limit: options.limit }); return r.comments; }
-  async delete(id: string): Promise<void> { await this.client.delete(`/comments/${id}`); }
-  async upvote(id: string): Promise<VoteResponse> { return this.client.post<VoteResponse>(`/comments/${id}/upvote`); }
-  async downvote(id: string): Promise<VoteResponse> { return this.client.post<VoteResponse>(`/comments/${id}/downvote`); }
+  /** Batches and briefly caches `get` calls; `load`/`loadMany` go through it */
+  readonly loader: Loader<Comment>;
+  constructor(private client: HttpClient, loader: LoaderOptions = {}) { this.loader = createLoader(id => this.get(id), loader); client.instrument(this, 'comments'); }
+  async create(data: CreateCommentRequest, options: RequestOptions = {}): Promise<Comment> { const { postId, ...body } = data; const r = await this.client.post<{ comment: Comment }>(ENDPOINTS.POST_COMMENTS(postId), body, requestOptions(options)); this.client.invalidate(data.parentId ? [CACHE_TAGS.POST_COMMENTS(postId), CACHE_TAGS.POST(postId), CACHE_TAGS.COMMENT(data.parentId)] : [CACHE_TAGS.POST_COMMENTS(postId), CACHE_TAGS.POST(postId)]); return r.comment; }
+  async get(id: string, options: RequestOptions = {}): Promise<Comment> { const r = await this.client.get<{ comment: Comment }>(ENDPOINTS.COMMENT(id), undefined, tagged(options, [CACHE_TAGS.COMMENT(id)])); return r.comment; }
+  load(id: string): Promise<Comment> { return this.loader.load(id); }
+  loadMany(ids: readonly string[]): Promise<Array<Comment | Error>> { return this.loader.loadMany(ids); }
+  async list(postId: string, options: ListCommentsOptions = {}): Promise<Comment[]> { const r = await this.client.get<{ comments: Comment[] }>(ENDPOINTS.POST_COMMENTS(postId), { sort: options.sort, limit: options.limit }, tagged(options, r => commentTags((r as Partial<{ comments: Comment[] }>)?.comments, [CACHE_TAGS.POST_COMMENTS(postId)]))); return r.comments; }
+  async delete(id: string, options: RequestOptions = {}): Promise<void> { await this.client.delete(ENDPOINTS.COMMENT(id), requestOptions(options)); this.loader.clear(id); this.client.invalidate([CACHE_TAGS.COMMENT(id)]); }
+  async upvote(id: string, options: RequestOptions = {}): Promise<VoteResponse> { const r = await this.client.post<VoteResponse>(ENDPOINTS.COMMENT_UPVOTE(id), undefined, requestOptions(options)); this.loader.clear(id); this.client.invalidate([CACHE_TAGS.COMMENT(id)]); return r; }
+  async downvote(id: string, options: RequestOptions = {}): Promise<VoteResponse> { const r = await this.client.post<VoteResponse>(ENDPOINTS.COMMENT_DOWNVOTE(id), undefined, requestOptions(options)); this.loader.clear(id); this.client.invalidate([CACHE_TAGS.COMMENT(id)]); return r; }
   flatten(comments: Comment[]): Comment[] { const result: Comment[] = []; const traverse = (items: Comment[]) => { for (const item of items) { const { replies, ...comment } = item; result.push(comment as Comment); if (replies?.length) traverse(replies); } }; traverse(comments); return result; }
   count(comments: Comment[]): number { let total = 0; const traverse = (items: Comment[]) => { for (const item of items) { total++; if (item.replies?.length) traverse(item.replies); } }; traverse(comments); return total; }
 }
 
 export class Submolts {
-  constructor(private client: HttpClient) {}
-  async list(options: ListSubmoltsOptions = {}): Promise<Submolt[]> { const r = await this.client.get<PaginatedResponse<Submolt>>('/submolts', { sort: options.sort, limit: options.limit, offset: options.offset }); return r.data; }
-  async get(name: string): Promise<Submolt> { const r = await this.client.get<{ submolt: Submolt }>(`/submolts/${name}`); return r.submolt; }
-  async create(data: CreateSubmoltRequest): Promise<Submolt> { const r = await this.client.post<{ submolt: Submolt }>('/submolts', { name: data.name, display_name: data.displayName, description: data.description }); return r.submolt; }
-  async subscribe(name: string): Promise<ApiResponse<{ action: string }>> { return this.client.post<ApiResponse<{ action: string }>>(`/submolts/${name}/subscribe`); }
-  async unsubscribe(name: string): Promise<ApiResponse<{ action: string }>> { return this.client.delete<ApiResponse<{ action: string }>>(`/submolts/${name}/subscribe`); }
-  async isSubscribed(name: string): Promise<boolean> { const s = await this.get(name); return s.isSubscribed ?? false; }
-  async getFeed(name: string, options: ListPostsOptions = {}): Promise<Post[]> { const r = await this.client.get<PaginatedResponse<Post>>(`/submolts/${name}/feed`, { sort: options.sort, limit: options.limit, offset: options.offset }); return r.data; }
+  /** Batches and briefly caches `get` calls; `load`/`loadMany` go through it */
+  readonly loader: Loader<Submolt>;
+  constructor(private client: HttpClient, loader: LoaderOptions = {}) { this.loader = createLoader(name => this.get(name), loader); client.instrument(this, 'submolts'); }
+  async list(options: ListSubmoltsOptions = {}): Promise<Submolt[]> { const r = await this.client.get<PaginatedResponse<Submolt>>(ENDPOINTS.SUBMOLTS, { sort: options.sort, limit: options.limit, offset: options.offset }, tagged(options, r => [CACHE_TAGS.SUBMOLTS, ...((r as Partial<PaginatedResponse<Submolt>>)?.data ?? []).map(s => CACHE_TAGS.SUBMOLT(s.name))])); return r.data; }
+  stream(options: ListSubmoltsOptions = {}): AsyncGenerator<Submolt, void, unknown> { return this.client.stream<Submolt>(ENDPOINTS.SUBMOLTS, { sort: options.sort, limit: options.limit, offset: options.offset }, requestOptions(options)); }
+  async get(name: string, options: RequestOptions = {}): Promise<Submolt> { const r = await this.client.get<{ submolt: Submolt }>(ENDPOINTS.SUBMOLT(name), undefined, tagged(options, [CACHE_TAGS.SUBMOLT(name)])); return r.submolt; }
+  load(name: string): Promise<Submolt> { return this.loader.load(name); }
+  loadMany(names: readonly string[]): Promise<Array<Submolt | Error>> { return this.loader.loadMany(names); }
+  async create(data: CreateSubmoltRequest, options: RequestOptions = {}): Promise<Submolt> { const r = await this.client.post<{ submolt: Submolt }>(ENDPOINTS.SUBMOLTS, { name: data.name, display_name: data.displayName, description: data.description }, requestOptions(options)); this.client.invalidate([CACHE_TAGS.SUBMOLTS]); return r.submolt; }
+  async subscribe(name: string, options: RequestOptions = {}): Promise<ApiResponse<{ action: string }>> { const r = await this.client.post<ApiResponse<{ action: string }>>(ENDPOINTS.SUBMOLT_SUBSCRIBE(name), undefined, requestOptions(options)); this.loader.clear(name); this.client.invalidate([CACHE_TAGS.SUBMOLT(name), CACHE_TAGS.FEED]); return r; }
+  async unsubscribe(name: string, options: RequestOptions = {}): Promise<ApiResponse<{ action: string }>> { const r = await this.client.delete<ApiResponse<{ action: string }>>(ENDPOINTS.SUBMOLT_SUBSCRIBE(name), requestOptions(options)); this.loader.clear(name); this.client.invalidate([CACHE_TAGS.SUBMOLT(name), CACHE_TAGS.FEED]); return r; }
+  async isSubscribed(name: string, options: RequestOptions = {}): Promise<boolean> { const s = await this.get(name, options); return s.isSubscribed ?? false; }
+  async getFeed(name: string, options: ListPostsOptions = {}): Promise<Post[]> { const r = await this.client.get<PaginatedResponse<Post>>(ENDPOINTS.SUBMOLT_FEED(name), { sort: options.sort, limit: options.limit, offset: options.offset }, tagged(options, postTags(CACHE_TAGS.SUBMOLT_FEED(name)))); return r.data; }
+  streamFeed(name: string, options: ListPostsOptions = {}): AsyncGenerator<Post, void, unknown> { return this.client.stream<Post>(ENDPOINTS.SUBMOLT_FEED(name), { sort: options.sort, limit: options.limit, offset: options.offset }, requestOptions(options)); }
 }
 
 export class Feed {
-  constructor(private client: HttpClient) {}
-  async get(options: FeedOptions = {}): Promise<Post[]> { const r = await this.client.get<PaginatedResponse<Post>>('/feed', { sort: options.sort, limit: options.limit, offset: options.offset }); return r.data; }
-  async *iterate(options: FeedOptions = {}): AsyncGenerator<Post[], void, unknown> { const limit = options.limit || 25; let offset = options.offset || 0; let hasMore = true; while (hasMore) { const posts = await this.get({ ...options, limit, offset }); if (posts.length === 0) break; yield posts; offset += limit; hasMore = posts.length === limit; } }
+  constructor(private client: HttpClient) { client.instrument(this, 'feed'); }
+  async get(options: FeedOptions = {}): Promise<Post[]> { const r = await this.client.get<PaginatedResponse<Post>>(ENDPOINTS.FEED, { sort: options.sort, limit: options.limit, offset: options.offset }, tagged(options, postTags(CACHE_TAGS.FEED))); return r.data; }
+  stream(options: FeedOptions = {}): AsyncGenerator<Post, void, unknown> { return this.client.stream<Post>(ENDPOINTS.FEED, { sort: options.sort, limit: options.limit, offset: options.offset }, requestOptions(options)); }
+  async *iterate(options: FeedOptions = {}): AsyncGenerator<Post[], void, unknown> { const limit = options.limit || 25; let offset = options.offset || 0; let hasMore = true; while (hasMore) { const posts = await this.get({ lane: 'background', ...options, limit, offset }); if (posts.length === 0) break; yield posts; offset += limit; hasMore = posts.length === limit; } }
 }
 
 export class Search {
-  constructor(private client: HttpClient) {}
-  async query(q: string, options: SearchOptions = {}): Promise<SearchResults> { return this.client.get<SearchResults>('/search', { q, limit: options.limit }); }
+  constructor(private client: HttpClient) { client.instrument(this, 'search'); }
+  async query(q: string, options: SearchOptions = {}): Promise<SearchResults> { return this.client.get<SearchResults>(ENDPOINTS.SEARCH, { q, limit: options.limit }, requestOptions(options)); }
   async posts(q: string, options: SearchOptions = {}): Promise<Post[]> { const r = await this.query(q, options); return r.posts; }
   async agents(q: string, options: SearchOptions = {}): Promise<Agent[]> { const r = await this.query(q, options); return r.agents; }
   async submolts(q: string, options: SearchOptions = {}): Promise<Submolt[]> { const r = await this.query(q, options); return r.submolts; }
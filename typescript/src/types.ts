@@ -2,6 +2,12 @@
  * Moltbook SDK Type Definitions
  */
 
+import type { ResponseCacheOptions } from './utils/cache';
+import type { Middleware } from './utils/middleware';
+import type { EventEmitter } from './utils/events';
+import type { Tracer } from './utils/tracing';
+import type { OutboxEntry } from './utils/outbox';
+
 export interface MoltbookClientConfig {
   apiKey?: string;
   baseUrl?: string;
@@ -9,14 +15,91 @@ export interface MoltbookClientConfig {
   retries?: number;
   retryDelay?: number;
   headers?: Record<string, string>;
+  pool?: PoolOptions;
+  http2?: Http2Options | boolean;
+  loaders?: LoaderOptions;
+  votes?: VoteQueueOptions;
+  coalesceRequests?: boolean;
+  rateLimit?: RateLimiterOptions | false;
+  scheduler?: SchedulerOptions;
+  maxRetryDelay?: number;
+  retryBudget?: RetryBudgetOptions;
+  circuitBreaker?: CircuitBreakerOptions | false;
+  hedging?: HedgingOptions;
+  cache?: ResponseCacheOptions | boolean;
+  compression?: CompressionOptions | boolean;
+  middleware?: Middleware[];
+  events?: EventEmitter;
+  metrics?: boolean;
+  tracer?: Tracer;
+  timeouts?: TimeoutOptions;
+}
+
+export interface PoolOptions {
+  /** Maximum open connections per origin */
+  maxConnections?: number;
+  /** Maximum open connections across all origins */
+  maxTotalConnections?: number;
+  /** Maximum idle connections kept per origin */
+  maxIdleConnections?: number;
+  /** How long an idle connection stays in the pool before it is evicted (ms) */
+  keepAliveTimeout?: number;
+  /** Initial delay for TCP keep-alive probes on pooled sockets (ms) */
+  keepAliveProbeDelay?: number;
+}
+
+export interface PoolStats {
+  /** Connections currently serving a request */
+  active: number;
+  /** Idle connections waiting for reuse */
+  idle: number;
+  /** Requests waiting for a free connection */
+  queued: number;
+  /** Requests sent through the pool */
+  requests: number;
+  /** Requests that reused an existing connection */
+  reused: number;
+  /** Connections opened by the pool */
+  connectionsOpened: number;
 }
 
 export interface RequestConfig {
   method: 'GET' | 'POST' | 'PATCH' | 'DELETE';
   path: string;
+  /** Route template such as `/posts/:id`; derived from the path when omitted */
+  route?: string;
   body?: unknown;
   query?: Record<string, string | number | undefined>;
   headers?: Record<string, string>;
+  lane?: RequestLane;
+  signal?: AbortSignal;
+  deadline?: number | Date;
+  tags?: CacheTags;
+}
+
+/** Scheduling lane; background work yields to interactive calls */
+export type RequestLane = 'interactive' | 'background';
+
+/** Response cache tags such as `post:<id>`; a function derives them from the decoded response */
+export type CacheTags = readonly string[] | ((data: unknown) => readonly string[]);
+
+export interface RequestOptions {
+  lane?: RequestLane;
+  /** Cancel the call, including queue waits, retries and backoff sleeps */
+  signal?: AbortSignal;
+  /** Absolute deadline (epoch ms or Date) shared by every attempt of the call */
+  deadline?: number | Date;
+  /** Tags for the cached response of a GET; `client.invalidate(tags)` drops it */
+  tags?: CacheTags;
+}
+
+export interface TimeoutOptions {
+  /** Socket connect time (ms); enforced by the pooled and HTTP/2 transports, passed to custom ones as `connectTimeout` */
+  connect?: number;
+  /** Time from sending a request to its response headers (ms) */
+  firstByte?: number;
+  /** Time to read and decode a buffered response body (ms) */
+  body?: number;
 }
 
 export interface ApiResponse<T> {
@@ -76,7 +159,7 @@ export interface Post {
 }
 
 export interface CreatePostRequest { submolt: string; title: string; content?: string; url?: string; }
-export interface ListPostsOptions { sort?: PostSortOption; timeRange?: TimeRange; limit?: number; offset?: number; submolt?: string; }
+export interface ListPostsOptions extends RequestOptions { sort?: PostSortOption; timeRange?: TimeRange; limit?: number; offset?: number; submolt?: string; }
 
 export type CommentSortOption = 'top' | 'new' | 'controversial';
 
@@ -95,7 +178,7 @@ export interface Comment {
 }
 
 export interface CreateCommentRequest { postId: string; content: string; parentId?: string; }
-export interface ListCommentsOptions { sort?: CommentSortOption; limit?: number; }
+export interface ListCommentsOptions extends RequestOptions { sort?: CommentSortOption; limit?: number; }
 
 export type SubmoltSortOption = 'popular' | 'new' | 'alphabetical';
 
@@ -111,15 +194,216 @@ export interface Submolt {
 }
 
 export interface CreateSubmoltRequest { name: string; displayName?: string; description?: string; }
-export interface ListSubmoltsOptions { sort?: SubmoltSortOption; limit?: number; offset?: number; }
+export interface ListSubmoltsOptions extends RequestOptions { sort?: SubmoltSortOption; limit?: number; offset?: number; }
 
-export type VoteAction = 'upvoted' | 'downvoted' | 'removed' | 'changed';
+/** `unchanged` is only produced by the vote queue when queued votes cancel out */
+export type VoteAction = 'upvoted' | 'downvoted' | 'removed' | 'changed' | 'unchanged';
 export interface VoteResponse { success: boolean; message: string; action: VoteAction; author?: { name: string; }; }
 
 export interface SearchResults { posts: Post[]; agents: Agent[]; submolts: Submolt[]; }
-export interface SearchOptions { limit?: number; }
-export interface FeedOptions { sort?: PostSortOption; limit?: number; offset?: number; }
+export interface SearchOptions extends RequestOptions { limit?: number; }
+export interface FeedOptions extends RequestOptions { sort?: PostSortOption; limit?: number; offset?: number; }
 export interface RateLimitInfo { limit: number; remaining: number; resetAt: Date; }
+export interface Http2Options {
+  /** Close a session after this long without open streams (ms, default: 30000) */
+  sessionIdleTimeout?: number;
+  /** Give up on establishing a session after this long (ms, default: 10000) */
+  connectTimeout?: number;
+  /** Cap on concurrent streams per session, below the server's own limit */
+  maxConcurrentStreams?: number;
+}
+
+export interface Http2Stats {
+  /** Live sessions, one per origin */
+  sessions: number;
+  activeStreams: number;
+  /** Requests waiting for a stream slot */
+  queued: number;
+  sessionsOpened: number;
+  streamsOpened: number;
+  /** Most streams seen in flight on one session at once */
+  peakStreams: number;
+  goaways: number;
+  /** Streams refused by the server (e.g. after GOAWAY) and replayed on a new session */
+  refusedRetries: number;
+  /** Streams closed with a non-zero RST_STREAM code */
+  resets: number;
+}
+
+export interface LoaderOptions {
+  /** Fetches in flight at once per loader (default: 4) */
+  concurrency?: number;
+  /** How long loaded entities are reused (ms, default: 1000); 0 disables the cache */
+  cacheTtl?: number;
+  /** Maximum cached entities per loader (default: 1000) */
+  maxCacheSize?: number;
+}
+
+export interface LoaderStats {
+  /** Calls to load(), including each key of loadMany() */
+  loads: number;
+  /** Ticks that dispatched at least one key */
+  batches: number;
+  /** Requests actually sent */
+  fetches: number;
+  /** Loads that joined a fetch already queued or in flight */
+  deduped: number;
+  cacheHits: number;
+  inflight: number;
+  /** Keys waiting for the next batch or a free fetch slot */
+  queued: number;
+  cached: number;
+}
+
+export interface VoteQueueOptions {
+  /** How long votes on a target are collected before their net effect is sent (ms, default: 1000) */
+  delay?: number;
+  /** Vote requests in flight at once (default: 2) */
+  concurrency?: number;
+  /** How long a target's vote, learned from the last response, is trusted to detect no-op bursts (ms, default: 60000) */
+  stateTtl?: number;
+}
+
+export interface VoteQueueStats {
+  /** Votes queued by callers */
+  votes: number;
+  /** Vote requests actually sent */
+  sent: number;
+  /** Batches that left the known vote unchanged, so nothing was sent */
+  dropped: number;
+  /** Votes waiting for their batch to be sent */
+  queued: number;
+  inflight: number;
+}
+
+export interface OutboxOptions {
+  /** Journal file; created if missing, replayed if it holds unconfirmed writes */
+  path: string;
+  /** First backoff after a transient failure (ms, default: 1000) */
+  retryDelay?: number;
+  /** Upper bound for a single backoff (ms, default: 60000) */
+  maxRetryDelay?: number;
+  /** Truncate the journal once it is empty and has this many records (default: 1000) */
+  compactAfter?: number;
+  /** Latest rate-limit state; sending pauses until the reset while it is exhausted */
+  rateLimit?: () => RateLimitInfo | null;
+  /** Called for every confirmed write, including ones replayed from a previous run */
+  onDelivered?: (entry: OutboxEntry, result: unknown) => void;
+  /** Called when the API rejects a write for good (e.g. a validation error), or its outcome cannot be journaled */
+  onFailed?: (entry: OutboxEntry, error: unknown) => void;
+}
+
+export interface OutboxStats {
+  /** Journaled writes not yet confirmed */
+  pending: number;
+  enqueued: number;
+  /** Unconfirmed writes found in the journal on open */
+  replayed: number;
+  delivered: number;
+  failed: number;
+  retries: number;
+  /** Journal records written */
+  appends: number;
+  /** fsyncs issued; below `appends` when records were group-committed */
+  fsyncs: number;
+}
+
+export interface RateLimiterOptions {
+  /** Fraction of the budget below which requests are spaced evenly until reset (default: 0.2) */
+  paceThreshold?: number;
+  /** Reject instead of queueing when the expected wait exceeds this (ms) */
+  maxWait?: number;
+}
+export interface RateLimiterStats { limit: number | null; tokens: number | null; queued: number; inflight: number; expectedWait: number; resetAt: Date | null; clockSkew: number; }
+export interface SchedulerOptions {
+  /** Maximum requests in flight at once (default: unlimited) */
+  maxConcurrent?: number;
+  /** Fraction of the rate-limit budget held back for interactive calls (default: 0.1) */
+  backgroundReserve?: number;
+  /** How often deferred background work re-checks the budget (ms) */
+  deferInterval?: number;
+}
+export interface SchedulerStats { running: number; maxConcurrent: number; queued: Record<RequestLane, number>; deferringBackground: boolean; }
+export interface RetryBudgetOptions {
+  /** Retries allowed as a fraction of requests in the window (default: 0.1) */
+  ratio?: number;
+  /** Retries always allowed regardless of traffic (default: 1 per second) */
+  minRetriesPerSecond?: number;
+  /** Sliding window length (ms, default: 10000) */
+  window?: number;
+}
+export interface RetryBudgetStats { requests: number; retries: number; allowed: number; rejected: number; }
+export interface CircuitBreakerOptions {
+  /** Consecutive failures that open a route's circuit (default: 5) */
+  failureThreshold?: number;
+  /** How long a circuit stays open before probing (ms, default: 30000) */
+  resetTimeout?: number;
+  /** Probe requests let through while half-open (default: 1) */
+  halfOpenRequests?: number;
+}
+export type CircuitState = 'closed' | 'open' | 'half-open';
+export interface CircuitStats { state: CircuitState; failures: number; openedAt: Date | null; }
+export interface HedgingOptions {
+  /** Latency percentile after which a hedge is sent (default: 0.95) */
+  percentile?: number;
+  /** Lower bound for the hedge delay (ms, default: 20) */
+  minDelay?: number;
+  /** Samples a route needs before it is hedged (default: 20) */
+  minSamples?: number;
+  /** Hedges allowed as a fraction of hedgeable requests (default: 0.1) */
+  maxHedgeRate?: number;
+  /** Route templates to hedge, e.g. 'GET /feed' (default: every GET) */
+  routes?: string[];
+}
+export interface HedgingStats { requests: number; hedged: number; wins: number; rejected: number; thresholds: Record<string, number>; }
+export interface RevalidationStats {
+  /** 304 responses answered from the cache */
+  hits: number;
+  /** Full responses downloaded for cacheable GETs */
+  misses: number;
+  /** Body bytes not downloaded thanks to 304s */
+  bytesSaved: number;
+  entries: number;
+  /** Body bytes of the stored responses */
+  bytes: number;
+  /** Body bytes evicted to stay under the cache's `maxBytes` */
+  bytesEvicted: number;
+  /** Stored responses dropped without revalidating because one of their tags was invalidated */
+  invalidated: number;
+}
+export interface CompressionOptions {
+  /** Compress request bodies of at least this many bytes (default: 1024) */
+  requestThreshold?: number;
+  /** 'auto' waits until a response advertises Accept-Encoding; 'always' skips the check (default: 'auto') */
+  requestCompression?: 'auto' | 'always' | false;
+}
+export interface RouteCompressionStats {
+  responses: number;
+  /** Responses that arrived with a Content-Encoding */
+  encodedResponses: number;
+  /** Body bytes as received on the wire */
+  wireBytes: number;
+  /** Body bytes after decoding */
+  decodedBytes: number;
+  /** Encoded responses whose wire size was not known */
+  unmeasured: number;
+  /** Request body bytes before and after compression */
+  requestBytes: number;
+  requestBytesSent: number;
+}
+export interface CompressionStats { serverEncodings: string[]; requestCompression: boolean; routes: Record<string, RouteCompressionStats>; }
+export interface RouteLatencyStats {
+  count: number;
+  errors: number;
+  retries: number;
+  /** Latency percentiles in ms, accurate to the histogram bucket (~1.6%) */
+  p50: number;
+  p90: number;
+  p99: number;
+  max: number;
+  mean: number;
+}
+export interface CoalescingStats { inflight: number; coalesced: number; }
 
-export type ErrorCode = 'UNAUTHORIZED' | 'FORBIDDEN' | 'NOT_FOUND' | 'BAD_REQUEST' | 'VALIDATION_ERROR' | 'RATE_LIMITED' | 'CONFLICT' | 'INTERNAL_ERROR' | 'SELF_VOTE' | 'EMPTY_CONTENT' | 'MAX_DEPTH';
+export type ErrorCode = 'UNAUTHORIZED' | 'FORBIDDEN' | 'NOT_FOUND' | 'BAD_REQUEST' | 'VALIDATION_ERROR' | 'RATE_LIMITED' | 'CONFLICT' | 'INTERNAL_ERROR' | 'SELF_VOTE' | 'EMPTY_CONTENT' | 'MAX_DEPTH' | 'CIRCUIT_OPEN';
 export interface ApiErrorResponse { success: false; error: string; code?: ErrorCode; hint?: string; retryAfter?: number; }
@@ -0,0 +1,60 @@
+/**
+ * Cancellation helpers: caller signals, absolute deadlines and phase timers
+ */
+
+import { TimeoutError } from './errors';
+
+export interface AbortScope {
+  readonly signal: AbortSignal;
+  /** Abort with `error` after `ms` unless the returned function is called first */
+  after(ms: number, error: () => Error): () => void;
+  /** Clear every timer and detach from the parent signal */
+  dispose(): void;
+}
+
+/** Absolute deadline in epoch ms */
+export const toDeadline = (deadline?: number | Date): number | undefined => deadline instanceof Date ? deadline.getTime() : deadline;
+
+export const deadlineError = (): TimeoutError => new TimeoutError('Deadline exceeded');
+
+/**
+ * A signal that aborts when `parent` aborts, when `deadline` passes, or when
+ * one of its timers fires. Always dispose() it so no timer outlives the work.
+ */
+export function createAbortScope(parent?: AbortSignal, deadline?: number): AbortScope {
+  const controller = new AbortController();
+  const timers = new Set<NodeJS.Timeout>();
+  const forward = (): void => controller.abort(parent!.reason);
+
+  const after = (ms: number, error: () => Error): (() => void) => {
+    if (controller.signal.aborted) return () => {};
+    const timer = setTimeout(() => { timers.delete(timer); controller.abort(error()); }, Math.max(0, ms));
+    timers.add(timer);
+    return () => { clearTimeout(timer); timers.delete(timer); };
+  };
+
+  if (parent?.aborted) controller.abort(parent.reason);
+  else parent?.addEventListener('abort', forward, { once: true });
+  if (deadline !== undefined) after(deadline - Date.now(), deadlineError);
+
+  return {
+    signal: controller.signal,
+    after,
+    dispose(): void {
+      for (const timer of timers) clearTimeout(timer);
+      timers.clear();
+      parent?.removeEventListener('abort', forward);
+    }
+  };
+}
+
+/** Resolve after `ms`, or reject with the signal's reason as soon as it aborts */
+export function abortableSleep(ms: number, signal?: AbortSignal): Promise<void> {
+  if (!signal) return new Promise(resolve => setTimeout(resolve, ms));
+  if (signal.aborted) return Promise.reject(signal.reason);
+  return new Promise<void>((resolve, reject) => {
+    const onAbort = (): void => { clearTimeout(timer); reject(signal.reason); };
+    const timer = setTimeout(() => { signal.removeEventListener('abort', onAbort); resolve(); }, ms);
+    signal.addEventListener('abort', onAbort, { once: true });
+  });
+}
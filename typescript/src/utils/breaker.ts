@@ -0,0 +1,95 @@
+/**
+ * Per-route circuit breaker for Moltbook SDK
+ */
+
+import type { CircuitBreakerOptions, CircuitState, CircuitStats } from '../types';
+
+export interface CircuitBreaker {
+  /** Whether a request may go out; in half-open state only a few probes are let through */
+  allow(route: string): boolean;
+  success(route: string): void;
+  failure(route: string): void;
+  /** Milliseconds until an open circuit starts probing again */
+  retryIn(route: string): number;
+  stats(): Record<string, CircuitStats>;
+}
+
+interface Circuit {
+  state: CircuitState;
+  failures: number;
+  openedAt: number;
+  probes: number;
+}
+
+const DEFAULT_FAILURE_THRESHOLD = 5;
+const DEFAULT_RESET_TIMEOUT = 30000;
+const DEFAULT_HALF_OPEN_REQUESTS = 1;
+
+export function createCircuitBreaker(options: CircuitBreakerOptions = {}): CircuitBreaker {
+  const { failureThreshold = DEFAULT_FAILURE_THRESHOLD, resetTimeout = DEFAULT_RESET_TIMEOUT, halfOpenRequests = DEFAULT_HALF_OPEN_REQUESTS } = options;
+  const circuits = new Map<string, Circuit>();
+
+  const get = (route: string): Circuit => {
+    let circuit = circuits.get(route);
+    if (!circuit) {
+      circuit = { state: 'closed', failures: 0, openedAt: 0, probes: 0 };
+      circuits.set(route, circuit);
+    }
+    return circuit;
+  };
+
+  const open = (circuit: Circuit): void => {
+    circuit.state = 'open';
+    circuit.openedAt = Date.now();
+    circuit.probes = 0;
+  };
+
+  return {
+    allow(route: string): boolean {
+      const circuit = circuits.get(route);
+      if (!circuit || circuit.state === 'closed') return true;
+      const elapsed = Date.now() - circuit.openedAt;
+      if (circuit.state === 'open') {
+        if (elapsed < resetTimeout) return false;
+        circuit.state = 'half-open';
+        circuit.probes = 0;
+      }
+      // Probes whose outcome never arrived are forgotten after another resetTimeout
+      if (circuit.probes >= halfOpenRequests && elapsed >= resetTimeout * 2) {
+        circuit.probes = 0;
+        circuit.openedAt = Date.now() - resetTimeout;
+      }
+      if (circuit.probes >= halfOpenRequests) return false;
+      circuit.probes++;
+      return true;
+    },
+
+    success(route: string): void {
+      const circuit = circuits.get(route);
+      if (!circuit) return;
+      circuit.state = 'closed';
+      circuit.failures = 0;
+      circuit.probes = 0;
+    },
+
+    failure(route: string): void {
+      const circuit = get(route);
+      circuit.failures++;
+      if (circuit.state === 'half-open' || circuit.failures >= failureThreshold) open(circuit);
+    },
+
+    retryIn(route: string): number {
+      const circuit = circuits.get(route);
+      if (!circuit || circuit.state === 'closed') return 0;
+      return Math.max(0, circuit.openedAt + resetTimeout - Date.now());
+    },
+
+    stats(): Record<string, CircuitStats> {
+      const result: Record<string, CircuitStats> = {};
+      for (const [route, circuit] of circuits) {
+        result[route] = { state: circuit.state, failures: circuit.failures, openedAt: circuit.openedAt ? new Date(circuit.openedAt) : null };
+      }
+      return result;
+    }
+  };
+}
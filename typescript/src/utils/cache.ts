@@ -2,19 +2,26 @@
  * Caching utilities for Moltbook SDK
  */
 
+import { createTieredCache, DiskCacheOptions } from './diskcache';
+import { cacheKey, requestCacheKey } from './cachekey';
+
 export interface CacheEntry<T> {
   value: T;
   timestamp: number;
   expiresAt: number;
 }
 
-export interface CacheOptions {
+export interface CacheOptions<T = unknown> {
   /** Time to live in milliseconds */
   ttl?: number;
-  /** Maximum number of entries */
+  /** Maximum number of entries (default: 1000, or unbounded when `maxBytes` is set) */
   maxSize?: number;
   /** Whether to refresh TTL on access */
   refreshOnAccess?: boolean;
+  /** Maximum summed size of all entries in bytes; the oldest entries are evicted to stay under it */
+  maxBytes?: number;
+  /** Approximate retained size of a value in bytes (default: `estimateSize`) */
+  sizeOf?: (value: T) => number;
 }
 
 export interface Cache<T> {
@@ -38,92 +45,186 @@ export interface CacheStats {
   hitRate: number;
   oldestEntry: number | null;
   newestEntry: number | null;
+  /** Summed size of the entries held; only reported when `maxBytes` or `sizeOf` is set */
+  bytes?: number;
+  /** Summed size of the entries evicted to make room */
+  bytesEvicted?: number;
 }
 
 const DEFAULT_TTL = 5 * 60 * 1000; // 5 minutes
 const DEFAULT_MAX_SIZE = 1000;
+/** Tags whose last invalidation the response cache remembers individually */
+const MAX_INVALIDATED_TAGS = 10_000;
+/** Rough V8 costs: object or array header, and one property slot or array element */
+const OBJECT_OVERHEAD = 16;
+const SLOT_OVERHEAD = 8;
+
+/**
+ * Approximate retained size of a JSON-like value in bytes: strings at two
+ * bytes per character, numbers at eight, plus a header per object or array
+ * and a slot per property or element. Shared references are counted once.
+ */
+export function estimateSize(value: unknown, seen: Set<object> = new Set()): number {
+  switch (typeof value) {
+    case 'string': return OBJECT_OVERHEAD + 2 * value.length;
+    case 'number':
+    case 'bigint': return 8;
+    case 'boolean': return 4;
+    case 'object': {
+      if (value === null || seen.has(value)) return 0;
+      seen.add(value);
+      let size = OBJECT_OVERHEAD;
+      if (Array.isArray(value)) {
+        for (const item of value) size += SLOT_OVERHEAD + estimateSize(item, seen);
+      } else {
+        for (const key in value) size += SLOT_OVERHEAD + estimateSize((value as Record<string, unknown>)[key], seen);
+      }
+      return size;
+    }
+    default: return 0;
+  }
+}
+
+/** Cache entry threaded on two intrusive lists: insertion order (eviction) and expiry order */
+interface Node<T> extends CacheEntry<T> {
+  key: string;
+  prev: Node<T> | null;
+  next: Node<T> | null;
+  expPrev: Node<T> | null;
+  expNext: Node<T> | null;
+  /** Bytes counted against `maxBytes` */
+  size: number;
+}
 
-export function createCache<T>(options: CacheOptions = {}): Cache<T> {
-  const { ttl = DEFAULT_TTL, maxSize = DEFAULT_MAX_SIZE, refreshOnAccess = false } = options;
-  const store = new Map<string, CacheEntry<T>>();
+/**
+ * TTL cache with O(1) get, set and eviction. Entries sit on an insertion-order
+ * list, so the oldest is always the head, and on an expiry-order list. Every
+ * entry shares one TTL, so appending on set (or on access with
+ * `refreshOnAccess`) keeps the expiry list sorted, and expired entries are
+ * always a prefix of it: purging costs O(expired), never a scan.
+ *
+ * With `maxBytes`, each entry is weighed once on set and the oldest entries
+ * are evicted until the new one fits; a value larger than the whole budget is
+ * not cached at all.
+ */
+export function createCache<T>(options: CacheOptions<T> = {}): Cache<T> {
+  const { ttl = DEFAULT_TTL, refreshOnAccess = false, maxBytes = Infinity } = options;
+  const maxSize = options.maxSize ?? (options.maxBytes !== undefined ? Infinity : DEFAULT_MAX_SIZE);
+  const weighted = options.maxBytes !== undefined || options.sizeOf !== undefined;
+  const sizeOf = options.sizeOf ?? ((value: T) => estimateSize(value));
+  const store = new Map<string, Node<T>>();
+  let head: Node<T> | null = null;
+  let tail: Node<T> | null = null;
+  let expHead: Node<T> | null = null;
+  let expTail: Node<T> | null = null;
   let hits = 0;
   let misses = 0;
+  let bytes = 0;
+  let bytesEvicted = 0;
+
+  const link = (node: Node<T>): void => {
+    node.prev = tail;
+    node.next = null;
+    if (tail) tail.next = node; else head = node;
+    tail = node;
+  };
 
-  const isExpired = (entry: CacheEntry<T>): boolean => {
-    return Date.now() > entry.expiresAt;
+  const unlink = (node: Node<T>): void => {
+    if (node.prev) node.prev.next = node.next; else head = node.next;
+    if (node.next) node.next.prev = node.prev; else tail = node.prev;
   };
 
-  const evictOldest = (): void => {
-    if (store.size === 0) return;
-    
-    let oldestKey: string | null = null;
-    let oldestTime = Infinity;
-    
-    for (const [key, entry] of store) {
-      if (entry.timestamp < oldestTime) {
-        oldestTime = entry.timestamp;
-        oldestKey = key;
-      }
+  const linkExpiry = (node: Node<T>): void => {
+    node.expPrev = expTail;
+    node.expNext = null;
+    if (expTail) expTail.expNext = node; else expHead = node;
+    expTail = node;
+  };
+
+  const unlinkExpiry = (node: Node<T>): void => {
+    if (node.expPrev) node.expPrev.expNext = node.expNext; else expHead = node.expNext;
+    if (node.expNext) node.expNext.expPrev = node.expPrev; else expTail = node.expPrev;
+  };
+
+  const remove = (node: Node<T>): void => {
+    store.delete(node.key);
+    unlink(node);
+    unlinkExpiry(node);
+    bytes -= node.size;
+  };
+
+  const evict = (node: Node<T>): void => {
+    remove(node);
+    bytesEvicted += node.size;
+  };
+
+  const purgeExpired = (now: number = Date.now()): number => {
+    let purged = 0;
+    while (expHead && now > expHead.expiresAt) {
+      remove(expHead);
+      purged++;
+    }
+    return purged;
+  };
+
+  const live = (key: string): Node<T> | undefined => {
+    const node = store.get(key);
+    if (node && Date.now() > node.expiresAt) {
+      remove(node);
+      return undefined;
     }
-    
-    if (oldestKey) store.delete(oldestKey);
+    return node;
   };
 
   return {
     get(key: string): T | undefined {
-      const entry = store.get(key);
-      
-      if (!entry) {
-        misses++;
-        return undefined;
-      }
-      
-      if (isExpired(entry)) {
-        store.delete(key);
+      const node = live(key);
+      if (!node) {
         misses++;
         return undefined;
       }
-      
       hits++;
-      
       if (refreshOnAccess) {
-        entry.expiresAt = Date.now() + ttl;
+        node.expiresAt = Date.now() + ttl;
+        unlinkExpiry(node);
+        linkExpiry(node);
       }
-      
-      return entry.value;
+      return node.value;
     },
 
     set(key: string, value: T): void {
-      while (store.size >= maxSize) {
-        evictOldest();
-      }
-      
       const now = Date.now();
-      store.set(key, {
-        value,
-        timestamp: now,
-        expiresAt: now + ttl
-      });
+      const size = weighted ? sizeOf(value) : 0;
+      const existing = store.get(key);
+      if (existing) remove(existing);
+      if (size > maxBytes) return;
+      if (store.size >= maxSize || bytes + size > maxBytes) purgeExpired(now);
+      while ((store.size >= maxSize || bytes + size > maxBytes) && head) evict(head);
+      const node: Node<T> = { key, value, timestamp: now, expiresAt: now + ttl, prev: null, next: null, expPrev: null, expNext: null, size };
+      store.set(key, node);
+      bytes += size;
+      link(node);
+      linkExpiry(node);
     },
 
     has(key: string): boolean {
-      const entry = store.get(key);
-      if (!entry) return false;
-      if (isExpired(entry)) {
-        store.delete(key);
-        return false;
-      }
-      return true;
+      return live(key) !== undefined;
     },
 
     delete(key: string): boolean {
-      return store.delete(key);
+      const node = store.get(key);
+      if (!node) return false;
+      remove(node);
+      return true;
     },
 
     clear(): void {
       store.clear();
+      head = tail = expHead = expTail = null;
       hits = 0;
       misses = 0;
+      bytes = 0;
+      bytesEvicted = 0;
     },
 
     size(): number {
@@ -131,89 +232,138 @@ export function createCache<T>(options: CacheOptions = {}): Cache<T> {
     },
 
     keys(): string[] {
+      purgeExpired();
       const keys: string[] = [];
-      for (const [key, entry] of store) {
-        if (!isExpired(entry)) keys.push(key);
-      }
+      for (let node = head; node; node = node.next) keys.push(node.key);
       return keys;
     },
 
     values(): T[] {
+      purgeExpired();
       const values: T[] = [];
-      for (const [, entry] of store) {
-        if (!isExpired(entry)) values.push(entry.value);
-      }
+      for (let node = head; node; node = node.next) values.push(node.value);
       return values;
     },
 
     entries(): Array<[string, T]> {
+      purgeExpired();
       const entries: Array<[string, T]> = [];
-      for (const [key, entry] of store) {
-        if (!isExpired(entry)) entries.push([key, entry.value]);
-      }
+      for (let node = head; node; node = node.next) entries.push([node.key, node.value]);
       return entries;
     },
 
     cleanup(): number {
-      let cleaned = 0;
-      for (const [key, entry] of store) {
-        if (isExpired(entry)) {
-          store.delete(key);
-          cleaned++;
-        }
-      }
-      return cleaned;
+      return purgeExpired();
     },
 
     stats(): CacheStats {
+      purgeExpired();
       const total = hits + misses;
-      let oldest: number | null = null;
-      let newest: number | null = null;
-      
-      for (const [, entry] of store) {
-        if (oldest === null || entry.timestamp < oldest) oldest = entry.timestamp;
-        if (newest === null || entry.timestamp > newest) newest = entry.timestamp;
-      }
-      
       return {
         size: store.size,
         hits,
         misses,
         hitRate: total > 0 ? hits / total : 0,
-        oldestEntry: oldest,
-        newestEntry: newest
+        oldestEntry: head?.timestamp ?? null,
+        newestEntry: tail?.timestamp ?? null,
+        ...(weighted ? { bytes, bytesEvicted } : {})
       };
     }
   };
 }
 
-/** Create a memoized function with caching */
+export interface MemoizeOptions<Args extends unknown[], Result = unknown> extends CacheOptions<Result> {
+  /** Key for a call (default: `cacheKey(args)`, which ignores object key order) */
+  keyFn?: (...args: Args) => string;
+  /** After expiry, keep serving the old value for this long while one call refreshes it in the background (ms) */
+  staleWhileRevalidate?: number;
+  /** After expiry, fall back to the old value for this long if refreshing it fails (ms) */
+  staleIfError?: number;
+  /**
+   * Refresh a random caller's hit shortly before expiry, more eagerly the
+   * longer the value took to compute (XFetch's beta; default: 0, off)
+   */
+  earlyRefresh?: number;
+}
+
+/** A memoized value with the time it took to compute */
+interface Memo<T> {
+  value: T;
+  expiresAt: number;
+  delta: number;
+}
+
+/**
+ * Create a memoized function with caching. Concurrent misses share one call,
+ * rejections are never cached, and the stale and early-refresh windows let a
+ * hot key be refreshed by one caller while everyone else keeps the old value.
+ */
 export function memoize<Args extends unknown[], Result>(
   fn: (...args: Args) => Result | Promise<Result>,
-  options: CacheOptions & { keyFn?: (...args: Args) => string } = {}
+  options: MemoizeOptions<Args, Result> = {}
 ): (...args: Args) => Result | Promise<Result> {
-  const cache = createCache<Result>(options);
-  const keyFn = options.keyFn || ((...args: Args) => JSON.stringify(args));
-  
+  const { ttl = DEFAULT_TTL, staleWhileRevalidate = 0, staleIfError = 0, earlyRefresh = 0 } = options;
+  // Entries outlive `ttl` by the stale windows; freshness is judged from Memo.expiresAt
+  const { sizeOf } = options;
+  const cache = createCache<Memo<Result>>({
+    ...options,
+    ttl: ttl + Math.max(staleWhileRevalidate, staleIfError),
+    sizeOf: sizeOf && (memo => sizeOf(memo.value))
+  });
+  const inflight = new Map<string, Promise<Result>>();
+  const keyFn = options.keyFn || ((...args: Args) => cacheKey(args));
+
+  const compute = (key: string, args: Args): Result | Promise<Result> => {
+    const started = Date.now();
+    const store = (value: Result): Result => {
+      const now = Date.now();
+      cache.set(key, { value, expiresAt: now + ttl, delta: now - started });
+      return value;
+    };
+    const result = fn(...args);
+    if (!(result instanceof Promise)) return store(result);
+    const promise = result.then(store).finally(() => inflight.delete(key));
+    inflight.set(key, promise);
+    return promise;
+  };
+
+  const load = (key: string, args: Args): Result | Promise<Result> => inflight.get(key) ?? compute(key, args);
+
+  /** Refresh without making the caller wait; failures leave the old value in place */
+  const revalidate = (key: string, args: Args): void => {
+    if (inflight.has(key)) return;
+    try {
+      const result = compute(key, args);
+      if (result instanceof Promise) result.catch(() => {});
+    } catch {
+      // Keep serving the old value
+    }
+  };
+
   return (...args: Args) => {
     const key = keyFn(...args);
-    const cached = cache.get(key);
-    
-    if (cached !== undefined) {
-      return cached;
+    const memo = cache.get(key);
+    if (!memo) return load(key, args);
+
+    const now = Date.now();
+    if (now < memo.expiresAt) {
+      if (earlyRefresh > 0 && now - memo.delta * earlyRefresh * Math.log(Math.random()) >= memo.expiresAt) revalidate(key, args);
+      return memo.value;
     }
-    
-    const result = fn(...args);
-    
-    if (result instanceof Promise) {
-      return result.then(value => {
-        cache.set(key, value);
-        return value;
-      });
+    const staleFor = now - memo.expiresAt;
+    if (staleFor < staleWhileRevalidate) {
+      revalidate(key, args);
+      return memo.value;
     }
-    
-    cache.set(key, result);
-    return result;
+    if (staleFor < staleIfError) {
+      try {
+        const result = load(key, args);
+        return result instanceof Promise ? result.catch(() => memo.value) : result;
+      } catch {
+        return memo.value;
+      }
+    }
+    return load(key, args);
   };
 }
 
@@ -305,15 +455,37 @@ export interface ResponseCacheOptions extends CacheOptions {
   excludePaths?: string[];
   /** Paths to include in caching */
   includePaths?: string[];
+  /**
+   * Keep entries in segment files under `persist.dir` as well, so they outlive
+   * the process; the disk tier is bounded by `persist.maxBytes` and the memory
+   * tier by `maxSize` alone
+   */
+  persist?: DiskCacheOptions;
+  /** Key entries by a 64-bit hash of method, path and query instead of the full text (default: false) */
+  hashKeys?: boolean;
 }
 
 export function createResponseCache(options: ResponseCacheOptions = {}): {
   shouldCache: (method: string, path: string) => boolean;
   getCacheKey: (method: string, path: string, query?: Record<string, unknown>) => string;
   cache: Cache<unknown>;
+  /** Mark every entry carrying one of `tags` as stale; amortized O(tags), entries are checked when next looked up */
+  invalidate: (tags: readonly string[]) => void;
+  /** Whether an entry stored at `storedAt` has had one of its tags invalidated since */
+  isStale: (storedAt: number, tags?: readonly string[]) => boolean;
+  /** Persist the disk index and release file handles; a no-op without `persist` */
+  close: () => void;
 } {
-  const { getOnly = true, excludePaths = [], includePaths } = options;
-  const cache = createCache<unknown>(options);
+  const { getOnly = true, excludePaths = [], includePaths, persist, hashKeys = false } = options;
+  const tiered = persist ? createTieredCache<unknown>({ ...options, ...persist }) : null;
+  // Stored responses carry their body length, which stands in for their retained size
+  const cache = tiered ?? createCache<unknown>({ sizeOf: value => (value as { bytes?: number } | null)?.bytes ?? estimateSize(value), ...options });
+  // When each tag was last invalidated, oldest first. A stamp only has to outlive the entries stored
+  // before it: one TTL, unless refreshOnAccess lets a hot entry live on, and then so must the stamps
+  const stamps = new Map<string, number>();
+  const stampTtl = options.refreshOnAccess ? Infinity : options.ttl ?? DEFAULT_TTL;
+  // Stamps past MAX_INVALIDATED_TAGS fold into this one: any tagged entry stored before it is stale
+  let floor = -Infinity;
 
   return {
     shouldCache(method: string, path: string): boolean {
@@ -324,9 +496,41 @@ export function createResponseCache(options: ResponseCacheOptions = {}): {
     },
 
     getCacheKey(method: string, path: string, query?: Record<string, unknown>): string {
-      return `${method}:${path}:${query ? JSON.stringify(query) : ''}`;
+      return requestCacheKey(method, path, query, { hash: hashKeys });
+    },
+
+    cache,
+
+    invalidate(tags: readonly string[]): void {
+      const now = Date.now();
+      for (const [tag, invalidatedAt] of stamps) {
+        if (now - invalidatedAt <= stampTtl) break;
+        stamps.delete(tag);
+      }
+      for (const tag of tags) {
+        stamps.delete(tag);
+        stamps.set(tag, now);
+      }
+      for (const [tag, invalidatedAt] of stamps) {
+        if (stamps.size <= MAX_INVALIDATED_TAGS) break;
+        stamps.delete(tag);
+        floor = invalidatedAt;
+      }
     },
 
-    cache
+    isStale(storedAt: number, tags?: readonly string[]): boolean {
+      if (!tags || tags.length === 0) return false;
+      if (storedAt <= floor) return true;
+      for (const tag of tags) {
+        const invalidatedAt = stamps.get(tag);
+        // The same millisecond counts as after: better a refetch than a stale hit
+        if (invalidatedAt !== undefined && invalidatedAt >= storedAt) return true;
+      }
+      return false;
+    },
+
+    close(): void {
+      tiered?.close();
+    }
   };
 }
@@ -0,0 +1,128 @@
+/**
+ * Canonical cache keys
+ */
+
+export interface CacheKeyOptions {
+  /** Reduce the key to a 16-character 64-bit hash; costs a pass over the key, but long keys stay small in memory and on disk */
+  hash?: boolean;
+}
+
+/** Flat objects with more keys than this are sorted by the general path */
+const MAX_FLAT_KEYS = 32;
+
+/**
+ * Every token is self-delimiting, so keys never need escaping in the common
+ * case: keys and strings end in NUL, numbers in `;`, containers are bracketed.
+ * The rare key or string that contains NUL is written as JSON instead.
+ */
+const keyToken = (key: string): string => (key.indexOf('\0') === -1 ? key + '\0' : '\0' + JSON.stringify(key));
+const stringToken = (value: string): string => (value.indexOf('\0') === -1 ? 's' + value + '\0' : 'S' + JSON.stringify(value));
+
+/**
+ * Canonical form of any JSON-like value. Object keys are sorted and undefined
+ * properties skipped, matching how a query string treats them; `1` and `'1'`
+ * stay distinct.
+ */
+const encode = (value: unknown): string => {
+  switch (typeof value) {
+    case 'string': return stringToken(value);
+    case 'number': return 'n' + value + ';';
+    case 'boolean': return value ? 't' : 'f';
+    case 'bigint': return 'b' + value + ';';
+    case 'object': {
+      if (value === null) return 'z';
+      if (Array.isArray(value)) {
+        let result = '[';
+        for (const item of value) result += encode(item);
+        return result + ']';
+      }
+      const toJSON = (value as { toJSON?: () => unknown }).toJSON;
+      if (typeof toJSON === 'function') return 'j' + encode(toJSON.call(value));
+      const object = value as Record<string, unknown>;
+      let result = '{';
+      for (const key of Object.keys(object).sort()) {
+        const item = object[key];
+        if (item === undefined || typeof item === 'function' || typeof item === 'symbol') continue;
+        result += keyToken(key) + encode(item);
+      }
+      return result + '}';
+    }
+    default: return 'u';
+  }
+};
+
+/** Scratch space for the fast path; it never recurses, so one array suffices */
+const scratch: string[] = [];
+
+/**
+ * Fast path for flat objects of primitives, i.e. query objects: one pass
+ * with no allocation beyond the key itself, and an insertion sort that does
+ * no work when the keys already arrive in order. Produces exactly what
+ * `encode` would, or null as soon as a nested value turns up.
+ */
+const encodeFlat = (object: Record<string, unknown>): string | null => {
+  let count = 0;
+  let sorted = true;
+  for (const key in object) {
+    if (count === MAX_FLAT_KEYS) return null;
+    if (count > 0 && key < scratch[count - 1]) sorted = false;
+    scratch[count++] = key;
+  }
+  if (!sorted) {
+    for (let i = 1; i < count; i++) {
+      const key = scratch[i];
+      let j = i - 1;
+      for (; j >= 0 && scratch[j] > key; j--) scratch[j + 1] = scratch[j];
+      scratch[j + 1] = key;
+    }
+  }
+  let result = '{';
+  for (let i = 0; i < count; i++) {
+    const key = scratch[i];
+    const value = object[key];
+    if (value === undefined) continue;
+    // Keys and strings with NUL take the general path, which writes them as JSON
+    if (key.indexOf('\0') !== -1) return null;
+    if (typeof value === 'string') {
+      if (value.indexOf('\0') !== -1) return null;
+      result += `${key}\0s${value}\0`;
+    } else if (typeof value === 'number') result += `${key}\0n${value};`;
+    else if (typeof value === 'boolean') result += value ? `${key}\0t` : `${key}\0f`;
+    else if (value === null) result += `${key}\0z`;
+    else return null;
+  }
+  return result + '}';
+};
+
+/** 64-bit hash of a string as 16 hex characters, from two 32-bit multiply-xorshift lanes */
+export function hash64(text: string): string {
+  let h1 = 0xdeadbeef;
+  let h2 = 0x41c6ce57;
+  for (let i = 0; i < text.length; i++) {
+    const code = text.charCodeAt(i);
+    h1 = Math.imul(h1 ^ code, 2654435761);
+    h2 = Math.imul(h2 ^ code, 1597334677);
+  }
+  h1 = Math.imul(h1 ^ (h1 >>> 16), 2246822507) ^ Math.imul(h2 ^ (h2 >>> 13), 3266489909);
+  h2 = Math.imul(h2 ^ (h2 >>> 16), 2246822507) ^ Math.imul(h1 ^ (h1 >>> 13), 3266489909);
+  return (h2 >>> 0).toString(16).padStart(8, '0') + (h1 >>> 0).toString(16).padStart(8, '0');
+}
+
+/**
+ * Canonical key for a JSON-like value: `{ a: 1, b: 2 }` and `{ b: 2, a: 1 }`
+ * give the same key. Plain objects of primitives take a single-pass fast path.
+ */
+export function cacheKey(value: unknown, options: CacheKeyOptions = {}): string {
+  let key: string | null = null;
+  if (typeof value === 'object' && value !== null && Object.getPrototypeOf(value) === Object.prototype) {
+    key = encodeFlat(value as Record<string, unknown>);
+  }
+  if (key === null) key = encode(value);
+  return options.hash ? hash64(key) : key;
+}
+
+/** Key for a GET-style request: method and path verbatim, then the canonical query */
+export function requestCacheKey(method: string, path: string, query?: object, options: CacheKeyOptions = {}): string {
+  const key = method + ' ' + path + ' ' + cacheKey(query ?? {});
+  return options.hash ? hash64(key) : key;
+}
@@ -0,0 +1,110 @@
+/**
+ * Content-Encoding negotiation and byte accounting
+ */
+
+import * as zlib from 'node:zlib';
+import type { CompressionOptions, CompressionStats, RouteCompressionStats } from '../types';
+
+export interface Compression {
+  /**
+   * Compress a request body when it is large enough and the server accepts an
+   * encoding. A `resend` of a body already counted, e.g. after a 415, only adds
+   * to the bytes sent.
+   */
+  encodeRequest(route: string, body: Uint8Array, resend?: boolean): { body: Uint8Array; encoding: string | null };
+  /** Learn which request encodings the server accepts from its Accept-Encoding header (RFC 7694) */
+  observe(headers: Headers): void;
+  /** Stop compressing request bodies, e.g. after a 415 */
+  disable(): void;
+  /** Count the response body as it is read; `wireBytes` reports the size the transport received */
+  measure(route: string, response: Response, wireBytes: () => number | null): Response;
+  stats(): CompressionStats;
+}
+
+const DEFAULT_REQUEST_THRESHOLD = 1024;
+/** Quality 11 is far too slow for request bodies; 5 is close to gzip speed at a better ratio */
+const BROTLI_QUALITY = 5;
+
+/** Decoder for a response Content-Encoding, or null when the body is not encoded */
+export function createDecoder(encoding: string | null | undefined): zlib.Gunzip | zlib.Inflate | zlib.BrotliDecompress | null {
+  switch (encoding?.trim().toLowerCase()) {
+    case 'gzip':
+    case 'x-gzip':
+      return zlib.createGunzip({ flush: zlib.constants.Z_SYNC_FLUSH, finishFlush: zlib.constants.Z_SYNC_FLUSH });
+    case 'deflate':
+      return zlib.createInflate({ flush: zlib.constants.Z_SYNC_FLUSH, finishFlush: zlib.constants.Z_SYNC_FLUSH });
+    case 'br':
+      return zlib.createBrotliDecompress({ flush: zlib.constants.BROTLI_OPERATION_FLUSH, finishFlush: zlib.constants.BROTLI_OPERATION_FLUSH });
+    default:
+      return null;
+  }
+}
+
+export function createCompression(options: CompressionOptions = {}): Compression {
+  const { requestThreshold = DEFAULT_REQUEST_THRESHOLD, requestCompression = 'auto' } = options;
+  const routes: Record<string, RouteCompressionStats> = {};
+  let accepted: string[] = requestCompression === 'always' ? ['gzip'] : [];
+  let enabled = requestCompression !== false;
+
+  const routeStats = (route: string): RouteCompressionStats =>
+    routes[route] ??= { responses: 0, encodedResponses: 0, wireBytes: 0, decodedBytes: 0, unmeasured: 0, requestBytes: 0, requestBytesSent: 0 };
+
+  return {
+    encodeRequest(route: string, body: Uint8Array, resend = false): { body: Uint8Array; encoding: string | null } {
+      const stats = routeStats(route);
+      if (!resend) stats.requestBytes += body.byteLength;
+      let encoding: string | null = null;
+      if (enabled && body.byteLength >= requestThreshold) {
+        if (accepted.includes('br')) {
+          encoding = 'br';
+          body = zlib.brotliCompressSync(body, { params: { [zlib.constants.BROTLI_PARAM_QUALITY]: BROTLI_QUALITY, [zlib.constants.BROTLI_PARAM_SIZE_HINT]: body.byteLength } });
+        } else if (accepted.includes('gzip')) {
+          encoding = 'gzip';
+          body = zlib.gzipSync(body);
+        }
+      }
+      stats.requestBytesSent += body.byteLength;
+      return { body, encoding };
+    },
+
+    observe(headers: Headers): void {
+      if (requestCompression !== 'auto' || !enabled) return;
+      const header = headers.get('Accept-Encoding');
+      if (header) accepted = header.split(',').map(e => e.split(';')[0]!.trim().toLowerCase()).filter(e => e === 'gzip' || e === 'br');
+    },
+
+    disable(): void {
+      enabled = false;
+    },
+
+    measure(route: string, response: Response, wireBytes: () => number | null): Response {
+      const stats = routeStats(route);
+      stats.responses++;
+      if (!response.body) return response;
+      const encoding = response.headers.get('Content-Encoding');
+      const encoded = encoding !== null && encoding.toLowerCase() !== 'identity';
+      if (encoded) stats.encodedResponses++;
+      const length = response.headers.get('Content-Length');
+      let decoded = 0;
+      const counter = new TransformStream<Uint8Array, Uint8Array>({
+        transform(chunk, controller) {
+          decoded += chunk.byteLength;
+          controller.enqueue(chunk);
+        },
+        flush() {
+          const wire = !encoded ? decoded : length !== null ? Number(length) : wireBytes();
+          if (wire === null) { stats.unmeasured++; return; }
+          stats.wireBytes += wire;
+          stats.decodedBytes += decoded;
+        }
+      });
+      return new Response(response.body.pipeThrough(counter), { status: response.status, statusText: response.statusText, headers: response.headers });
+    },
+
+    stats(): CompressionStats {
+      const copy: Record<string, RouteCompressionStats> = {};
+      for (const route in routes) copy[route] = { ...routes[route]! };
+      return { serverEncodings: [...accepted], requestCompression: enabled && accepted.length > 0, routes: copy };
+    }
+  };
+}
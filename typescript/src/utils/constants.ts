@@ -2,6 +2,8 @@
  * SDK Constants and Configuration Defaults
  */
 
+import { compileRoute } from './routes';
+
 export const DEFAULT_BASE_URL = 'https://www.moltbook.com/api/v1';
 export const DEFAULT_TIMEOUT = 30000;
 export const DEFAULT_RETRIES = 3;
@@ -28,7 +30,7 @@ export const ERROR_CODES = {
   BAD_REQUEST: 'BAD_REQUEST', VALIDATION_ERROR: 'VALIDATION_ERROR',
   RATE_LIMITED: 'RATE_LIMITED', CONFLICT: 'CONFLICT', INTERNAL_ERROR: 'INTERNAL_ERROR',
   NETWORK_ERROR: 'NETWORK_ERROR', TIMEOUT: 'TIMEOUT', SELF_VOTE: 'SELF_VOTE',
-  EMPTY_CONTENT: 'EMPTY_CONTENT', MAX_DEPTH: 'MAX_DEPTH'
+  EMPTY_CONTENT: 'EMPTY_CONTENT', MAX_DEPTH: 'MAX_DEPTH', CIRCUIT_OPEN: 'CIRCUIT_OPEN'
 } as const;
 
 export const LIMITS = {
@@ -47,20 +49,29 @@ export const TIME_RANGES = ['hour', 'day', 'week', 'month', 'year', 'all'] as co
 
 export const ENDPOINTS = {
   REGISTER: '/agents/register', ME: '/agents/me', PROFILE: '/agents/profile', STATUS: '/agents/status',
-  FOLLOW: (name: string) => `/agents/${name}/follow`,
-  POSTS: '/posts', POST: (id: string) => `/posts/${id}`,
-  POST_UPVOTE: (id: string) => `/posts/${id}/upvote`,
-  POST_DOWNVOTE: (id: string) => `/posts/${id}/downvote`,
-  POST_COMMENTS: (id: string) => `/posts/${id}/comments`,
-  COMMENT: (id: string) => `/comments/${id}`,
-  COMMENT_UPVOTE: (id: string) => `/comments/${id}/upvote`,
-  COMMENT_DOWNVOTE: (id: string) => `/comments/${id}/downvote`,
-  SUBMOLTS: '/submolts', SUBMOLT: (name: string) => `/submolts/${name}`,
-  SUBMOLT_SUBSCRIBE: (name: string) => `/submolts/${name}/subscribe`,
-  SUBMOLT_FEED: (name: string) => `/submolts/${name}/feed`,
+  FOLLOW: compileRoute('/agents/:name/follow'),
+  POSTS: '/posts', POST: compileRoute('/posts/:id'),
+  POST_UPVOTE: compileRoute('/posts/:id/upvote'),
+  POST_DOWNVOTE: compileRoute('/posts/:id/downvote'),
+  POST_COMMENTS: compileRoute('/posts/:id/comments'),
+  COMMENT: compileRoute('/comments/:id'),
+  COMMENT_UPVOTE: compileRoute('/comments/:id/upvote'),
+  COMMENT_DOWNVOTE: compileRoute('/comments/:id/downvote'),
+  SUBMOLTS: '/submolts', SUBMOLT: compileRoute('/submolts/:name'),
+  SUBMOLT_SUBSCRIBE: compileRoute('/submolts/:name/subscribe'),
+  SUBMOLT_FEED: compileRoute('/submolts/:name/feed'),
   FEED: '/feed', SEARCH: '/search'
 } as const;
 
+/** Response cache tags; listings are also tagged with every post, comment or submolt they contain */
+export const CACHE_TAGS = {
+  ME: 'agent:me', AGENT: (name: string) => `agent:${name}`,
+  POSTS: 'posts', POST: (id: string) => `post:${id}`, POST_COMMENTS: (id: string) => `post:${id}:comments`,
+  COMMENT: (id: string) => `comment:${id}`,
+  SUBMOLTS: 'submolts', SUBMOLT: (name: string) => `submolt:${name}`, SUBMOLT_FEED: (name: string) => `submolt:${name}:feed`,
+  FEED: 'feed'
+} as const;
+
 export const REGEX = {
   AGENT_NAME: /^[a-z0-9_]{2,32}$/i,
   SUBMOLT_NAME: /^[a-z0-9_]{2,24}$/i,
@@ -0,0 +1,388 @@
+/**
+ * Disk-backed cache tier: append-only segment files plus a persisted index
+ */
+
+import * as fs from 'node:fs';
+import * as nodePath from 'node:path';
+import type { Cache, CacheOptions, CacheStats } from './cache';
+import { createCache } from './cache';
+
+export interface DiskCacheOptions {
+  /** Directory for segment files and the index; use one per API key */
+  dir: string;
+  /** Upper bound for all segment files together (bytes, default: 64 MiB) */
+  maxBytes?: number;
+  /** Size at which the active segment is sealed and a new one started (bytes, default: 4 MiB) */
+  segmentSize?: number;
+}
+
+export interface DiskCacheStats {
+  /** Live records on disk */
+  entries: number;
+  segments: number;
+  /** Bytes across all segment files, live or dead */
+  bytes: number;
+  /** Bytes still referenced by the index */
+  liveBytes: number;
+  /** Records read back from disk on a memory miss */
+  diskHits: number;
+  /** Entries dropped, least recently used first, to stay under maxBytes */
+  evictions: number;
+  /** Sealed segments reclaimed, either deleted outright or with their live records copied forward */
+  compactions: number;
+}
+
+export interface TieredCache<T> extends Cache<T> {
+  /** Persist the index so the next process starts warm */
+  flush(): void;
+  /** Persist the index and close the segment files; afterwards the cache is empty and ignores writes */
+  close(): void;
+  diskStats(): DiskCacheStats;
+}
+
+/** Where a record lives; the Map holding these is kept in LRU order */
+interface Location {
+  segment: number;
+  offset: number;
+  length: number;
+  timestamp: number;
+  expiresAt: number;
+}
+
+interface Segment {
+  id: number;
+  fd: number;
+  size: number;
+  live: number;
+}
+
+/** One line per record; `d` marks a deletion */
+interface DiskRecord {
+  k: string;
+  t?: number;
+  e?: number;
+  v?: unknown;
+  d?: 1;
+}
+
+interface IndexFile {
+  version: 1;
+  segments: Array<[id: number, size: number]>;
+  entries: Array<[key: string, segment: number, offset: number, length: number, timestamp: number, expiresAt: number]>;
+}
+
+const DEFAULT_TTL = 5 * 60 * 1000;
+const DEFAULT_MAX_BYTES = 64 * 1024 * 1024;
+const DEFAULT_SEGMENT_SIZE = 4 * 1024 * 1024;
+/** LRU eviction frees space down to this share of maxBytes so compaction has room to work */
+const EVICT_TARGET = 0.75;
+const INDEX_FILE = 'index.json';
+const SEGMENT_PATTERN = /^segment-(\d+)\.log$/;
+
+const segmentName = (id: number): string => `segment-${String(id).padStart(8, '0')}.log`;
+
+/**
+ * Put a disk tier behind an in-memory `createCache`. Every set is appended to
+ * the active segment; a memory miss reads the record back with one positioned
+ * read and promotes it. TTLs are the memory policy's and survive restarts;
+ * with `refreshOnAccess`, a hit on either tier extends the entry's expiry.
+ *
+ * On open, the persisted index is loaded and only the bytes appended after it
+ * was written are scanned, so a cold start costs one small JSON parse. When
+ * the segments outgrow `maxBytes`, the least recently used entries are dropped
+ * and the emptiest sealed segments are rewritten. Disk I/O is synchronous; it
+ * only runs after a network round trip has already been paid.
+ */
+export function createTieredCache<T>(options: CacheOptions & DiskCacheOptions): TieredCache<T> {
+  const { dir, ttl = DEFAULT_TTL, refreshOnAccess = false, maxBytes = DEFAULT_MAX_BYTES, segmentSize = DEFAULT_SEGMENT_SIZE } = options;
+  // The memory tier is bounded by count; `maxBytes` here is the disk budget
+  const memory = createCache<{ value: T; expiresAt: number }>({ ttl, maxSize: options.maxSize, refreshOnAccess });
+  const index = new Map<string, Location>();
+  const segments = new Map<number, Segment>();
+  let active!: Segment;
+  let hits = 0;
+  let misses = 0;
+  let closed = false;
+  const counters = { diskHits: 0, evictions: 0, compactions: 0 };
+
+  fs.mkdirSync(dir, { recursive: true });
+
+  const openSegment = (id: number): Segment => {
+    const fd = fs.openSync(nodePath.join(dir, segmentName(id)), 'a+');
+    const segment = { id, fd, size: fs.fstatSync(fd).size, live: 0 };
+    segments.set(id, segment);
+    return segment;
+  };
+
+  const forget = (key: string): void => {
+    const location = index.get(key);
+    if (!location) return;
+    index.delete(key);
+    const segment = segments.get(location.segment);
+    if (segment) segment.live -= location.length;
+  };
+
+  const remember = (key: string, location: Location): void => {
+    forget(key);
+    index.set(key, location);
+    segments.get(location.segment)!.live += location.length;
+  };
+
+  const append = (record: DiskRecord): { segment: number; offset: number; length: number } => {
+    if (active.size >= segmentSize) active = openSegment(active.id + 1);
+    const bytes = Buffer.from(JSON.stringify(record) + '\n');
+    const offset = active.size;
+    fs.writeSync(active.fd, bytes, 0, bytes.length, offset);
+    active.size += bytes.length;
+    return { segment: active.id, offset, length: bytes.length };
+  };
+
+  const read = (location: Location): DiskRecord | null => {
+    const segment = segments.get(location.segment);
+    if (!segment) return null;
+    const buffer = Buffer.alloc(location.length);
+    fs.readSync(segment.fd, buffer, 0, location.length, location.offset);
+    try { return JSON.parse(buffer.toString('utf8')) as DiskRecord; } catch { return null; }
+  };
+
+  /** Replay records at or after `from` into the index */
+  const scan = (segment: Segment, from: number): void => {
+    if (segment.size <= from) return;
+    const buffer = Buffer.alloc(segment.size - from);
+    fs.readSync(segment.fd, buffer, 0, buffer.length, from);
+    let start = 0;
+    for (let end = buffer.indexOf(10); end !== -1; start = end + 1, end = buffer.indexOf(10, start)) {
+      let record: DiskRecord;
+      try { record = JSON.parse(buffer.toString('utf8', start, end)) as DiskRecord; } catch { continue; }
+      if (record.d) forget(record.k);
+      else remember(record.k, { segment: segment.id, offset: from + start, length: end - start + 1, timestamp: record.t ?? 0, expiresAt: record.e ?? 0 });
+    }
+    // A torn final record from a crash is cut off so later appends start on a clean line
+    if (start < buffer.length) {
+      fs.ftruncateSync(segment.fd, from + start);
+      segment.size = from + start;
+    }
+  };
+
+  const writeIndex = (): void => {
+    const snapshot: IndexFile = {
+      version: 1,
+      segments: [...segments.values()].map(s => [s.id, s.size]),
+      entries: [...index].map(([key, l]) => [key, l.segment, l.offset, l.length, l.timestamp, l.expiresAt])
+    };
+    const path = nodePath.join(dir, INDEX_FILE);
+    fs.writeFileSync(`${path}.tmp`, JSON.stringify(snapshot));
+    fs.renameSync(`${path}.tmp`, path);
+  };
+
+  const load = (): void => {
+    const ids = fs.readdirSync(dir).map(name => SEGMENT_PATTERN.exec(name)).filter((m): m is RegExpExecArray => m !== null).map(m => Number(m[1])).sort((a, b) => a - b);
+    ids.forEach(openSegment);
+    let indexed = new Map<number, number>();
+    try {
+      const snapshot = JSON.parse(fs.readFileSync(nodePath.join(dir, INDEX_FILE), 'utf8')) as IndexFile;
+      if (snapshot.version === 1) {
+        indexed = new Map(snapshot.segments);
+        const now = Date.now();
+        for (const [key, segment, offset, length, timestamp, expiresAt] of snapshot.entries) {
+          const current = segments.get(segment);
+          // Entries in segments that shrank or vanished since the snapshot can't be trusted
+          if (!current || current.size < (indexed.get(segment) ?? Infinity) || expiresAt <= now) continue;
+          remember(key, { segment, offset, length, timestamp, expiresAt });
+        }
+      }
+    } catch {
+      indexed = new Map();
+    }
+    for (const segment of segments.values()) {
+      const known = indexed.get(segment.id);
+      scan(segment, known !== undefined && known <= segment.size ? known : 0);
+    }
+    active = ids.length > 0 ? segments.get(ids[ids.length - 1])! : openSegment(1);
+  };
+
+  const totalBytes = (): number => {
+    let total = 0;
+    for (const segment of segments.values()) total += segment.size;
+    return total;
+  };
+
+  const liveBytes = (): number => {
+    let total = 0;
+    for (const segment of segments.values()) total += segment.live;
+    return total;
+  };
+
+  const dropSegment = (segment: Segment): void => {
+    fs.closeSync(segment.fd);
+    fs.unlinkSync(nodePath.join(dir, segmentName(segment.id)));
+    segments.delete(segment.id);
+  };
+
+  /** Copy a sealed segment's live records into the active one and delete it */
+  const compactSegment = (segment: Segment): void => {
+    for (const [key, location] of [...index]) {
+      if (location.segment !== segment.id) continue;
+      const record = read(location);
+      if (!record) { forget(key); continue; }
+      // Set in place so the key keeps its LRU position
+      const moved = { ...location, ...append(record) };
+      index.set(key, moved);
+      segments.get(moved.segment)!.live += moved.length;
+    }
+    dropSegment(segment);
+  };
+
+  const enforceBudget = (): void => {
+    if (totalBytes() <= maxBytes) return;
+    // The index iterates least recently used first
+    for (const key of index.keys()) {
+      if (liveBytes() <= maxBytes * EVICT_TARGET) break;
+      forget(key);
+      memory.delete(key);
+      counters.evictions++;
+    }
+    const sealed = [...segments.values()].filter(s => s !== active).sort((a, b) => a.live / a.size - b.live / b.size);
+    for (const segment of sealed) {
+      if (totalBytes() <= maxBytes) break;
+      if (segment.live === 0) dropSegment(segment);
+      else compactSegment(segment);
+      counters.compactions++;
+    }
+    writeIndex();
+  };
+
+  const getLocation = (key: string): Location | undefined => {
+    const location = index.get(key);
+    if (location && location.expiresAt <= Date.now()) { forget(key); return undefined; }
+    return location;
+  };
+
+  /** Move a hit to the most recently used end of the index; under refreshOnAccess, restart its TTL */
+  const touch = (key: string, location: Location, now: number): void => {
+    index.delete(key);
+    index.set(key, location);
+    // Only the index records the new expiry; it is persisted with the index on flush
+    if (refreshOnAccess) location.expiresAt = now + ttl;
+  };
+
+  load();
+
+  return {
+    get(key: string): T | undefined {
+      const now = Date.now();
+      const cached = memory.get(key);
+      if (cached && cached.expiresAt > now) {
+        const location = index.get(key);
+        if (location) touch(key, location, now);
+        if (refreshOnAccess) cached.expiresAt = now + ttl;
+        hits++;
+        return cached.value;
+      }
+      const location = getLocation(key);
+      const record = location && read(location);
+      if (!location || !record) { misses++; return undefined; }
+      touch(key, location, now);
+      memory.set(key, { value: record.v as T, expiresAt: location.expiresAt });
+      hits++;
+      counters.diskHits++;
+      return record.v as T;
+    },
+
+    set(key: string, value: T): void {
+      if (closed) return;
+      const timestamp = Date.now();
+      const expiresAt = timestamp + ttl;
+      memory.set(key, { value, expiresAt });
+      remember(key, { timestamp, expiresAt, ...append({ k: key, t: timestamp, e: expiresAt, v: value }) });
+      enforceBudget();
+    },
+
+    has(key: string): boolean {
+      return getLocation(key) !== undefined;
+    },
+
+    delete(key: string): boolean {
+      memory.delete(key);
+      if (!index.has(key)) return false;
+      forget(key);
+      append({ k: key, d: 1 });
+      return true;
+    },
+
+    clear(): void {
+      if (closed) return;
+      memory.clear();
+      index.clear();
+      for (const segment of [...segments.values()]) dropSegment(segment);
+      active = openSegment(1);
+      writeIndex();
+      hits = 0;
+      misses = 0;
+    },
+
+    size(): number {
+      return index.size;
+    },
+
+    keys(): string[] {
+      const now = Date.now();
+      return [...index].filter(([, l]) => l.expiresAt > now).map(([key]) => key);
+    },
+
+    values(): T[] {
+      return this.entries().map(([, value]) => value);
+    },
+
+    entries(): Array<[string, T]> {
+      const result: Array<[string, T]> = [];
+      for (const key of this.keys()) {
+        const record = read(index.get(key)!);
+        if (record) result.push([key, record.v as T]);
+      }
+      return result;
+    },
+
+    cleanup(): number {
+      const now = Date.now();
+      let cleaned = 0;
+      for (const [key, location] of [...index]) {
+        if (location.expiresAt > now) continue;
+        forget(key);
+        memory.delete(key);
+        cleaned++;
+      }
+      return cleaned;
+    },
+
+    stats(): CacheStats {
+      const total = hits + misses;
+      let oldest: number | null = null;
+      let newest: number | null = null;
+      for (const location of index.values()) {
+        if (oldest === null || location.timestamp < oldest) oldest = location.timestamp;
+        if (newest === null || location.timestamp > newest) newest = location.timestamp;
+      }
+      return { size: index.size, hits, misses, hitRate: total > 0 ? hits / total : 0, oldestEntry: oldest, newestEntry: newest };
+    },
+
+    flush(): void {
+      if (!closed) writeIndex();
+    },
+
+    close(): void {
+      if (closed) return;
+      writeIndex();
+      for (const segment of segments.values()) fs.closeSync(segment.fd);
+      segments.clear();
+      // With the index empty, reads miss and deletes find nothing, so no closed fd is touched
+      index.clear();
+      memory.clear();
+      closed = true;
+    },
+
+    diskStats(): DiskCacheStats {
+      return { entries: index.size, segments: segments.size, bytes: totalBytes(), liveBytes: liveBytes(), ...counters };
+    }
+  };
+}
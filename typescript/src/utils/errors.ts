@@ -91,6 +91,18 @@ export class TimeoutError extends MoltbookError {
   }
 }
 
+export class CircuitOpenError extends MoltbookError {
+  readonly route: string;
+  readonly retryAfter: number;
+
+  constructor(route: string, retryAfterMs: number = 0) {
+    super(`Circuit open for ${route}`, 503, 'CIRCUIT_OPEN', `Server is failing; probing again in ${Math.ceil(retryAfterMs / 1000)} seconds`);
+    this.name = 'CircuitOpenError';
+    this.route = route;
+    this.retryAfter = Math.ceil(retryAfterMs / 1000);
+  }
+}
+
 export class ConfigurationError extends Error {
   constructor(message: string) {
     super(message);
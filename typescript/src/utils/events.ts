@@ -9,20 +9,28 @@ export type EventType = typeof EVENTS[keyof typeof EVENTS];
 export interface RequestStartEvent {
   method: string;
   path: string;
+  /** Route template, e.g. `GET /posts/:id` */
+  route: string;
   timestamp: number;
 }
 
 export interface RequestEndEvent {
   method: string;
   path: string;
+  route: string;
+  /** Milliseconds from the first attempt being queued to the decoded response */
   duration: number;
   status: number;
+  retries: number;
 }
 
 export interface RequestErrorEvent {
   method: string;
   path: string;
+  route: string;
   error: Error;
+  duration: number;
+  retries: number;
 }
 
 export interface RateLimitEvent {
@@ -32,6 +40,7 @@ export interface RateLimitEvent {
 }
 
 export interface RetryEvent {
+  route: string;
   attempt: number;
   maxAttempts: number;
   delay: number;
@@ -0,0 +1,86 @@
+/**
+ * Hedging policy for idempotent requests
+ */
+
+import type { HedgingOptions, HedgingStats } from '../types';
+import { createRetryBudget } from './retry';
+
+export interface HedgingPolicy {
+  /** Delay after which a second attempt is sent, or null when the route should not be hedged */
+  delayFor(route: string): number | null;
+  /** Record how long a response on this route took to arrive */
+  record(route: string, latency: number): void;
+  /** Spend hedge budget; false when hedges already exceed maxHedgeRate of traffic */
+  tryHedge(): boolean;
+  /** Count a response won by the hedged attempt */
+  won(): void;
+  stats(): HedgingStats;
+}
+
+const SAMPLE_SIZE = 128;
+const RECOMPUTE_EVERY = 16;
+const DEFAULT_PERCENTILE = 0.95;
+const DEFAULT_MIN_DELAY = 20;
+const DEFAULT_MIN_SAMPLES = 20;
+const DEFAULT_MAX_HEDGE_RATE = 0.1;
+
+interface LatencySamples {
+  values: Float64Array;
+  count: number;
+  next: number;
+  threshold: number | null;
+}
+
+export function createHedgingPolicy(options: HedgingOptions = {}): HedgingPolicy {
+  const { percentile = DEFAULT_PERCENTILE, minDelay = DEFAULT_MIN_DELAY, minSamples = DEFAULT_MIN_SAMPLES, maxHedgeRate = DEFAULT_MAX_HEDGE_RATE, routes } = options;
+  const allowed = routes ? new Set(routes) : null;
+  const samples = new Map<string, LatencySamples>();
+  const budget = createRetryBudget({ ratio: maxHedgeRate, minRetriesPerSecond: 0 });
+  let requests = 0;
+  let hedged = 0;
+  let wins = 0;
+
+  const recompute = (s: LatencySamples): void => {
+    const n = Math.min(s.count, SAMPLE_SIZE);
+    const sorted = s.values.slice(0, n).sort();
+    s.threshold = Math.max(minDelay, sorted[Math.min(n - 1, Math.floor(n * percentile))]!);
+  };
+
+  return {
+    delayFor(route: string): number | null {
+      if (allowed && !allowed.has(route)) return null;
+      requests++;
+      budget.recordRequest();
+      const s = samples.get(route);
+      return s && s.count >= minSamples ? s.threshold : null;
+    },
+
+    record(route: string, latency: number): void {
+      let s = samples.get(route);
+      if (!s) {
+        s = { values: new Float64Array(SAMPLE_SIZE), count: 0, next: 0, threshold: null };
+        samples.set(route, s);
+      }
+      s.values[s.next] = latency;
+      s.next = (s.next + 1) % SAMPLE_SIZE;
+      s.count++;
+      if (s.count >= minSamples && (s.threshold === null || s.count % RECOMPUTE_EVERY === 0)) recompute(s);
+    },
+
+    tryHedge(): boolean {
+      if (!budget.tryRetry()) return false;
+      hedged++;
+      return true;
+    },
+
+    won(): void {
+      wins++;
+    },
+
+    stats(): HedgingStats {
+      const thresholds: Record<string, number> = {};
+      for (const [route, s] of samples) if (s.threshold !== null) thresholds[route] = s.threshold;
+      return { requests, hedged, wins, rejected: budget.stats().rejected, thresholds };
+    }
+  };
+}
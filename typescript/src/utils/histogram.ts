@@ -0,0 +1,149 @@
+/**
+ * HDR-style latency histograms keyed by route template
+ */
+
+import type { RouteLatencyStats } from '../types';
+import type { RequestEndEvent, RequestErrorEvent, RetryEvent } from './events';
+
+/** 64 linear sub-buckets per power of two keeps every bucket within ~1.6% of its values */
+const SUB_BUCKET_BITS = 6;
+const SUB_BUCKETS = 1 << SUB_BUCKET_BITS;
+/** Values are recorded in microseconds up to 2^(MAX_SHIFT + SUB_BUCKET_BITS + 1) µs, ~71.6 minutes; anything longer lands in the last bucket */
+const MAX_SHIFT = 31 - SUB_BUCKET_BITS;
+const BUCKET_COUNT = (MAX_SHIFT + 2) * SUB_BUCKETS;
+
+export interface Histogram {
+  /** Record a duration in milliseconds */
+  record(ms: number): void;
+  /** Upper bound (ms) of the bucket holding the given quantile, 0 when empty */
+  percentile(quantile: number): number;
+  count(): number;
+  max(): number;
+  mean(): number;
+  reset(): void;
+}
+
+const bucketOf = (value: number): number => {
+  if (value < SUB_BUCKETS) return value;
+  const shift = Math.min(31 - Math.clz32(value) - SUB_BUCKET_BITS, MAX_SHIFT);
+  return Math.min((shift + 1) * SUB_BUCKETS + (value >>> shift) - SUB_BUCKETS, BUCKET_COUNT - 1);
+};
+
+const upperBoundOf = (index: number): number => {
+  if (index < SUB_BUCKETS) return index;
+  const shift = Math.floor(index / SUB_BUCKETS) - 1;
+  return ((index % SUB_BUCKETS + SUB_BUCKETS + 1) * 2 ** shift) - 1;
+};
+
+/** Fixed-size log-linear histogram: O(1) record, O(buckets) percentile, no allocation per sample */
+export function createHistogram(): Histogram {
+  const counts = new Uint32Array(BUCKET_COUNT);
+  let total = 0;
+  let sum = 0;
+  let maxValue = 0;
+
+  return {
+    record(ms: number): void {
+      const micros = Math.max(0, Math.min(Math.round(ms * 1000), 0xffffffff));
+      counts[bucketOf(micros)]!++;
+      total++;
+      sum += ms;
+      if (ms > maxValue) maxValue = ms;
+    },
+
+    percentile(quantile: number): number {
+      if (total === 0) return 0;
+      const target = Math.max(1, Math.ceil(quantile * total));
+      let seen = 0;
+      for (let i = 0; i < BUCKET_COUNT; i++) {
+        seen += counts[i]!;
+        if (seen >= target) return Math.min(upperBoundOf(i) / 1000, maxValue);
+      }
+      return maxValue;
+    },
+
+    count(): number {
+      return total;
+    },
+
+    max(): number {
+      return maxValue;
+    },
+
+    mean(): number {
+      return total === 0 ? 0 : sum / total;
+    },
+
+    reset(): void {
+      counts.fill(0);
+      total = 0;
+      sum = 0;
+      maxValue = 0;
+    }
+  };
+}
+
+export interface LatencyRecorder {
+  end(event: RequestEndEvent): void;
+  error(event: RequestErrorEvent): void;
+  retry(event: RetryEvent): void;
+  stats(): Record<string, RouteLatencyStats>;
+  reset(): void;
+}
+
+interface RouteRecord {
+  histogram: Histogram;
+  errors: number;
+  retries: number;
+}
+
+/** Per-route latency histograms with retry and error counts, fed from request events */
+export function createLatencyRecorder(): LatencyRecorder {
+  const routes = new Map<string, RouteRecord>();
+
+  const routeOf = (route: string): RouteRecord => {
+    let record = routes.get(route);
+    if (!record) {
+      record = { histogram: createHistogram(), errors: 0, retries: 0 };
+      routes.set(route, record);
+    }
+    return record;
+  };
+
+  return {
+    end(event: RequestEndEvent): void {
+      routeOf(event.route).histogram.record(event.duration);
+    },
+
+    error(event: RequestErrorEvent): void {
+      const record = routeOf(event.route);
+      record.errors++;
+      record.histogram.record(event.duration);
+    },
+
+    retry(event: RetryEvent): void {
+      routeOf(event.route).retries++;
+    },
+
+    stats(): Record<string, RouteLatencyStats> {
+      const result: Record<string, RouteLatencyStats> = {};
+      for (const [route, { histogram, errors, retries }] of routes) {
+        result[route] = {
+          count: histogram.count(),
+          errors,
+          retries,
+          p50: histogram.percentile(0.5),
+          p90: histogram.percentile(0.9),
+          p99: histogram.percentile(0.99),
+          max: histogram.max(),
+          mean: histogram.mean()
+        };
+      }
+      return result;
+    },
+
+    reset(): void {
+      routes.clear();
+    }
+  };
+}
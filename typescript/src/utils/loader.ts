@@ -0,0 +1,106 @@
+/**
+ * Batch loader for entity lookups
+ */
+
+import type { LoaderOptions, LoaderStats } from '../types';
+import { createCache } from './cache';
+
+export interface Loader<V> {
+  /** Resolve one key; keys requested in the same tick are fetched together */
+  load(key: string): Promise<V>;
+  /** Resolve several keys, with an Error in place of each key that failed */
+  loadMany(keys: readonly string[]): Promise<Array<V | Error>>;
+  /** Seed the cache, e.g. with an entity that came back from a list call */
+  prime(key: string, value: V): void;
+  /** Forget a key so the next load fetches it again */
+  clear(key: string): void;
+  clearAll(): void;
+  stats(): LoaderStats;
+}
+
+interface Pending<V> {
+  key: string;
+  resolve: (value: V) => void;
+  reject: (error: unknown) => void;
+  promise?: Promise<V>;
+}
+
+const DEFAULT_CONCURRENCY = 4;
+const DEFAULT_CACHE_TTL = 1000;
+const DEFAULT_MAX_CACHE_SIZE = 1000;
+
+/**
+ * DataLoader-style loader over a single-entity fetch. Keys requested in the
+ * same tick form one batch; duplicates share a promise, results are cached for
+ * `cacheTtl`, and at most `concurrency` fetches run at once across batches.
+ * Failures are never cached.
+ */
+export function createLoader<V>(fetch: (key: string) => Promise<V>, options: LoaderOptions = {}): Loader<V> {
+  const { concurrency = DEFAULT_CONCURRENCY, cacheTtl = DEFAULT_CACHE_TTL, maxCacheSize = DEFAULT_MAX_CACHE_SIZE } = options;
+  const cache = cacheTtl > 0 ? createCache<V>({ ttl: cacheTtl, maxSize: maxCacheSize }) : null;
+  const inflight = new Map<string, Promise<V>>();
+  const backlog: Array<Pending<V>> = [];
+  let batch: Array<Pending<V>> = [];
+  let running = 0;
+  const counters = { loads: 0, batches: 0, fetches: 0, deduped: 0, cacheHits: 0 };
+
+  const run = (entry: Pending<V>): void => {
+    running++;
+    counters.fetches++;
+    const { promise } = entry;
+    fetch(entry.key).then(value => {
+      // A clear() while the fetch was out means the value may already be stale
+      if (inflight.get(entry.key) === promise) cache?.set(entry.key, value);
+      entry.resolve(value);
+    }, entry.reject).finally(() => {
+      if (inflight.get(entry.key) === promise) inflight.delete(entry.key);
+      running--;
+      const next = backlog.shift();
+      if (next) run(next);
+    });
+  };
+
+  const dispatch = (): void => {
+    const entries = batch;
+    batch = [];
+    counters.batches++;
+    for (const entry of entries) {
+      if (running < concurrency) run(entry);
+      else backlog.push(entry);
+    }
+  };
+
+  const load = (key: string): Promise<V> => {
+    counters.loads++;
+    const cached = cache?.get(key);
+    if (cached !== undefined) { counters.cacheHits++; return Promise.resolve(cached); }
+    const existing = inflight.get(key);
+    if (existing) { counters.deduped++; return existing; }
+    // Wait for the current promise jobs to settle so awaits in a map() still land in this batch
+    if (batch.length === 0) Promise.resolve().then(() => process.nextTick(dispatch));
+    const entry = { key } as Pending<V>;
+    const promise = new Promise<V>((resolve, reject) => { entry.resolve = resolve; entry.reject = reject; });
+    entry.promise = promise;
+    batch.push(entry);
+    inflight.set(key, promise);
+    return promise;
+  };
+
+  return {
+    load,
+
+    loadMany(keys: readonly string[]): Promise<Array<V | Error>> {
+      return Promise.all(keys.map(key => load(key).catch((error: unknown) => error instanceof Error ? error : new Error(String(error)))));
+    },
+
+    prime(key: string, value: V): void { cache?.set(key, value); },
+
+    clear(key: string): void { cache?.delete(key); inflight.delete(key); },
+
+    clearAll(): void { cache?.clear(); inflight.clear(); },
+
+    stats(): LoaderStats {
+      return { ...counters, inflight: running, queued: backlog.length + batch.length, cached: cache?.size() ?? 0 };
+    }
+  };
+}
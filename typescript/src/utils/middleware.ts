@@ -4,10 +4,32 @@
 
 import type { RequestConfig, ApiResponse } from '../types';
 import { EVENTS } from './constants';
+import { requestCacheKey } from './cachekey';
 
-export type RequestInterceptor = (config: RequestConfig) => RequestConfig | Promise<RequestConfig>;
-export type ResponseInterceptor<T = unknown> = (response: T) => T | Promise<T>;
-export type ErrorInterceptor = (error: Error) => Error | Promise<Error>;
+export type MaybePromise<T> = T | Promise<T>;
+
+const SYNTHETIC = Symbol('moltbook.syntheticResponse');
+
+/** A response produced by middleware instead of the network */
+export interface SyntheticResponse<T = unknown> {
+  readonly [SYNTHETIC]: true;
+  data: T;
+}
+
+/** Return from a request interceptor to answer the request without sending it */
+export function respondWith<T>(data: T): SyntheticResponse<T> {
+  return { [SYNTHETIC]: true, data };
+}
+
+export function isSyntheticResponse(value: unknown): value is SyntheticResponse {
+  return typeof value === 'object' && value !== null && SYNTHETIC in value;
+}
+
+const isPromise = <T>(value: MaybePromise<T>): value is Promise<T> => typeof (value as Promise<T> | null)?.then === 'function';
+
+export type RequestInterceptor = (config: RequestConfig) => MaybePromise<RequestConfig | SyntheticResponse>;
+export type ResponseInterceptor<T = unknown> = (response: T, config: RequestConfig) => MaybePromise<T>;
+export type ErrorInterceptor = (error: Error, config: RequestConfig) => MaybePromise<Error>;
 
 export interface Middleware {
   request?: RequestInterceptor;
@@ -17,50 +39,86 @@ export interface Middleware {
 
 export interface MiddlewareManager {
   use(middleware: Middleware): () => void;
-  executeRequest(config: RequestConfig): Promise<RequestConfig>;
-  executeResponse<T>(response: T): Promise<T>;
-  executeError(error: Error): Promise<Error>;
+  /** Number of registered middlewares */
+  size(): number;
+  /** Run the composed request chain; synchronous when every interceptor is */
+  runRequest(config: RequestConfig): MaybePromise<RequestConfig | SyntheticResponse>;
+  runResponse<T>(response: T, config: RequestConfig): MaybePromise<T>;
+  runError(error: Error, config: RequestConfig): MaybePromise<Error>;
+  executeRequest(config: RequestConfig): Promise<RequestConfig | SyntheticResponse>;
+  executeResponse<T>(response: T, config?: RequestConfig): Promise<T>;
+  executeError(error: Error, config?: RequestConfig): Promise<Error>;
   clear(): void;
 }
 
+type Step<T> = (value: T, config: RequestConfig) => MaybePromise<T>;
+
+/** Fold interceptors into one function, only awaiting where an interceptor returns a promise */
+function compose<T>(steps: Array<Step<T>>, stop?: (value: T) => boolean): Step<T> {
+  return steps.reduceRight<Step<T>>((next, step) => (value, config) => {
+    const result = step(value, config);
+    if (isPromise(result)) return result.then(resolved => stop?.(resolved) ? resolved : next(resolved, config));
+    return stop?.(result) ? result : next(result, config);
+  }, value => value);
+}
+
 export function createMiddlewareManager(): MiddlewareManager {
   const middlewares: Middleware[] = [];
+  let requestChain: Step<RequestConfig | SyntheticResponse> = config => config;
+  let responseChain: Step<unknown> = response => response;
+  let errorChain: Step<Error> = error => error;
+
+  /** Rebuild the chains whenever the middleware list changes, never per request */
+  const rebuild = (): void => {
+    requestChain = compose(middlewares.flatMap(m => m.request ? [m.request as Step<RequestConfig | SyntheticResponse>] : []), isSyntheticResponse);
+    responseChain = compose(middlewares.flatMap(m => m.response ? [m.response] : []));
+    errorChain = compose(middlewares.flatMap(m => m.error ? [m.error] : []));
+  };
 
   return {
     use(middleware: Middleware): () => void {
       middlewares.push(middleware);
+      rebuild();
       return () => {
         const index = middlewares.indexOf(middleware);
-        if (index > -1) middlewares.splice(index, 1);
+        if (index > -1) {
+          middlewares.splice(index, 1);
+          rebuild();
+        }
       };
     },
 
-    async executeRequest(config: RequestConfig): Promise<RequestConfig> {
-      let result = config;
-      for (const m of middlewares) {
-        if (m.request) result = await m.request(result);
-      }
-      return result;
+    size(): number {
+      return middlewares.length;
     },
 
-    async executeResponse<T>(response: T): Promise<T> {
-      let result = response;
-      for (const m of middlewares) {
-        if (m.response) result = await (m.response as ResponseInterceptor<T>)(result);
-      }
-      return result;
+    runRequest(config: RequestConfig): MaybePromise<RequestConfig | SyntheticResponse> {
+      return requestChain(config, config);
     },
 
-    async executeError(error: Error): Promise<Error> {
-      let result = error;
-      for (const m of middlewares) {
-        if (m.error) result = await m.error(result);
-      }
-      return result;
+    runResponse<T>(response: T, config: RequestConfig): MaybePromise<T> {
+      return responseChain(response, config) as MaybePromise<T>;
+    },
+
+    runError(error: Error, config: RequestConfig): MaybePromise<Error> {
+      return errorChain(error, config);
+    },
+
+    async executeRequest(config: RequestConfig): Promise<RequestConfig | SyntheticResponse> {
+      return requestChain(config, config);
+    },
+
+    async executeResponse<T>(response: T, config: RequestConfig = { method: 'GET', path: '' }): Promise<T> {
+      return responseChain(response, config) as MaybePromise<T>;
+    },
+
+    async executeError(error: Error, config: RequestConfig = { method: 'GET', path: '' }): Promise<Error> {
+      return errorChain(error, config);
     },
 
     clear(): void {
       middlewares.length = 0;
+      rebuild();
     }
   };
 }
@@ -83,17 +141,39 @@ export function createLoggingMiddleware(logger: { log: (...args: unknown[]) => v
   };
 }
 
-/** Timing middleware */
-export function createTimingMiddleware(): Middleware {
-  const timings = new Map<string, number>();
-  
+export interface RequestTiming {
+  method: string;
+  path: string;
+  duration: number;
+  error?: Error;
+}
+
+const STARTED_AT = Symbol('moltbook.startedAt');
+type TimedConfig = RequestConfig & { [STARTED_AT]?: number };
+
+/**
+ * Timing middleware. The start time travels on the request config itself,
+ * so concurrent requests to the same path cannot overwrite each other.
+ */
+export function createTimingMiddleware(onTiming: (timing: RequestTiming) => void = () => {}): Middleware {
+  const report = (config: TimedConfig, error?: Error): void => {
+    const startedAt = config[STARTED_AT];
+    if (startedAt === undefined) return;
+    onTiming({ method: config.method, path: config.path, duration: performance.now() - startedAt, ...(error && { error }) });
+  };
+
   return {
     request(config) {
-      timings.set(config.path, Date.now());
+      (config as TimedConfig)[STARTED_AT] = performance.now();
       return config;
     },
-    response(response) {
+    response(response, config) {
+      report(config);
       return response;
+    },
+    error(error, config) {
+      report(config, error);
+      return error;
     }
   };
 }
@@ -116,13 +196,11 @@ export function createRateLimitMiddleware(onRateLimit?: (remaining: number, rese
 }
 
 /** Cache middleware */
-export function createCacheMiddleware(options: { ttl?: number; maxSize?: number } = {}): Middleware {
-  const { ttl = 60000, maxSize = 100 } = options;
+export function createCacheMiddleware(options: { ttl?: number; maxSize?: number; hashKeys?: boolean } = {}): Middleware {
+  const { ttl = 60000, maxSize = 100, hashKeys = false } = options;
   const cache = new Map<string, { data: unknown; timestamp: number }>();
 
-  const getCacheKey = (config: RequestConfig): string => {
-    return `${config.method}:${config.path}:${JSON.stringify(config.query || {})}`;
-  };
+  const getCacheKey = (config: RequestConfig): string => requestCacheKey(config.method, config.path, config.query, { hash: hashKeys });
 
   const isExpired = (timestamp: number): boolean => {
     return Date.now() - timestamp > ttl;
@@ -140,17 +218,14 @@ export function createCacheMiddleware(options: { ttl?: number; maxSize?: number
   return {
     request(config) {
       if (config.method !== 'GET') return config;
-      
-      const key = getCacheKey(config);
-      const cached = cache.get(key);
-      
-      if (cached && !isExpired(cached.timestamp)) {
-        (config as RequestConfig & { _cached?: unknown })._cached = cached.data;
-      }
-      
-      return config;
+      const cached = cache.get(getCacheKey(config));
+      return cached && !isExpired(cached.timestamp) ? respondWith(cached.data) : config;
     },
-    response(response) {
+    response(response, config) {
+      if (config.method !== 'GET') return response;
+      const key = getCacheKey(config);
+      // Responses served from this cache pass through here too; keep their original timestamp
+      if (cache.get(key)?.data !== response) cache.set(key, { data: response, timestamp: Date.now() });
       cleanup();
       return response;
     }
@@ -200,11 +275,11 @@ export function createRequestIdMiddleware(): Middleware {
   };
 }
 
-/** Compression middleware */
+/** Compression middleware; bodies are decoded by the transport */
 export function createCompressionMiddleware(): Middleware {
   return {
     request(config) {
-      config.headers = { ...config.headers, 'Accept-Encoding': 'gzip, deflate' };
+      config.headers = { ...config.headers, 'Accept-Encoding': 'gzip, deflate, br' };
       return config;
     }
   };
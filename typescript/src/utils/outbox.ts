@@ -0,0 +1,279 @@
+/**
+ * Durable write-behind outbox backed by an append-only journal
+ */
+
+import { randomUUID } from 'node:crypto';
+import { promises as fs } from 'node:fs';
+import type { CreateCommentRequest, CreatePostRequest, OutboxOptions, OutboxStats, RateLimitInfo } from '../types';
+import { abortableSleep } from './abort';
+import { MoltbookError, RateLimitError, CircuitOpenError } from './errors';
+import { decorrelatedJitter } from './retry';
+
+export type OutboxWrite =
+  | { kind: 'post'; data: CreatePostRequest }
+  | { kind: 'comment'; data: CreateCommentRequest };
+
+/** A journaled write; `id` stays the same across restarts */
+export type OutboxEntry = OutboxWrite & { id: string; createdAt: number };
+
+export type OutboxSender = (write: OutboxWrite) => Promise<unknown>;
+
+export interface Outbox {
+  /** Journal a write, then send it; resolves with the API result once it is confirmed */
+  enqueue<T = unknown>(write: OutboxWrite): Promise<T>;
+  /** Writes that are journaled but not yet confirmed */
+  pending(): OutboxEntry[];
+  /** Wait until every pending write is confirmed or has failed permanently */
+  drain(): Promise<void>;
+  stats(): OutboxStats;
+  /** Stop sending and close the journal; unconfirmed writes are replayed by the next open */
+  close(): Promise<void>;
+}
+
+/** Journal records, one JSON object per line */
+type JournalRecord =
+  | { op: 'put'; entry: OutboxEntry }
+  | { op: 'ack'; id: string }
+  | { op: 'fail'; id: string; error: string };
+
+interface Waiter {
+  resolve: (value: unknown) => void;
+  reject: (error: unknown) => void;
+}
+
+const DEFAULT_RETRY_DELAY = 1000;
+const DEFAULT_MAX_RETRY_DELAY = 60000;
+const DEFAULT_COMPACT_AFTER = 1000;
+
+/** Rate limits, timeouts, network and server errors clear up on their own; other 4xx never will */
+const isTransient = (error: unknown): boolean =>
+  error instanceof MoltbookError && (error.statusCode === 0 || error.statusCode === 408 || error.statusCode === 429 || error.statusCode >= 500);
+
+/** Pending entries of a journal, in the order they were written; a torn last line is ignored */
+const readJournal = async (path: string): Promise<OutboxEntry[]> => {
+  let text: string;
+  try {
+    text = await fs.readFile(path, 'utf8');
+  } catch (error) {
+    if ((error as NodeJS.ErrnoException).code === 'ENOENT') return [];
+    throw error;
+  }
+  const entries = new Map<string, OutboxEntry>();
+  for (const line of text.split('\n')) {
+    if (!line) continue;
+    let record: JournalRecord;
+    try { record = JSON.parse(line) as JournalRecord; } catch { continue; }
+    if (record.op === 'put') entries.set(record.entry.id, record.entry);
+    else entries.delete(record.id);
+  }
+  return [...entries.values()];
+};
+
+/** Replace the journal with just the pending entries; rename keeps the swap atomic */
+const rewriteJournal = async (path: string, entries: OutboxEntry[]): Promise<void> => {
+  const temp = `${path}.${process.pid}.tmp`;
+  const handle = await fs.open(temp, 'w');
+  try {
+    await handle.writeFile(entries.map(entry => JSON.stringify({ op: 'put', entry }) + '\n').join(''));
+    await handle.sync();
+  } finally {
+    await handle.close();
+  }
+  await fs.rename(temp, path);
+};
+
+/**
+ * Open (or create) the outbox journal at `options.path` and start replaying
+ * the writes a previous process journaled but never saw confirmed.
+ *
+ * Every write is appended and fsynced before it is sent. Appends that arrive
+ * while an fsync is running are written and synced together as one group, so
+ * the journal costs one fsync per burst rather than one per write. Writes go
+ * out one at a time. The outbox holds off while the last known rate limit is
+ * exhausted, backs off on transient errors and retries until confirmed.
+ * Delivery is at-least-once: a crash between the API accepting a write and
+ * the ack reaching disk sends it again on replay.
+ */
+export async function openOutbox(send: OutboxSender, options: OutboxOptions): Promise<Outbox> {
+  const { path, retryDelay = DEFAULT_RETRY_DELAY, maxRetryDelay = DEFAULT_MAX_RETRY_DELAY, compactAfter = DEFAULT_COMPACT_AFTER, rateLimit, onDelivered, onFailed } = options;
+  const recovered = await readJournal(path);
+  await rewriteJournal(path, recovered);
+  const handle = await fs.open(path, 'a');
+
+  const queue: OutboxEntry[] = [...recovered];
+  const waiters = new Map<string, Waiter>();
+  const stopping = new AbortController();
+  let records = recovered.length;
+  let buffered: Array<{ line: string; done: () => void; fail: (error: unknown) => void }> = [];
+  let syncing: Promise<void> | null = null;
+  let sending: Promise<void> | null = null;
+  let idle: Array<() => void> = [];
+  /** Enqueued writes still waiting for their journal append; not in `queue` yet */
+  let journaling = 0;
+  let closed = false;
+  const counters = { enqueued: 0, replayed: recovered.length, delivered: 0, failed: 0, retries: 0, appends: 0, fsyncs: 0 };
+
+  /** Group commit: one write and one fsync for everything buffered since the last sync began */
+  const sync = async (): Promise<void> => {
+    while (buffered.length > 0) {
+      const group = buffered;
+      buffered = [];
+      try {
+        await handle.write(group.map(item => item.line).join(''));
+        await handle.datasync();
+        counters.fsyncs++;
+        group.forEach(item => item.done());
+      } catch (error) {
+        group.forEach(item => item.fail(error));
+      }
+    }
+    syncing = null;
+  };
+
+  const append = (record: JournalRecord): Promise<void> => new Promise<void>((done, fail) => {
+    counters.appends++;
+    records++;
+    buffered.push({ line: JSON.stringify(record) + '\n', done, fail });
+    if (!syncing) syncing = sync();
+  });
+
+  /** Once nothing is pending the whole journal is dead weight; appends made meanwhile wait for the truncate */
+  const maybeCompact = async (): Promise<void> => {
+    if (queue.length > 0 || records < compactAfter || syncing) return;
+    syncing = handle.truncate(0).then(() => { records = 0; }).finally(() => {
+      syncing = null;
+      if (buffered.length > 0) syncing = sync();
+    });
+    await syncing;
+  };
+
+  /** Sleep until the window resets when the last response said the budget is spent */
+  const pace = async (): Promise<void> => {
+    const info: RateLimitInfo | null = rateLimit?.() ?? null;
+    const wait = info && info.remaining <= 0 ? info.resetAt.getTime() - Date.now() : 0;
+    if (wait > 0) await abortableSleep(wait, stopping.signal);
+  };
+
+  const deliver = async (entry: OutboxEntry): Promise<void> => {
+    let delay = 0;
+    while (true) {
+      await pace();
+      let result: unknown;
+      try {
+        result = await send(entry);
+      } catch (error) {
+        if (stopping.signal.aborted) throw error;
+        if (!isTransient(error)) {
+          await append({ op: 'fail', id: entry.id, error: (error as Error).message });
+          counters.failed++;
+          waiters.get(entry.id)?.reject(error);
+          onFailed?.(entry, error);
+          return;
+        }
+        counters.retries++;
+        delay = error instanceof RateLimitError || error instanceof CircuitOpenError ? error.retryAfter * 1000 : decorrelatedJitter(retryDelay, delay, maxRetryDelay);
+        await abortableSleep(delay, stopping.signal);
+        continue;
+      }
+      await append({ op: 'ack', id: entry.id });
+      counters.delivered++;
+      waiters.get(entry.id)?.resolve(result);
+      onDelivered?.(entry, result);
+      return;
+    }
+  };
+
+  /** Send queued writes in order until the queue is empty or the outbox closes */
+  const work = async (): Promise<void> => {
+    let journalDelay = 0;
+    while (queue.length > 0 && !closed) {
+      const entry = queue[0];
+      try {
+        await deliver(entry);
+        journalDelay = 0;
+      } catch (error) {
+        // Closing interrupted the send; the entry stays journaled for replay
+        if (stopping.signal.aborted) return;
+        // The outcome could not be journaled (ENOSPC, EIO). Sending again would only repeat the
+        // write, so settle it with the journal error and give the disk time before the next one
+        counters.failed++;
+        waiters.get(entry.id)?.reject(error);
+        onFailed?.(entry, error);
+        queue.shift();
+        waiters.delete(entry.id);
+        journalDelay = decorrelatedJitter(retryDelay, journalDelay, maxRetryDelay);
+        try { await abortableSleep(journalDelay, stopping.signal); } catch { return; }
+        continue;
+      }
+      queue.shift();
+      waiters.delete(entry.id);
+    }
+    await maybeCompact().catch(() => {});
+    wakeIdle();
+  };
+
+  /** Resolve drain() waiters once nothing is queued or still being journaled */
+  const wakeIdle = (): void => {
+    if (queue.length > 0 || journaling > 0) return;
+    const wake = idle;
+    idle = [];
+    wake.forEach(fn => fn());
+  };
+
+  const pump = (): void => {
+    if (sending || closed || queue.length === 0) return;
+    sending = work().finally(() => {
+      sending = null;
+      pump();
+    });
+  };
+
+  pump();
+
+  return {
+    async enqueue<T = unknown>(write: OutboxWrite): Promise<T> {
+      if (closed) throw new Error('Outbox is closed');
+      const entry = { ...write, id: randomUUID(), createdAt: Date.now() } as OutboxEntry;
+      counters.enqueued++;
+      const result = new Promise<T>((resolve, reject) => waiters.set(entry.id, { resolve: resolve as (value: unknown) => void, reject }));
+      // Only hand the write to the sender once it is on disk
+      journaling++;
+      try {
+        await append({ op: 'put', entry });
+      } catch (error) {
+        journaling--;
+        waiters.delete(entry.id);
+        wakeIdle();
+        throw error;
+      }
+      journaling--;
+      queue.push(entry);
+      pump();
+      return result;
+    },
+
+    pending: () => [...queue],
+
+    drain(): Promise<void> {
+      if ((queue.length === 0 && journaling === 0) || closed) return Promise.resolve();
+      return new Promise<void>(resolve => idle.push(resolve));
+    },
+
+    stats(): OutboxStats {
+      return { pending: queue.length, ...counters };
+    },
+
+    async close(): Promise<void> {
+      if (closed) return;
+      closed = true;
+      stopping.abort(new Error('Outbox closed'));
+      await sending;
+      await syncing;
+      await handle.close();
+      for (const waiter of waiters.values()) waiter.reject(new Error('Outbox closed before the write was confirmed; it will be replayed on the next open'));
+      waiters.clear();
+      idle.forEach(wake => wake());
+      idle = [];
+    }
+  };
+}
@@ -2,6 +2,8 @@
  * Pagination utilities for Moltbook SDK
  */
 
+import { abortableSleep } from './abort';
+
 export interface PaginationOptions {
   /** Number of items per page */
   limit?: number;
@@ -11,6 +13,15 @@ export interface PaginationOptions {
   maxPages?: number;
   /** Delay between page requests in ms */
   delay?: number;
+  /** Stop paginating, including a pending delay; also handed to fetchFn */
+  signal?: AbortSignal;
+}
+
+/** Page request handed to fetch functions */
+export interface PageRequest {
+  limit: number;
+  offset: number;
+  signal?: AbortSignal;
 }
 
 export interface PaginatedResult<T> {
@@ -86,15 +97,16 @@ export function generatePageNumbers(current: number, total: number, maxVisible:
 
 /** Async iterator for paginated results */
 export async function* paginate<T>(
-  fetchFn: (options: { limit: number; offset: number }) => Promise<T[]>,
+  fetchFn: (options: PageRequest) => Promise<T[]>,
   options: PaginationOptions = {}
 ): AsyncGenerator<T[], void, unknown> {
-  const { limit = DEFAULT_LIMIT, offset: startOffset = 0, maxPages = DEFAULT_MAX_PAGES, delay = 0 } = options;
+  const { limit = DEFAULT_LIMIT, offset: startOffset = 0, maxPages = DEFAULT_MAX_PAGES, delay = 0, signal } = options;
   let offset = startOffset;
   let page = 0;
 
   while (page < maxPages) {
-    const results = await fetchFn({ limit, offset });
+    signal?.throwIfAborted();
+    const results = await fetchFn({ limit, offset, signal });
     
     if (results.length === 0) break;
     
@@ -106,14 +118,14 @@ export async function* paginate<T>(
     page++;
     
     if (delay > 0 && page < maxPages) {
-      await new Promise(resolve => setTimeout(resolve, delay));
+      await abortableSleep(delay, signal);
     }
   }
 }
 
 /** Collect all pages into a single array */
 export async function collectAll<T>(
-  fetchFn: (options: { limit: number; offset: number }) => Promise<T[]>,
+  fetchFn: (options: PageRequest) => Promise<T[]>,
   options: PaginationOptions = {}
 ): Promise<T[]> {
   const all: T[] = [];
@@ -0,0 +1,146 @@
+/**
+ * Client-side rate limiter driven by X-RateLimit headers
+ */
+
+import type { RateLimitInfo, RateLimiterOptions, RateLimiterStats } from '../types';
+import { RateLimitError } from './errors';
+
+export interface RateLimiter {
+  /** Wait for a request slot; rejects with RateLimitError if the wait exceeds maxWait */
+  acquire(signal?: AbortSignal): Promise<void>;
+  /** Take a slot only if one is free right now, without queueing; release() it like acquire() */
+  tryAcquire(): boolean;
+  /** Release a slot taken by acquire() once its request has settled */
+  release(): void;
+  /** Sync the budget from server headers, correcting resetAt by the server Date */
+  update(info: RateLimitInfo, serverDate?: Date | null): void;
+  /** Empty the budget after a 429 */
+  block(retryAfterMs: number): void;
+  stats(): RateLimiterStats;
+}
+
+const DEFAULT_PACE_THRESHOLD = 0.2;
+
+export function createRateLimiter(options: RateLimiterOptions = {}): RateLimiter {
+  const { paceThreshold = DEFAULT_PACE_THRESHOLD, maxWait = Infinity } = options;
+  const waiters: Array<() => void> = [];
+  let limit = Infinity;
+  let tokens = Infinity;
+  let resetAt = 0;
+  let skew = 0;
+  let inflight = 0;
+  let nextSlot = 0;
+  let timer: NodeJS.Timeout | null = null;
+
+  const refill = (now: number): void => {
+    if (resetAt && now >= resetAt) {
+      tokens = limit;
+      resetAt = 0;
+    }
+  };
+
+  /** Spread the remaining budget over the rest of the window once it runs low */
+  const spacing = (now: number): number => {
+    if (!resetAt || tokens === Infinity || tokens > limit * paceThreshold) return 0;
+    return (resetAt - now) / Math.max(tokens, 1);
+  };
+
+  const waitFor = (position: number, now: number): number => {
+    refill(now);
+    const gap = spacing(now);
+    const start = Math.max(0, nextSlot - now);
+    if (position < tokens || !resetAt) return start + gap * position;
+    // Later windows are assumed to be as long as the current one
+    const windowsAhead = Math.floor((position - Math.max(tokens, 0)) / Math.max(limit, 1));
+    return Math.max(start, resetAt - now) * (1 + windowsAhead);
+  };
+
+  const pump = (): void => {
+    if (timer) { clearTimeout(timer); timer = null; }
+    while (waiters.length > 0) {
+      const now = Date.now();
+      refill(now);
+      if (tokens < 1 && resetAt) {
+        timer = setTimeout(pump, resetAt - now);
+        return;
+      }
+      if (now < nextSlot) {
+        timer = setTimeout(pump, nextSlot - now);
+        return;
+      }
+      tokens = Math.max(0, tokens - 1);
+      inflight++;
+      nextSlot = now + spacing(now);
+      waiters.shift()!();
+    }
+  };
+
+  return {
+    acquire(signal?: AbortSignal): Promise<void> {
+      if (signal?.aborted) return Promise.reject(signal.reason);
+      if (waiters.length === 0 && tokens === Infinity) { inflight++; return Promise.resolve(); }
+      const wait = waitFor(waiters.length, Date.now());
+      if (wait > maxWait) {
+        return Promise.reject(new RateLimitError('Client-side rate limit queue is full', Math.ceil(wait / 1000)));
+      }
+      return new Promise<void>((resolve, reject) => {
+        const waiter = (): void => { signal?.removeEventListener('abort', onAbort); resolve(); };
+        const onAbort = (): void => {
+          const index = waiters.indexOf(waiter);
+          if (index === -1) return;
+          waiters.splice(index, 1);
+          pump();
+          reject(signal!.reason);
+        };
+        signal?.addEventListener('abort', onAbort, { once: true });
+        waiters.push(waiter);
+        pump();
+      });
+    },
+
+    tryAcquire(): boolean {
+      const now = Date.now();
+      refill(now);
+      if (waiters.length > 0 || (tokens < 1 && resetAt) || now < nextSlot) return false;
+      if (tokens !== Infinity) tokens = Math.max(0, tokens - 1);
+      inflight++;
+      nextSlot = now + spacing(now);
+      return true;
+    },
+
+    release(): void {
+      if (inflight > 0) inflight--;
+    },
+
+    update(info: RateLimitInfo, serverDate?: Date | null): void {
+      const now = Date.now();
+      if (serverDate && !isNaN(serverDate.getTime())) skew = serverDate.getTime() - now;
+      limit = info.limit;
+      resetAt = info.resetAt.getTime() - skew;
+      // The server has not yet counted requests that are still in flight
+      tokens = Math.max(0, info.remaining - inflight);
+      if (now >= resetAt) refill(now);
+      pump();
+    },
+
+    block(retryAfterMs: number): void {
+      tokens = 0;
+      resetAt = Math.max(resetAt, Date.now() + retryAfterMs);
+      if (limit === Infinity) limit = 1;
+      pump();
+    },
+
+    stats(): RateLimiterStats {
+      const now = Date.now();
+      return {
+        limit: limit === Infinity ? null : limit,
+        tokens: tokens === Infinity ? null : tokens,
+        queued: waiters.length,
+        inflight,
+        expectedWait: waiters.length > 0 ? waitFor(waiters.length, now) : 0,
+        resetAt: resetAt ? new Date(resetAt) : null,
+        clockSkew: skew
+      };
+    }
+  };
+}
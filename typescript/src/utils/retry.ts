@@ -0,0 +1,79 @@
+/**
+ * Retry backoff and retry budgets for Moltbook SDK
+ */
+
+import type { RetryBudgetOptions, RetryBudgetStats } from '../types';
+
+/**
+ * Decorrelated jitter: a random delay between `base` and three times the
+ * previous delay, capped at `cap`. Spreads out clients that failed together.
+ */
+export function decorrelatedJitter(base: number, previous: number, cap: number): number {
+  const upper = Math.max(base, previous * 3);
+  return Math.min(cap, base + Math.random() * (upper - base));
+}
+
+export interface RetryBudget {
+  /** Record a first attempt */
+  recordRequest(): void;
+  /** Spend budget for a retry; false when retries already exceed the allowed share of traffic */
+  tryRetry(): boolean;
+  stats(): RetryBudgetStats;
+}
+
+const BUCKETS = 10;
+const DEFAULT_RATIO = 0.1;
+const DEFAULT_MIN_RETRIES_PER_SECOND = 1;
+const DEFAULT_WINDOW = 10000;
+
+/** Retries allowed as a share of requests seen over a sliding window */
+export function createRetryBudget(options: RetryBudgetOptions = {}): RetryBudget {
+  const { ratio = DEFAULT_RATIO, minRetriesPerSecond = DEFAULT_MIN_RETRIES_PER_SECOND, window = DEFAULT_WINDOW } = options;
+  const bucketMs = window / BUCKETS;
+  const requests = new Array<number>(BUCKETS).fill(0);
+  const retries = new Array<number>(BUCKETS).fill(0);
+  let head = 0;
+  let headStart = Date.now();
+  let rejected = 0;
+
+  const advance = (): void => {
+    const now = Date.now();
+    if (now - headStart >= window) {
+      requests.fill(0);
+      retries.fill(0);
+      headStart = now;
+      return;
+    }
+    while (now >= headStart + bucketMs) {
+      head = (head + 1) % BUCKETS;
+      requests[head] = 0;
+      retries[head] = 0;
+      headStart += bucketMs;
+    }
+  };
+
+  const sum = (buckets: number[]): number => buckets.reduce((a, b) => a + b, 0);
+  const allowed = (): number => Math.max(minRetriesPerSecond * window / 1000, sum(requests) * ratio);
+
+  return {
+    recordRequest(): void {
+      advance();
+      requests[head]!++;
+    },
+
+    tryRetry(): boolean {
+      advance();
+      if (sum(retries) >= allowed()) {
+        rejected++;
+        return false;
+      }
+      retries[head]!++;
+      return true;
+    },
+
+    stats(): RetryBudgetStats {
+      advance();
+      return { requests: sum(requests), retries: sum(retries), allowed: Math.floor(allowed()), rejected };
+    }
+  };
+}
@@ -0,0 +1,25 @@
+/**
+ * Precompiled route templates for Moltbook SDK
+ */
+
+/** A concrete request path tagged with the template it was built from */
+export interface RoutePath {
+  readonly path: string;
+  readonly template: string;
+}
+
+export type RouteBuilder = ((...params: string[]) => RoutePath) & { readonly template: string };
+
+/**
+ * Compile a template such as `/posts/:id/upvote` once into a builder that
+ * percent-encodes each parameter and joins it with the static segments.
+ */
+export function compileRoute(template: string): RouteBuilder {
+  const parts = template.split(/:[A-Za-z_]\w*/);
+  const build = (...params: string[]): RoutePath => {
+    let path = parts[0]!;
+    for (let i = 1; i < parts.length; i++) path += encodeURIComponent(params[i - 1] ?? '') + parts[i]!;
+    return { path, template };
+  };
+  return Object.assign(build, { template });
+}
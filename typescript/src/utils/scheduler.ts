@@ -0,0 +1,131 @@
+/**
+ * Priority request scheduler with lanes and per-route fair queuing
+ */
+
+import type { RequestLane, SchedulerOptions, SchedulerStats } from '../types';
+
+export type ReleaseFn = () => void;
+
+export interface Scheduler {
+  /** Wait for a concurrency slot in the given lane; call the returned function to free it */
+  acquire(lane: RequestLane, route: string, signal?: AbortSignal): Promise<ReleaseFn>;
+  /** Take a slot only if acquire() would grant one without queueing; null otherwise */
+  tryAcquire(lane: RequestLane): ReleaseFn | null;
+  stats(): SchedulerStats;
+}
+
+type Waiter = (release: ReleaseFn) => void;
+
+const DEFAULT_BACKGROUND_RESERVE = 0.1;
+const DEFAULT_DEFER_INTERVAL = 250;
+
+/**
+ * Interactive work always goes first. Background work only runs when no
+ * interactive request is waiting and more than `backgroundReserve` of the
+ * rate-limit budget is left. Within a lane, routes are served round-robin.
+ */
+export function createScheduler(options: SchedulerOptions & { remainingBudget?: () => number | null } = {}): Scheduler {
+  const { maxConcurrent = Infinity, backgroundReserve = DEFAULT_BACKGROUND_RESERVE, deferInterval = DEFAULT_DEFER_INTERVAL, remainingBudget } = options;
+  const lanes: Record<RequestLane, Map<string, Waiter[]>> = { interactive: new Map(), background: new Map() };
+  const queued: Record<RequestLane, number> = { interactive: 0, background: 0 };
+  let running = 0;
+  let deferring = false;
+  let timer: NodeJS.Timeout | null = null;
+
+  const budgetLow = (): boolean => {
+    const remaining = remainingBudget?.();
+    return remaining !== null && remaining !== undefined && remaining <= backgroundReserve;
+  };
+
+  const createRelease = (): ReleaseFn => {
+    let released = false;
+    return () => {
+      if (released) return;
+      released = true;
+      running--;
+      pump();
+    };
+  };
+
+  /** A slot right away, but only when nobody is queued ahead and the lane may run */
+  const tryAcquire = (lane: RequestLane): ReleaseFn | null => {
+    const idle = queued.interactive === 0 && queued.background === 0;
+    if (!idle || running >= maxConcurrent || (lane === 'background' && budgetLow())) return null;
+    running++;
+    return createRelease();
+  };
+
+  /** Take the head of the next route's queue and rotate that route to the back */
+  const take = (lane: RequestLane): Waiter | undefined => {
+    const routes = lanes[lane];
+    for (const [route, queue] of routes) {
+      const waiter = queue.shift()!;
+      routes.delete(route);
+      if (queue.length > 0) routes.set(route, queue);
+      queued[lane]--;
+      return waiter;
+    }
+    return undefined;
+  };
+
+  const pump = (): void => {
+    deferring = false;
+    while (running < maxConcurrent) {
+      let waiter = take('interactive');
+      if (!waiter) {
+        if (queued.background === 0) return;
+        if (budgetLow()) {
+          deferring = true;
+          if (!timer) {
+            timer = setTimeout(() => { timer = null; pump(); }, deferInterval);
+            // Deferred background work alone should not keep the process alive
+            timer.unref();
+          }
+          return;
+        }
+        waiter = take('background');
+      }
+      running++;
+      waiter!(createRelease());
+    }
+  };
+
+  return {
+    acquire(lane: RequestLane, route: string, signal?: AbortSignal): Promise<ReleaseFn> {
+      if (signal?.aborted) return Promise.reject(signal.reason);
+      const release = tryAcquire(lane);
+      if (release) return Promise.resolve(release);
+      return new Promise<ReleaseFn>((resolve, reject) => {
+        const routes = lanes[lane];
+        const waiter: Waiter = release => { signal?.removeEventListener('abort', onAbort); resolve(release); };
+        // A cancelled caller leaves the queue at once instead of holding its place
+        const onAbort = (): void => {
+          const waiting = routes.get(route);
+          const index = waiting ? waiting.indexOf(waiter) : -1;
+          if (index === -1) return;
+          waiting!.splice(index, 1);
+          if (waiting!.length === 0) routes.delete(route);
+          queued[lane]--;
+          reject(signal!.reason);
+        };
+        signal?.addEventListener('abort', onAbort, { once: true });
+        const queue = routes.get(route);
+        if (queue) queue.push(waiter);
+        else routes.set(route, [waiter]);
+        queued[lane]++;
+        pump();
+      });
+    },
+
+    tryAcquire,
+
+    stats(): SchedulerStats {
+      return {
+        running,
+        maxConcurrent,
+        queued: { ...queued },
+        deferringBackground: deferring
+      };
+    }
+  };
+}
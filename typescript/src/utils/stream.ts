@@ -0,0 +1,115 @@
+/**
+ * Incremental JSON decoding for Moltbook SDK
+ */
+
+const QUOTE = 34; // "
+const BACKSLASH = 92; // \
+const COMMA = 44; // ,
+const COLON = 58; // :
+const OPEN_BRACE = 123; // {
+const CLOSE_BRACE = 125; // }
+const OPEN_BRACKET = 91; // [
+const CLOSE_BRACKET = 93; // ]
+
+const isWhitespace = (code: number): boolean => code === 32 || code === 10 || code === 13 || code === 9;
+
+/**
+ * Yield the elements of one array field of a top-level JSON object as soon
+ * as each element is complete. Only the element being read is buffered.
+ * Stopping early, or aborting `signal`, cancels the underlying body.
+ */
+export async function* parseJsonArrayStream<T>(body: ReadableStream<Uint8Array>, field: string = 'data', signal?: AbortSignal): AsyncGenerator<T, void, unknown> {
+  const reader = body.getReader();
+  const onAbort = (): void => { reader.cancel(signal!.reason).catch(() => {}); };
+  signal?.addEventListener('abort', onAbort, { once: true });
+  const decoder = new TextDecoder();
+  let depth = 0;
+  let inString = false;
+  let escaped = false;
+  let key = '';
+  let keyStart = -1;
+  let pendingKey: string | null = null;
+  let currentKey: string | null = null;
+  let arrayDepth = -1;
+  let element = '';
+  let elementStart = -1;
+  let done = false;
+  let finished = false;
+
+  try {
+    signal?.throwIfAborted();
+    while (!finished) {
+      const result = await reader.read();
+      finished = result.done;
+      // Drain the small trailer after the array so the connection can be reused
+      if (done) continue;
+      const chunk = finished ? decoder.decode() : decoder.decode(result.value, { stream: true });
+      const items: T[] = [];
+
+      for (let i = 0; i < chunk.length; i++) {
+        const code = chunk.charCodeAt(i);
+
+        if (inString) {
+          if (escaped) escaped = false;
+          else if (code === BACKSLASH) escaped = true;
+          else if (code === QUOTE) {
+            inString = false;
+            if (keyStart !== -1) {
+              pendingKey = key + chunk.slice(keyStart, i);
+              keyStart = -1;
+              key = '';
+            }
+          }
+          continue;
+        }
+
+        if (arrayDepth !== -1 && depth === arrayDepth) {
+          // Between elements of the target array
+          if (code === COMMA || code === CLOSE_BRACKET) {
+            if (elementStart !== -1) {
+              element += chunk.slice(elementStart, i);
+              elementStart = -1;
+            }
+            if (element.trim()) items.push(JSON.parse(element) as T);
+            element = '';
+            if (code === CLOSE_BRACKET) { done = true; break; }
+            continue;
+          }
+          if (elementStart === -1 && !isWhitespace(code)) elementStart = i;
+        }
+
+        if (code === QUOTE) {
+          inString = true;
+          if (depth === 1 && arrayDepth === -1) keyStart = i + 1;
+        } else if (code === OPEN_BRACE || code === OPEN_BRACKET) {
+          depth++;
+          if (code === OPEN_BRACKET && depth === 2 && currentKey === field && arrayDepth === -1) {
+            arrayDepth = depth;
+            elementStart = -1;
+          }
+        } else if (code === CLOSE_BRACE || code === CLOSE_BRACKET) {
+          depth--;
+        } else if (depth === 1 && code === COLON) {
+          currentKey = pendingKey;
+        } else if (depth === 1 && code === COMMA) {
+          currentKey = null;
+        }
+      }
+
+      if (keyStart !== -1) {
+        key += chunk.slice(keyStart);
+        keyStart = 0;
+      }
+      if (elementStart !== -1) {
+        element += chunk.slice(elementStart);
+        elementStart = 0;
+      }
+      for (const item of items) yield item;
+    }
+    signal?.throwIfAborted();
+  } finally {
+    signal?.removeEventListener('abort', onAbort);
+    if (finished) reader.releaseLock();
+    else await reader.cancel().catch(() => {});
+  }
+}
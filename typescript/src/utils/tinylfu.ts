@@ -0,0 +1,215 @@
+/**
+ * W-TinyLFU cache: a frequency sketch decides which entries earn a place
+ */
+
+import type { Cache, CacheStats } from './cache';
+
+export interface TinyLFUOptions {
+  /** Share of `maxSize` given to the admission window, which absorbs bursts (default: 0.01) */
+  windowRatio?: number;
+  /** Share of the main space reserved for entries hit at least twice (default: 0.8) */
+  protectedRatio?: number;
+}
+
+const DEFAULT_WINDOW_RATIO = 0.01;
+const DEFAULT_PROTECTED_RATIO = 0.8;
+const SKETCH_DEPTH = 4;
+const MAX_COUNT = 15;
+/** Counters are halved after this many increments per cache slot, so old popularity fades */
+const SAMPLE_FACTOR = 10;
+
+/** 32-bit FNV-1a */
+const hashKey = (key: string): number => {
+  let hash = 0x811c9dc5;
+  for (let i = 0; i < key.length; i++) {
+    hash ^= key.charCodeAt(i);
+    hash = Math.imul(hash, 0x01000193);
+  }
+  return hash >>> 0;
+};
+
+/**
+ * Count-Min sketch with saturating 4-bit counters (one byte each here) and
+ * periodic halving. Row indexes come from one hash by double hashing.
+ */
+const createSketch = (maxSize: number) => {
+  let width = 16;
+  while (width < maxSize) width *= 2;
+  const mask = width - 1;
+  const table = new Uint8Array(width * SKETCH_DEPTH);
+  const sampleSize = Math.max(maxSize, 16) * SAMPLE_FACTOR;
+  const slots = new Int32Array(SKETCH_DEPTH);
+  let additions = 0;
+
+  /** Fill `slots` with the key's counter index in every row */
+  const locate = (key: string): void => {
+    const hash = hashKey(key);
+    const step = Math.imul(hash, 0x9e3779b1) | 1;
+    for (let row = 0; row < SKETCH_DEPTH; row++) slots[row] = row * width + ((hash + Math.imul(row, step)) & mask);
+  };
+
+  const reset = (): void => {
+    for (let i = 0; i < table.length; i++) table[i] >>= 1;
+    additions = Math.floor(additions / 2);
+  };
+
+  return {
+    increment(key: string): void {
+      locate(key);
+      let added = false;
+      for (const i of slots) {
+        if (table[i] < MAX_COUNT) { table[i]++; added = true; }
+      }
+      if (added && ++additions >= sampleSize) reset();
+    },
+
+    frequency(key: string): number {
+      locate(key);
+      let min = MAX_COUNT;
+      for (const i of slots) min = Math.min(min, table[i]);
+      return min;
+    },
+
+    clear(): void {
+      table.fill(0);
+      additions = 0;
+    }
+  };
+};
+
+/** Least recently used key of an insertion-ordered Map */
+const oldest = <T>(segment: Map<string, T>): string | undefined => segment.keys().next().value;
+
+/**
+ * Scan-resistant cache with the same interface as `createLRUCache`. New keys
+ * land in a small LRU window. Whatever falls out of the window must beat the
+ * main space's eviction victim on estimated access frequency to get in, so a
+ * one-pass crawl churns the window while hot profiles and submolts stay put.
+ * The main space is a segmented LRU: probation for keys seen once since they
+ * were admitted, protected for keys hit again. Every operation is O(1).
+ */
+export function createTinyLFUCache<T>(maxSize: number, options: TinyLFUOptions = {}): Cache<T> {
+  const { windowRatio = DEFAULT_WINDOW_RATIO, protectedRatio = DEFAULT_PROTECTED_RATIO } = options;
+  const windowSize = Math.min(maxSize, Math.max(1, Math.round(maxSize * windowRatio)));
+  const mainSize = maxSize - windowSize;
+  const protectedSize = Math.floor(mainSize * protectedRatio);
+  const sketch = createSketch(maxSize);
+  const window = new Map<string, T>();
+  const probation = new Map<string, T>();
+  const protectedSegment = new Map<string, T>();
+  let hits = 0;
+  let misses = 0;
+
+  /** Move a probation key into protected, demoting protected's LRU key if it is full */
+  const promote = (key: string, value: T): void => {
+    probation.delete(key);
+    protectedSegment.set(key, value);
+    if (protectedSegment.size <= protectedSize) return;
+    const demoted = oldest(protectedSegment)!;
+    probation.set(demoted, protectedSegment.get(demoted)!);
+    protectedSegment.delete(demoted);
+  };
+
+  /** Move a key to the most recently used end of its segment */
+  const refresh = (segment: Map<string, T>, key: string, value: T = segment.get(key)!): void => {
+    segment.delete(key);
+    segment.set(key, value);
+  };
+
+  /** Record an access to a resident key; false when the key is not cached */
+  const touch = (key: string, value?: T): boolean => {
+    if (window.has(key)) refresh(window, key, value);
+    else if (protectedSegment.has(key)) refresh(protectedSegment, key, value);
+    else if (probation.has(key)) promote(key, value === undefined ? probation.get(key)! : value);
+    else return false;
+    return true;
+  };
+
+  /** The window's LRU key either wins a place in the main space or is dropped */
+  const admit = (): void => {
+    const candidate = oldest(window)!;
+    const value = window.get(candidate)!;
+    window.delete(candidate);
+    if (probation.size + protectedSegment.size < mainSize) {
+      probation.set(candidate, value);
+      return;
+    }
+    const segment = probation.size > 0 ? probation : protectedSegment;
+    const victim = oldest(segment);
+    if (victim === undefined || sketch.frequency(candidate) <= sketch.frequency(victim)) return;
+    segment.delete(victim);
+    probation.set(candidate, value);
+  };
+
+  const lookup = (key: string): T | undefined => window.get(key) ?? probation.get(key) ?? protectedSegment.get(key);
+
+  return {
+    get(key: string): T | undefined {
+      sketch.increment(key);
+      const value = lookup(key);
+      if (value === undefined) {
+        misses++;
+        return undefined;
+      }
+      hits++;
+      touch(key);
+      return value;
+    },
+
+    set(key: string, value: T): void {
+      sketch.increment(key);
+      if (touch(key, value)) return;
+      window.set(key, value);
+      if (window.size > windowSize) admit();
+    },
+
+    has(key: string): boolean {
+      return window.has(key) || probation.has(key) || protectedSegment.has(key);
+    },
+
+    delete(key: string): boolean {
+      return window.delete(key) || probation.delete(key) || protectedSegment.delete(key);
+    },
+
+    clear(): void {
+      window.clear();
+      probation.clear();
+      protectedSegment.clear();
+      sketch.clear();
+      hits = 0;
+      misses = 0;
+    },
+
+    size(): number {
+      return window.size + probation.size + protectedSegment.size;
+    },
+
+    keys(): string[] {
+      return [...window.keys(), ...probation.keys(), ...protectedSegment.keys()];
+    },
+
+    values(): T[] {
+      return [...window.values(), ...probation.values(), ...protectedSegment.values()];
+    },
+
+    entries(): Array<[string, T]> {
+      return [...window.entries(), ...probation.entries(), ...protectedSegment.entries()];
+    },
+
+    cleanup(): number {
+      return 0;
+    },
+
+    stats(): CacheStats {
+      const total = hits + misses;
+      return {
+        size: this.size(),
+        hits,
+        misses,
+        hitRate: total > 0 ? hits / total : 0,
+        oldestEntry: null,
+        newestEntry: null
+      };
+    }
+  };
+}
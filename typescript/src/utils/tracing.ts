@@ -0,0 +1,274 @@
+/**
+ * Tracing spans with AsyncLocalStorage context and an OTLP JSON-lines exporter
+ */
+
+import { AsyncLocalStorage } from 'node:async_hooks';
+import { randomBytes } from 'node:crypto';
+import { promises as fs } from 'node:fs';
+import { SDK_VERSION } from './constants';
+
+export type SpanKind = 'internal' | 'client';
+export type AttributeValue = string | number | boolean;
+export type Attributes = Record<string, AttributeValue | undefined>;
+
+/** A finished span as handed to exporters; times are epoch nanoseconds */
+export interface SpanData {
+  traceId: string;
+  spanId: string;
+  parentSpanId?: string;
+  name: string;
+  kind: SpanKind;
+  startTime: bigint;
+  endTime: bigint;
+  attributes: Attributes;
+  events: Array<{ name: string; time: bigint; attributes?: Attributes }>;
+  status: { code: 'unset' | 'ok' | 'error'; message?: string };
+}
+
+export interface Span {
+  readonly traceId: string;
+  readonly spanId: string;
+  readonly name: string;
+  setAttribute(key: string, value: AttributeValue | undefined): void;
+  addEvent(name: string, attributes?: Attributes): void;
+  /** Mark the span failed and attach the error as an `exception` event */
+  recordError(error: unknown): void;
+  end(): void;
+}
+
+export interface SpanExporter {
+  export(spans: SpanData[]): void | Promise<void>;
+  shutdown?(): Promise<void>;
+}
+
+export interface TracerOptions {
+  exporter: SpanExporter;
+  /** Spans buffered before an export is forced (default: 512) */
+  maxBatchSize?: number;
+  /** Interval between background exports (ms, default: 1000) */
+  flushInterval?: number;
+}
+
+export interface Tracer {
+  /** Start a span; the parent defaults to the span active in the current async context */
+  startSpan(name: string, options?: { kind?: SpanKind; attributes?: Attributes; parent?: Span | null }): Span;
+  /** Run `fn` with `span` as the active span */
+  withSpan<T>(span: Span, fn: () => T): T;
+  /** Run `fn` in a new active span that ends when the returned promise settles */
+  trace<T>(name: string, fn: (span: Span) => Promise<T>, options?: { kind?: SpanKind; attributes?: Attributes }): Promise<T>;
+  activeSpan(): Span | undefined;
+  flush(): Promise<void>;
+  shutdown(): Promise<void>;
+}
+
+const DEFAULT_MAX_BATCH_SIZE = 512;
+const DEFAULT_FLUSH_INTERVAL = 1000;
+
+const now = (): bigint => BigInt(Math.round((performance.timeOrigin + performance.now()) * 1000)) * 1000n;
+const hexId = (bytes: number): string => randomBytes(bytes).toString('hex');
+
+export function createTracer(options: TracerOptions): Tracer {
+  const { exporter, maxBatchSize = DEFAULT_MAX_BATCH_SIZE, flushInterval = DEFAULT_FLUSH_INTERVAL } = options;
+  const context = new AsyncLocalStorage<Span>();
+  let batch: SpanData[] = [];
+  let exporting: Promise<void> = Promise.resolve();
+  let timer: NodeJS.Timeout | null = null;
+
+  const flush = (): Promise<void> => {
+    if (timer) { clearTimeout(timer); timer = null; }
+    if (batch.length > 0) {
+      const spans = batch;
+      batch = [];
+      exporting = exporting.then(() => exporter.export(spans)).catch(() => {});
+    }
+    return exporting;
+  };
+
+  const finish = (data: SpanData): void => {
+    batch.push(data);
+    if (batch.length >= maxBatchSize) void flush();
+    else if (!timer) {
+      timer = setTimeout(flush, flushInterval);
+      timer.unref();
+    }
+  };
+
+  const startSpan: Tracer['startSpan'] = (name, spanOptions = {}) => {
+    const parent = spanOptions.parent === undefined ? context.getStore() : spanOptions.parent;
+    const data: SpanData = {
+      traceId: parent?.traceId ?? hexId(16),
+      spanId: hexId(8),
+      ...(parent && { parentSpanId: parent.spanId }),
+      name,
+      kind: spanOptions.kind ?? 'internal',
+      startTime: now(),
+      endTime: 0n,
+      attributes: { ...spanOptions.attributes },
+      events: [],
+      status: { code: 'unset' }
+    };
+    let ended = false;
+    return {
+      traceId: data.traceId,
+      spanId: data.spanId,
+      name,
+      setAttribute(key, value) { data.attributes[key] = value; },
+      addEvent(eventName, attributes) { data.events.push({ name: eventName, time: now(), ...(attributes && { attributes }) }); },
+      recordError(error) {
+        const err = error instanceof Error ? error : new Error(String(error));
+        data.status = { code: 'error', message: err.message };
+        data.events.push({ name: 'exception', time: now(), attributes: { 'exception.type': err.name, 'exception.message': err.message } });
+      },
+      end() {
+        if (ended) return;
+        ended = true;
+        data.endTime = now();
+        if (data.status.code === 'unset') data.status = { code: 'ok' };
+        finish(data);
+      }
+    };
+  };
+
+  return {
+    startSpan,
+
+    withSpan<T>(span: Span, fn: () => T): T {
+      return context.run(span, fn);
+    },
+
+    async trace<T>(name: string, fn: (span: Span) => Promise<T>, spanOptions?: { kind?: SpanKind; attributes?: Attributes }): Promise<T> {
+      const span = startSpan(name, spanOptions);
+      try {
+        return await context.run(span, () => fn(span));
+      } catch (error) {
+        span.recordError(error);
+        throw error;
+      } finally {
+        span.end();
+      }
+    },
+
+    activeSpan(): Span | undefined {
+      return context.getStore();
+    },
+
+    flush,
+
+    async shutdown(): Promise<void> {
+      await flush();
+      await exporter.shutdown?.();
+    }
+  };
+}
+
+const isAsyncIterable = (value: unknown): value is AsyncGenerator<unknown> =>
+  typeof value === 'object' && value !== null && typeof (value as AsyncGenerator<unknown>)[Symbol.asyncIterator] === 'function' && typeof (value as AsyncGenerator<unknown>).next === 'function';
+
+/** Keep `span` active across every step of a generator and end it when iteration stops */
+async function* traceIteration<T>(tracer: Tracer, span: Span, iterator: AsyncGenerator<T>): AsyncGenerator<T, void, unknown> {
+  let items = 0;
+  try {
+    while (true) {
+      const result = await tracer.withSpan(span, () => iterator.next());
+      if (result.done) break;
+      items++;
+      yield result.value;
+    }
+  } catch (error) {
+    span.recordError(error);
+    throw error;
+  } finally {
+    span.setAttribute('moltbook.items', items);
+    await iterator.return(undefined);
+    span.end();
+  }
+}
+
+/**
+ * Wrap the methods of a resource so every call opens a `<resource>.<method>`
+ * span. Generators keep their span open for the whole iteration; synchronous
+ * helpers are left untraced.
+ */
+export function instrumentResource(resource: object, resourceName: string, tracer: Tracer): void {
+  const target = resource as Record<string, unknown>;
+  const proto = Object.getPrototypeOf(resource) as Record<string, unknown>;
+  for (const method of Object.getOwnPropertyNames(proto)) {
+    const original = proto[method];
+    if (method === 'constructor' || typeof original !== 'function') continue;
+    const name = `${resourceName}.${method}`;
+    const attributes = { 'moltbook.resource': resourceName, 'moltbook.method': method };
+    if (original.constructor.name === 'AsyncFunction') {
+      target[method] = function (this: unknown, ...args: unknown[]): Promise<unknown> {
+        return tracer.trace(name, () => original.apply(this, args), { attributes });
+      };
+    } else {
+      // Generator bodies only run on next(), so the span can start once we know it is one
+      target[method] = function (this: unknown, ...args: unknown[]): unknown {
+        const result = original.apply(this, args);
+        return isAsyncIterable(result) ? traceIteration(tracer, tracer.startSpan(name, { attributes }), result) : result;
+      };
+    }
+  }
+}
+
+type OtlpValue = { stringValue: string } | { intValue: string } | { doubleValue: number } | { boolValue: boolean };
+
+const toOtlpAttributes = (attributes: Attributes): Array<{ key: string; value: OtlpValue }> => {
+  const result: Array<{ key: string; value: OtlpValue }> = [];
+  for (const [key, value] of Object.entries(attributes)) {
+    if (value === undefined) continue;
+    if (typeof value === 'string') result.push({ key, value: { stringValue: value } });
+    else if (typeof value === 'boolean') result.push({ key, value: { boolValue: value } });
+    else if (Number.isInteger(value)) result.push({ key, value: { intValue: String(value) } });
+    else result.push({ key, value: { doubleValue: value } });
+  }
+  return result;
+};
+
+const SPAN_KIND = { internal: 1, client: 3 } as const;
+const STATUS_CODE = { unset: 0, ok: 1, error: 2 } as const;
+
+/** One OTLP/JSON ExportTraceServiceRequest for a batch of spans */
+export function toOtlpJson(spans: SpanData[], serviceName: string = 'moltbook-sdk'): object {
+  return {
+    resourceSpans: [{
+      resource: { attributes: toOtlpAttributes({ 'service.name': serviceName, 'telemetry.sdk.name': '@moltbook/sdk', 'telemetry.sdk.version': SDK_VERSION }) },
+      scopeSpans: [{
+        scope: { name: '@moltbook/sdk', version: SDK_VERSION },
+        spans: spans.map(span => ({
+          traceId: span.traceId,
+          spanId: span.spanId,
+          ...(span.parentSpanId && { parentSpanId: span.parentSpanId }),
+          name: span.name,
+          kind: SPAN_KIND[span.kind],
+          startTimeUnixNano: String(span.startTime),
+          endTimeUnixNano: String(span.endTime),
+          attributes: toOtlpAttributes(span.attributes),
+          events: span.events.map(e => ({ timeUnixNano: String(e.time), name: e.name, attributes: toOtlpAttributes(e.attributes ?? {}) })),
+          status: { code: STATUS_CODE[span.status.code], ...(span.status.message && { message: span.status.message }) }
+        }))
+      }]
+    }]
+  };
+}
+
+/**
+ * Append each exported batch to `path` as one OTLP/JSON line, the format the
+ * OpenTelemetry Collector's file exporter writes and its otlpjsonfile receiver reads.
+ */
+export function createFileSpanExporter(path: string, options: { serviceName?: string } = {}): SpanExporter {
+  let writing: Promise<void> = Promise.resolve();
+  return {
+    export(spans: SpanData[]): Promise<void> {
+      const line = JSON.stringify(toOtlpJson(spans, options.serviceName)) + '\n';
+      const write = writing.then(() => fs.appendFile(path, line));
+      // A failed batch is reported to its caller but must not wedge the ones after it
+      writing = write.catch(() => {});
+      return write;
+    },
+
+    shutdown(): Promise<void> {
+      return writing;
+    }
+  };
+}
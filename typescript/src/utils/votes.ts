@@ -0,0 +1,189 @@
+/**
+ * Vote coalescing queue
+ */
+
+import type { VoteQueueOptions, VoteQueueStats, VoteResponse } from '../types';
+import { createCache } from './cache';
+
+export type VoteTarget = 'post' | 'comment';
+export type VoteDirection = 'up' | 'down';
+
+/** Sends one vote request, e.g. `posts.upvote` */
+export type VoteSender = (target: VoteTarget, id: string, direction: VoteDirection) => Promise<VoteResponse>;
+
+export interface VoteQueue {
+  upvotePost(id: string): Promise<VoteResponse>;
+  downvotePost(id: string): Promise<VoteResponse>;
+  upvoteComment(id: string): Promise<VoteResponse>;
+  downvoteComment(id: string): Promise<VoteResponse>;
+  /** Send every queued vote now and wait for all of them */
+  flush(): Promise<void>;
+  stats(): VoteQueueStats;
+}
+
+/**
+ * Votes toggle: upvoting an upvoted target removes the vote, and voting the
+ * other way flips it. Each move is a map over the vote states [-1, 0, 1]
+ * (by index), so a burst of votes composes into one map. When the target's
+ * current vote is known from an earlier response, the burst needs at most one
+ * request; otherwise the shortest sequence of moves with the same map is sent.
+ */
+const MOVES: Record<VoteDirection, readonly number[]> = { up: [2, 2, 1], down: [1, 0, 0] };
+const IDENTITY = [0, 1, 2];
+
+const compose = (state: readonly number[], move: readonly number[]): number[] => state.map(s => move[s]);
+
+/** Shortest move sequence for every reachable map, found breadth-first */
+const SHORTEST: ReadonlyMap<string, VoteDirection[]> = (() => {
+  const words = new Map<string, VoteDirection[]>([[IDENTITY.join(), []]]);
+  const frontier = [IDENTITY];
+  while (frontier.length > 0) {
+    const state = frontier.shift()!;
+    for (const direction of ['up', 'down'] as const) {
+      const next = compose(state, MOVES[direction]);
+      if (words.has(next.join())) continue;
+      words.set(next.join(), [...words.get(state.join())!, direction]);
+      frontier.push(next);
+    }
+  }
+  return words;
+})();
+
+interface Pending {
+  key: string;
+  target: VoteTarget;
+  id: string;
+  state: number[];
+  votes: number;
+  timer: NodeJS.Timeout | null;
+  waiters: Array<{ resolve: (response: VoteResponse) => void; reject: (error: unknown) => void }>;
+  settled: Promise<void>;
+  settle: () => void;
+}
+
+const DEFAULT_DELAY = 1000;
+const DEFAULT_CONCURRENCY = 2;
+const DEFAULT_STATE_TTL = 60000;
+const MAX_KNOWN_STATES = 10000;
+
+/** Index into the vote states after a response, or null when it says nothing about it */
+const stateAfter = (response: VoteResponse, direction: VoteDirection): number | null => {
+  switch (response.action) {
+    case 'upvoted': return 2;
+    case 'downvoted': return 0;
+    case 'removed': return 1;
+    case 'changed': return direction === 'up' ? 2 : 0;
+    default: return null;
+  }
+};
+
+/** The single move that takes a known vote to `to`, if any is needed */
+const moveBetween = (from: number, to: number): VoteDirection[] => {
+  if (from === to) return [];
+  if (to === 1) return [from === 2 ? 'up' : 'down'];
+  return [to === 2 ? 'up' : 'down'];
+};
+
+const UNCHANGED: VoteResponse = { success: true, message: 'Votes cancelled out; nothing was sent', action: 'unchanged' };
+
+/**
+ * Collect votes per target for `delay` ms and send only their net effect.
+ * Targets flush with at most `concurrency` requests in flight, one target at a
+ * time in order, and every caller in a window gets the last response.
+ */
+export function createVoteQueue(send: VoteSender, options: VoteQueueOptions = {}): VoteQueue {
+  const { delay = DEFAULT_DELAY, concurrency = DEFAULT_CONCURRENCY, stateTtl = DEFAULT_STATE_TTL } = options;
+  // Our own last-seen vote per target; votes cast elsewhere make it stale, hence the TTL
+  const known = createCache<number>({ ttl: stateTtl, maxSize: MAX_KNOWN_STATES });
+  const pending = new Map<string, Pending>();
+  const ready: Pending[] = [];
+  const busy = new Set<string>();
+  const active = new Set<Pending>();
+  let running = 0;
+  const counters = { votes: 0, sent: 0, dropped: 0 };
+
+  const run = async (entry: Pending): Promise<void> => {
+    const current = known.get(entry.key);
+    const moves = current === undefined ? SHORTEST.get(entry.state.join())! : moveBetween(current, entry.state[current]);
+    try {
+      let response = moves.length === 0 ? UNCHANGED : null;
+      if (moves.length === 0) counters.dropped++;
+      for (const direction of moves) {
+        counters.sent++;
+        response = await send(entry.target, entry.id, direction);
+        const state = stateAfter(response, direction);
+        if (state === null) known.delete(entry.key);
+        else known.set(entry.key, state);
+      }
+      entry.waiters.forEach(w => w.resolve(response!));
+    } catch (error) {
+      known.delete(entry.key);
+      entry.waiters.forEach(w => w.reject(error));
+    }
+  };
+
+  const pump = (): void => {
+    for (let i = 0; i < ready.length && running < concurrency; i++) {
+      const entry = ready[i];
+      // Later votes on a target wait for the earlier batch so the moves apply in order
+      if (busy.has(entry.key)) continue;
+      ready.splice(i--, 1);
+      busy.add(entry.key);
+      active.add(entry);
+      running++;
+      void run(entry).finally(() => {
+        busy.delete(entry.key);
+        active.delete(entry);
+        running--;
+        entry.settle();
+        pump();
+      });
+    }
+  };
+
+  const release = (entry: Pending): void => {
+    if (entry.timer) clearTimeout(entry.timer);
+    entry.timer = null;
+    pending.delete(entry.key);
+    ready.push(entry);
+  };
+
+  const open = (key: string, target: VoteTarget, id: string): Pending => {
+    let settle!: () => void;
+    const settled = new Promise<void>(resolve => { settle = resolve; });
+    const entry: Pending = { key, target, id, state: IDENTITY, votes: 0, timer: null, waiters: [], settled, settle };
+    entry.timer = setTimeout(() => { release(entry); pump(); }, delay);
+    pending.set(key, entry);
+    return entry;
+  };
+
+  const vote = (target: VoteTarget, id: string, direction: VoteDirection): Promise<VoteResponse> => {
+    counters.votes++;
+    const key = `${target}:${id}`;
+    const entry = pending.get(key) ?? open(key, target, id);
+    entry.state = compose(entry.state, MOVES[direction]);
+    entry.votes++;
+    return new Promise<VoteResponse>((resolve, reject) => entry.waiters.push({ resolve, reject }));
+  };
+
+  return {
+    upvotePost: id => vote('post', id, 'up'),
+    downvotePost: id => vote('post', id, 'down'),
+    upvoteComment: id => vote('comment', id, 'up'),
+    downvoteComment: id => vote('comment', id, 'down'),
+
+    async flush(): Promise<void> {
+      const waiting = [...pending.values(), ...ready, ...active];
+      for (const entry of [...pending.values()]) release(entry);
+      pump();
+      await Promise.all(waiting.map(entry => entry.settled));
+    },
+
+    stats(): VoteQueueStats {
+      let queued = 0;
+      for (const entry of pending.values()) queued += entry.votes;
+      for (const entry of ready) queued += entry.votes;
+      return { ...counters, queued, inflight: running };
+    }
+  };
+}
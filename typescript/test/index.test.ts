@@ -6,14 +6,46 @@
 
 import { MoltbookClient } from '../src/client/MoltbookClient';
 import { HttpClient } from '../src/client/HttpClient';
+import { Posts } from '../src/resources';
+import { MockServer } from './mock-server';
+import { createRateLimiter } from '../src/utils/ratelimit';
+import { createScheduler } from '../src/utils/scheduler';
+import { createRetryBudget, decorrelatedJitter } from '../src/utils/retry';
+import { createCircuitBreaker } from '../src/utils/breaker';
+import { parseJsonArrayStream } from '../src/utils/stream';
+import { compileRoute } from '../src/utils/routes';
+import { createMiddlewareManager, createCacheMiddleware, createTimingMiddleware, respondWith, isSyntheticResponse } from '../src/utils/middleware';
+import { createEventEmitter } from '../src/utils/events';
+import { createHistogram } from '../src/utils/histogram';
+import { createLoader } from '../src/utils/loader';
+import { createVoteQueue } from '../src/utils/votes';
+import { openOutbox } from '../src/utils/outbox';
+import { createTieredCache } from '../src/utils/diskcache';
+import { createCache, createLRUCache, createResponseCache, memoize } from '../src/utils/cache';
+import { createTinyLFUCache } from '../src/utils/tinylfu';
+import { cacheKey, requestCacheKey } from '../src/utils/cachekey';
+import type { OutboxEntry } from '../src/utils/outbox';
+import type { VoteDirection } from '../src/utils/votes';
+import { EVENTS } from '../src/utils/constants';
+import { createTracer, createFileSpanExporter } from '../src/utils/tracing';
+import type { SpanData } from '../src/utils/tracing';
+import { promises as fs } from 'node:fs';
+import * as os from 'node:os';
+import * as http2 from 'node:http2';
+import * as nodePath from 'node:path';
+import { ENDPOINTS } from '../src/utils/constants';
 import {
   MoltbookError,
   AuthenticationError,
   RateLimitError,
   NotFoundError,
   ValidationError,
-  ConfigurationError
+  ConfigurationError,
+  CircuitOpenError,
+  TimeoutError,
+  NetworkError
 } from '../src/utils/errors';
+import { collectAll } from '../src/utils/pagination';
 
 // Test utilities
 let passed = 0;
@@ -221,6 +253,1413 @@ describe('HttpClient Configuration', () => {
   });
 });
 
+describe('Connection Pool', () => {
+  test('getPoolStats returns null without a pool', async () => {
+    const client = new MoltbookClient();
+    assertEqual(client.getPoolStats(), null);
+  });
+
+  test('throws on invalid pool size', async () => {
+    assertThrows(() => {
+      new MoltbookClient({ pool: { maxConnections: 0 } });
+    }, ConfigurationError);
+  });
+
+  test('pooled transport reuses keep-alive connections', async () => {
+    const server = new MockServer();
+    const baseUrl = await server.listen();
+    const client = new MoltbookClient({ baseUrl, pool: { maxConnections: 2 } });
+    try {
+      for (let i = 0; i < 5; i++) await client.agents.me();
+      const stats = client.getPoolStats()!;
+      assertEqual(stats.requests, 5);
+      assertEqual(stats.connectionsOpened, 1);
+      assertEqual(stats.reused, 4);
+      assertEqual(stats.idle, 1);
+    } finally {
+      client.close();
+      await server.close();
+    }
+  });
+});
+
+describe('HTTP/2', () => {
+  /** Cleartext h2 server answering every stream with a small JSON body */
+  const listenH2c = async (onStream: (stream: http2.ServerHttp2Stream, headers: http2.IncomingHttpHeaders) => void): Promise<{ baseUrl: string; close: () => Promise<void> }> => {
+    const server = http2.createServer();
+    const sessions = new Set<http2.ServerHttp2Session>();
+    server.on('session', session => { sessions.add(session); session.on('close', () => sessions.delete(session)); session.on('error', () => {}); });
+    server.on('stream', (stream, headers) => { stream.on('error', () => {}); onStream(stream, headers); });
+    await new Promise<void>(resolve => server.listen(0, '127.0.0.1', resolve));
+    const { port } = server.address() as { port: number };
+    return {
+      baseUrl: `http://127.0.0.1:${port}/api/v1`,
+      close: () => new Promise<void>(resolve => { sessions.forEach(s => s.destroy()); server.close(() => resolve()); })
+    };
+  };
+  const reply = (stream: http2.ServerHttp2Stream, body: unknown, delay = 0): void => {
+    setTimeout(() => {
+      if (stream.closed) return;
+      stream.respond({ ':status': 200, 'content-type': 'application/json' });
+      stream.end(JSON.stringify(body));
+    }, delay);
+  };
+
+  test('getHttp2Stats returns null unless enabled', async () => {
+    assertEqual(new MoltbookClient().getHttp2Stats(), null);
+  });
+
+  test('multiplexes concurrent requests over one session', async () => {
+    const paths: string[] = [];
+    const server = await listenH2c((stream, headers) => { paths.push(String(headers[':path'])); reply(stream, { success: true, agent: { name: 'h2' } }, 20); });
+    const client = new MoltbookClient({ baseUrl: server.baseUrl, http2: true, coalesceRequests: false, apiKey: 'moltbook_test' });
+    try {
+      const results = await Promise.all(Array.from({ length: 8 }, () => client.agents.me()));
+      assertEqual(results[7].name, 'h2');
+      const stats = client.getHttp2Stats()!;
+      assertEqual(stats.sessionsOpened, 1);
+      assertEqual(stats.streamsOpened, 8);
+      assert(stats.peakStreams > 1, `expected concurrent streams, saw ${stats.peakStreams}`);
+      assertEqual(paths[0], '/api/v1/agents/me');
+    } finally {
+      client.close();
+      await server.close();
+    }
+  });
+
+  test('opens a new session after GOAWAY', async () => {
+    let served = 0;
+    const server = await listenH2c(stream => {
+      served++;
+      reply(stream, { success: true, agent: { name: `n${served}` } });
+      const session = stream.session!;
+      if (served === 1) stream.once('close', () => session.goaway());
+    });
+    const client = new MoltbookClient({ baseUrl: server.baseUrl, http2: true, apiKey: 'moltbook_test' });
+    try {
+      await client.agents.me();
+      await new Promise(resolve => setTimeout(resolve, 50));
+      const second = await client.agents.me();
+      assertEqual(second.name, 'n2');
+      const stats = client.getHttp2Stats()!;
+      assertEqual(stats.goaways, 1);
+      assertEqual(stats.sessionsOpened, 2);
+      assertEqual(stats.sessions, 1);
+    } finally {
+      client.close();
+      await server.close();
+    }
+  });
+
+  test('queues streams beyond maxConcurrentStreams', async () => {
+    const server = await listenH2c(stream => reply(stream, { success: true, agent: { name: 'q' } }, 20));
+    const http = new HttpClient({ baseUrl: server.baseUrl, http2: { maxConcurrentStreams: 2 }, coalesceRequests: false, rateLimit: false });
+    try {
+      let maxQueued = 0;
+      const sampler = setInterval(() => { maxQueued = Math.max(maxQueued, http.getHttp2Stats()!.queued); }, 2);
+      await Promise.all(Array.from({ length: 5 }, () => http.get('/agents/me'))).finally(() => clearInterval(sampler));
+      assert(maxQueued > 0, 'expected queued requests');
+      const stats = http.getHttp2Stats()!;
+      assertEqual(stats.peakStreams, 2);
+      assertEqual(stats.queued, 0);
+    } finally {
+      http.close();
+      await server.close();
+    }
+  });
+});
+
+describe('Request Coalescing', () => {
+  test('concurrent identical GETs share one request', async () => {
+    const server = new MockServer({ latency: 20 });
+    const baseUrl = await server.listen();
+    const client = new MoltbookClient({ baseUrl });
+    try {
+      const results = await Promise.all([client.posts.get('p1'), client.posts.get('p1'), client.posts.get('p1'), client.posts.get('p2')]);
+      assertEqual(results.length, 4);
+      assertEqual(server.getRequests().length, 2);
+      assertEqual(client.getCoalescingStats().coalesced, 2);
+      assertEqual(client.getCoalescingStats().inflight, 0);
+    } finally {
+      await server.close();
+    }
+  });
+
+  test('does not coalesce writes or when disabled', async () => {
+    const server = new MockServer({ latency: 10 });
+    const baseUrl = await server.listen();
+    const client = new MoltbookClient({ baseUrl, coalesceRequests: false });
+    try {
+      await Promise.all([client.agents.me(), client.agents.me(), client.posts.upvote('p1'), client.posts.upvote('p1')]);
+      assertEqual(server.getRequests().length, 4);
+      assertEqual(client.getCoalescingStats().coalesced, 0);
+    } finally {
+      await server.close();
+    }
+  });
+});
+
+describe('Rate Limiter', () => {
+  test('passes requests through before any headers are seen', async () => {
+    const limiter = createRateLimiter();
+    await limiter.acquire();
+    limiter.release();
+    assertEqual(limiter.stats().limit, null);
+    assertEqual(limiter.stats().queued, 0);
+  });
+
+  test('queues requests until the window resets', async () => {
+    const limiter = createRateLimiter();
+    limiter.update({ limit: 5, remaining: 0, resetAt: new Date(Date.now() + 100) });
+    const start = Date.now();
+    const pending = limiter.acquire();
+    assertEqual(limiter.stats().queued, 1);
+    assert(limiter.stats().expectedWait > 50);
+    await pending;
+    assert(Date.now() - start >= 90, 'Expected to wait for the reset');
+    assertEqual(limiter.stats().tokens, 4);
+  });
+
+  test('corrects reset time for server clock skew', async () => {
+    const limiter = createRateLimiter();
+    const serverNow = Date.now() + 60000;
+    limiter.update({ limit: 5, remaining: 0, resetAt: new Date(serverNow + 50) }, new Date(serverNow));
+    const start = Date.now();
+    await limiter.acquire();
+    assert(Date.now() - start < 1000, 'Expected skew-corrected wait');
+    assert(limiter.stats().clockSkew >= 59000);
+  });
+
+  test('rejects when the wait exceeds maxWait', async () => {
+    const limiter = createRateLimiter({ maxWait: 1000 });
+    limiter.update({ limit: 5, remaining: 0, resetAt: new Date(Date.now() + 60000) });
+    let error: unknown;
+    try { await limiter.acquire(); } catch (e) { error = e; }
+    assert(error instanceof RateLimitError);
+  });
+
+  test('tryAcquire takes a free token without queueing', async () => {
+    const limiter = createRateLimiter();
+    limiter.update({ limit: 5, remaining: 1, resetAt: new Date(Date.now() + 60000) });
+    assert(limiter.tryAcquire());
+    assert(!limiter.tryAcquire(), 'No token left');
+    assertEqual(limiter.stats().queued, 0);
+    assertEqual(limiter.stats().inflight, 1);
+  });
+
+  test('client tracks budget from response headers', async () => {
+    const server = new MockServer();
+    const baseUrl = await server.listen();
+    server.handle('GET /agents/me', () => ({ status: 200, body: { success: true, agent: {} }, headers: { 'X-RateLimit-Limit': '100', 'X-RateLimit-Remaining': '42', 'X-RateLimit-Reset': String(Math.ceil(Date.now() / 1000) + 60) } }));
+    const client = new MoltbookClient({ baseUrl });
+    try {
+      await client.agents.me();
+      const stats = client.getRateLimiterStats()!;
+      assertEqual(stats.limit, 100);
+      assertEqual(stats.tokens, 42);
+      assertEqual(stats.inflight, 0);
+    } finally {
+      await server.close();
+    }
+  });
+});
+
+describe('Request Scheduler', () => {
+  test('caps concurrency and serves interactive work first', async () => {
+    const scheduler = createScheduler({ maxConcurrent: 1 });
+    const order: string[] = [];
+    const first = await scheduler.acquire('interactive', 'GET /posts');
+    const background = scheduler.acquire('background', 'GET /feed').then(release => { order.push('background'); release(); });
+    const interactive = scheduler.acquire('interactive', 'POST /posts').then(release => { order.push('interactive'); release(); });
+    assertEqual(scheduler.stats().running, 1);
+    assertEqual(scheduler.stats().queued.background, 1);
+    first();
+    await Promise.all([background, interactive]);
+    assertEqual(order.join(','), 'interactive,background');
+    assertEqual(scheduler.stats().running, 0);
+  });
+
+  test('tryAcquire respects maxConcurrent and never queues', async () => {
+    const scheduler = createScheduler({ maxConcurrent: 1 });
+    const release = scheduler.tryAcquire('interactive')!;
+    assert(release !== null);
+    assertEqual(scheduler.tryAcquire('interactive'), null);
+    assertEqual(scheduler.stats().queued.interactive, 0);
+    release();
+    assert(scheduler.tryAcquire('interactive') !== null);
+  });
+
+  test('round-robins between routes in a lane', async () => {
+    const scheduler = createScheduler({ maxConcurrent: 1 });
+    const order: string[] = [];
+    const first = await scheduler.acquire('interactive', 'a');
+    const pending = ['a', 'a', 'b', 'b'].map(route => scheduler.acquire('interactive', route).then(release => { order.push(route); release(); }));
+    first();
+    await Promise.all(pending);
+    assertEqual(order.join(','), 'a,b,a,b');
+  });
+
+  test('defers background work while the budget is low', async () => {
+    let budget = 0.05;
+    const scheduler = createScheduler({ backgroundReserve: 0.1, deferInterval: 10, remainingBudget: () => budget });
+    let ran = false;
+    const pending = scheduler.acquire('background', 'GET /feed').then(release => { ran = true; release(); });
+    await new Promise(resolve => setTimeout(resolve, 30));
+    assert(!ran, 'Background work should wait');
+    assert(scheduler.stats().deferringBackground);
+    const interactive = await scheduler.acquire('interactive', 'GET /agents/me');
+    interactive();
+    budget = 0.5;
+    // The deferral timer is unref'd, so the test holds its own handle while it waits
+    const keepAlive = setTimeout(() => {}, 1000);
+    await pending.finally(() => clearTimeout(keepAlive));
+    assert(ran);
+  });
+});
+
+describe('Retry Policy', () => {
+  test('decorrelated jitter stays within bounds', async () => {
+    let previous = 100;
+    for (let i = 0; i < 50; i++) {
+      const delay = decorrelatedJitter(100, previous, 1000);
+      assert(delay >= 100 && delay <= Math.min(1000, previous * 3), `Delay ${delay} out of bounds`);
+      previous = delay;
+    }
+  });
+
+  test('retry budget limits retries to a share of traffic', async () => {
+    const budget = createRetryBudget({ ratio: 0.5, minRetriesPerSecond: 0 });
+    for (let i = 0; i < 4; i++) budget.recordRequest();
+    assert(budget.tryRetry());
+    assert(budget.tryRetry());
+    assert(!budget.tryRetry());
+    assertEqual(budget.stats().rejected, 1);
+  });
+
+  test('circuit opens, probes when half-open and closes on success', async () => {
+    const breaker = createCircuitBreaker({ failureThreshold: 2, resetTimeout: 20 });
+    breaker.failure('GET /feed');
+    assert(breaker.allow('GET /feed'));
+    breaker.failure('GET /feed');
+    assert(!breaker.allow('GET /feed'));
+    assertEqual(breaker.stats()['GET /feed']!.state, 'open');
+    await new Promise(resolve => setTimeout(resolve, 25));
+    assert(breaker.allow('GET /feed'));
+    assert(!breaker.allow('GET /feed'), 'Only one probe while half-open');
+    breaker.success('GET /feed');
+    assertEqual(breaker.stats()['GET /feed']!.state, 'closed');
+  });
+
+  test('client fails fast while a route circuit is open', async () => {
+    const server = new MockServer();
+    const baseUrl = await server.listen();
+    server.handle('GET /posts/:id', () => ({ status: 503, body: { success: false, error: 'Unavailable' } }));
+    const client = new MoltbookClient({ baseUrl, retries: 0, circuitBreaker: { failureThreshold: 2 } });
+    try {
+      for (const id of ['a', 'b']) {
+        try { await client.posts.get(id); } catch (error) { assertEqual((error as MoltbookError).statusCode, 503); }
+      }
+      let error: unknown;
+      try { await client.posts.get('c'); } catch (e) { error = e; }
+      assert(error instanceof CircuitOpenError);
+      assertEqual(server.getRequests().length, 2);
+      assertEqual(client.getCircuitStats()['GET /posts/:id']!.state, 'open');
+    } finally {
+      await server.close();
+    }
+  });
+});
+
+describe('Hedged Requests', () => {
+  test('slow GET is hedged and the faster attempt wins', async () => {
+    const server = new MockServer();
+    const baseUrl = await server.listen();
+    const client = new MoltbookClient({ baseUrl, hedging: { minSamples: 3, minDelay: 10, maxHedgeRate: 1 } });
+    try {
+      for (let i = 0; i < 3; i++) await client.feed.get();
+      let calls = 0;
+      server.handle('GET /feed', async () => {
+        if (calls++ === 0) await new Promise(resolve => setTimeout(resolve, 300));
+        return { status: 200, body: { success: true, data: [], pagination: { count: 0, limit: 25, offset: 0, hasMore: false } } };
+      });
+      const start = Date.now();
+      await client.feed.get();
+      assert(Date.now() - start < 250, 'Expected the hedge to win');
+      const stats = client.getHedgingStats()!;
+      assertEqual(stats.hedged, 1);
+      assertEqual(stats.wins, 1);
+    } finally {
+      await server.close();
+    }
+  });
+
+  test('a hedged GET whose body stalls still times out', async () => {
+    let calls = 0;
+    const client = new HttpClient({
+      apiKey: 'moltbook_test',
+      retries: 0,
+      timeouts: { body: 30 },
+      hedging: { minSamples: 3, minDelay: 10, maxHedgeRate: 1 },
+      transport: async (_url, init) => {
+        if (calls++ < 3) return new Response('{"data":[]}');
+        const body = new ReadableStream<Uint8Array>({
+          start(ctrl) {
+            ctrl.enqueue(new TextEncoder().encode('{"data":['));
+            init.signal?.addEventListener('abort', () => ctrl.error(init.signal!.reason), { once: true });
+          }
+        });
+        return new Response(body);
+      }
+    });
+    for (let i = 0; i < 3; i++) await client.get('/feed');
+    const error = await client.get('/feed').catch(e => e as Error);
+    assert(error instanceof TimeoutError, `Expected TimeoutError, got ${error}`);
+  });
+
+  test('hedges need a free scheduler slot', async () => {
+    const server = new MockServer();
+    const baseUrl = await server.listen();
+    const client = new MoltbookClient({ baseUrl, scheduler: { maxConcurrent: 1 }, hedging: { minSamples: 3, minDelay: 10, maxHedgeRate: 1 } });
+    try {
+      for (let i = 0; i < 3; i++) await client.feed.get();
+      server.handle('GET /feed', async () => {
+        await new Promise(resolve => setTimeout(resolve, 60));
+        return { status: 200, body: { success: true, data: [], pagination: { count: 0, limit: 25, offset: 0, hasMore: false } } };
+      });
+      await client.feed.get();
+      assertEqual(client.getHedgingStats()!.hedged, 0);
+      assertEqual(server.getRequests().length, 4);
+      assertEqual(client.getSchedulerStats().running, 0);
+    } finally {
+      await server.close();
+    }
+  });
+
+  test('hedging is off by default', async () => {
+    const client = new MoltbookClient();
+    assertEqual(client.getHedgingStats(), null);
+  });
+});
+
+describe('Streaming Decoding', () => {
+  const streamOf = (text: string, size: number): ReadableStream<Uint8Array> => {
+    const bytes = new TextEncoder().encode(text);
+    return new ReadableStream({
+      start(controller) {
+        for (let i = 0; i < bytes.length; i += size) controller.enqueue(bytes.slice(i, i + size));
+        controller.close();
+      }
+    });
+  };
+
+  const payload = {
+    success: true,
+    meta: { data: ['not this one'] },
+    data: [{ id: '1', title: 'He said "hi" \\ [ok] {x}', tags: [1, [2, 3]] }, { id: '2', title: 'émoji 🦞' }, 'plain', 42, null],
+    pagination: { count: 5, limit: 25, offset: 0, hasMore: false }
+  };
+
+  test('yields each element of the data array across chunk boundaries', async () => {
+    for (const size of [1, 3, 7, 64]) {
+      const items: unknown[] = [];
+      for await (const item of parseJsonArrayStream(streamOf(JSON.stringify(payload), size))) items.push(item);
+      assertEqual(JSON.stringify(items), JSON.stringify(payload.data), `Chunk size ${size}`);
+    }
+  });
+
+  test('stopping early cancels the body', async () => {
+    let cancelled = false;
+    const body = new ReadableStream<Uint8Array>({
+      start(controller) { controller.enqueue(new TextEncoder().encode('{"data":[{"id":"1"},{"id":"2"},')); },
+      cancel() { cancelled = true; }
+    });
+    for await (const item of parseJsonArrayStream<{ id: string }>(body)) {
+      assertEqual(item.id, '1');
+      break;
+    }
+    assert(cancelled);
+  });
+
+  test('posts.stream yields posts from the server', async () => {
+    const server = new MockServer();
+    const baseUrl = await server.listen();
+    const client = new MoltbookClient({ baseUrl });
+    try {
+      let count = 0;
+      for await (const post of client.posts.stream({ limit: 3 })) {
+        assert(typeof post.id === 'string');
+        count++;
+      }
+      assertEqual(count, 3);
+    } finally {
+      await server.close();
+    }
+  });
+});
+
+describe('Request Envelope', () => {
+  test('compiled routes percent-encode path params', async () => {
+    const route = compileRoute('/posts/:id/comments');
+    const built = route('a b/../c?');
+    assertEqual(built.path, '/posts/a%20b%2F..%2Fc%3F/comments');
+    assertEqual(built.template, '/posts/:id/comments');
+    assertEqual(ENDPOINTS.SUBMOLT_FEED('general').path, '/submolts/general/feed');
+  });
+
+  test('keeps the base URL path and encodes the query once', async () => {
+    const seen: Array<{ url: string; body?: string | Uint8Array; headers: Readonly<Record<string, string>> }> = [];
+    const client = new HttpClient({
+      baseUrl: 'https://api.test/api/v1/',
+      apiKey: 'moltbook_test',
+      retries: 1,
+      retryDelay: 1,
+      transport: async (url, init) => {
+        seen.push({ url, body: init.body, headers: init.headers });
+        return seen.length === 1 ? new Response('{"error":"boom"}', { status: 500 }) : new Response('{"ok":true}');
+      }
+    });
+    await client.post(ENDPOINTS.POST_COMMENTS('p 1'), { content: 'hi' });
+    await client.get(ENDPOINTS.POSTS, { sort: 'new', limit: 5, offset: undefined });
+    assertEqual(seen[0]!.url, 'https://api.test/api/v1/posts/p%201/comments');
+    assert(seen[0]!.body === seen[1]!.body, 'Retry should reuse the serialized body');
+    assertEqual(seen[0]!.headers['Content-Length'], String(JSON.stringify({ content: 'hi' }).length));
+    assertEqual(seen[2]!.url, 'https://api.test/api/v1/posts?sort=new&limit=5');
+    assertEqual(seen[2]!.headers['Authorization'], 'Bearer moltbook_test');
+  });
+});
+
+describe('Response Revalidation', () => {
+  test('revalidates with ETag and serves the cached body on 304', async () => {
+    const seen: Array<Readonly<Record<string, string>>> = [];
+    const body = JSON.stringify({ success: true, post: { id: 'p1', title: 'Hello' } });
+    const client = new HttpClient({
+      apiKey: 'moltbook_test',
+      cache: true,
+      transport: async (_url, init) => {
+        seen.push(init.headers);
+        if (init.headers['If-None-Match'] === '"v1"') return new Response(null, { status: 304, headers: { ETag: '"v1"' } });
+        return new Response(body, { headers: { ETag: '"v1"' } });
+      }
+    });
+    const first = await client.get<{ post: { title: string } }>('/posts/p1');
+    const second = await client.get<{ post: { title: string } }>('/posts/p1');
+    assertEqual(second.post.title, first.post.title);
+    assertEqual(seen[1]!['If-None-Match'], '"v1"');
+    const stats = client.getRevalidationStats()!;
+    assertEqual(stats.hits, 1);
+    assertEqual(stats.misses, 1);
+    assertEqual(stats.bytesSaved, body.length);
+    assertEqual(stats.bytes, body.length);
+  });
+
+  test('mutations invalidate exactly the tagged entries', async () => {
+    const score: Record<string, number> = { p1: 1, p2: 1 };
+    const sent: Array<{ url: string; conditional: boolean }> = [];
+    const http = new HttpClient({
+      apiKey: 'moltbook_test',
+      cache: true,
+      transport: async (url, init) => {
+        const conditional = init.headers['If-None-Match'] !== undefined;
+        sent.push({ url, conditional });
+        if (init.method === 'POST') { score.p1++; return new Response('{"success":true,"action":"upvoted"}'); }
+        // A validator that lags behind writes, like a second-granular Last-Modified
+        if (conditional) return new Response(null, { status: 304 });
+        const body = url.endsWith('/posts') ? { data: [{ id: 'p1', score: score.p1 }, { id: 'p2', score: score.p2 }] } : { post: { id: url.slice(-2), score: score[url.slice(-2)] } };
+        return new Response(JSON.stringify(body), { headers: { ETag: '"v"' } });
+      }
+    });
+    const posts = new Posts(http);
+    await posts.get('p1');
+    await posts.get('p2');
+    await posts.list();
+    await posts.upvote('p1');
+    sent.length = 0;
+    assertEqual((await posts.get('p1')).score, 2);
+    assertEqual((await posts.list())[0].score, 2);
+    await posts.get('p2');
+    assertEqual(sent.map(r => r.conditional).join(), 'false,false,true');
+    assertEqual(http.getRevalidationStats()!.invalidated, 2);
+  });
+
+  test('invalidations outlive entries kept alive by refreshOnAccess', async () => {
+    const responses = createResponseCache({ ttl: 30, refreshOnAccess: true });
+    const storedAt = Date.now();
+    responses.cache.set('GET /posts/p1', { storedAt, tags: ['post:p1'] });
+    responses.invalidate(['post:p1']);
+    for (let i = 0; i < 4; i++) {
+      await new Promise(resolve => setTimeout(resolve, 15));
+      assert(responses.cache.get('GET /posts/p1') !== undefined, 'Access should keep the entry alive');
+    }
+    assert(responses.isStale(storedAt, ['post:p1']), 'The invalidation expired before the entry');
+  });
+
+  test('remembers a bounded number of invalidated tags without missing any', async () => {
+    const responses = createResponseCache({ refreshOnAccess: true });
+    const storedAt = Date.now();
+    for (let i = 0; i <= 10_000; i++) responses.invalidate([`post:${i}`]);
+    // post:0's stamp was folded away, so everything tagged and stored before it counts as stale
+    assert(responses.isStale(storedAt, ['post:0']));
+    assert(responses.isStale(storedAt, ['agent:never-invalidated']));
+    assert(!responses.isStale(storedAt, []));
+    assert(!responses.isStale(Date.now() + 1, ['post:0']));
+  });
+
+  test('does not store responses without validators', async () => {
+    const client = new HttpClient({ apiKey: 'moltbook_test', cache: true, transport: async () => new Response('{"ok":true}') });
+    await client.get('/posts');
+    assertEqual(client.getRevalidationStats()!.entries, 0);
+    assertEqual(new HttpClient().getRevalidationStats(), null);
+  });
+});
+
+describe('Cache', () => {
+  const sleep = (ms: number) => new Promise(resolve => setTimeout(resolve, ms));
+
+  test('evicts the oldest insert and updates in place at capacity', () => {
+    const cache = createCache<number>({ maxSize: 3 });
+    ['a', 'b', 'c'].forEach((key, i) => cache.set(key, i));
+    cache.set('a', 10);
+    assertEqual(cache.keys().join(), 'b,c,a');
+    cache.set('d', 3);
+    assertEqual(cache.keys().join(), 'c,a,d');
+    assertEqual(cache.get('a'), 10);
+    assertEqual(cache.get('b'), undefined);
+  });
+
+  test('cleanup drops only expired entries and refreshOnAccess extends them', async () => {
+    const cache = createCache<number>({ ttl: 20, refreshOnAccess: true });
+    cache.set('old', 1);
+    cache.set('kept', 2);
+    await sleep(12);
+    cache.get('kept');
+    await sleep(12);
+    assertEqual(cache.cleanup(), 1);
+    assertEqual(cache.keys().join(), 'kept');
+    assertEqual(cache.stats().size, 1);
+  });
+
+  test('maxBytes evicts by weight and reports bytes held and evicted', () => {
+    const cache = createCache<string>({ maxBytes: 100, sizeOf: value => value.length });
+    cache.set('a', 'x'.repeat(40));
+    cache.set('b', 'x'.repeat(40));
+    cache.set('c', 'x'.repeat(30));
+    assertEqual(cache.keys().join(), 'b,c');
+    cache.set('huge', 'x'.repeat(101));
+    assertEqual(cache.has('huge'), false);
+    const stats = cache.stats();
+    assertEqual(stats.bytes, 70);
+    assertEqual(stats.bytesEvicted, 40);
+    assertEqual(createCache<number>().stats().bytes, undefined);
+  });
+});
+
+describe('TinyLFU Cache', () => {
+  test('keeps a hot working set through a one-pass crawl that flushes an LRU', () => {
+    const lru = createLRUCache<number>(100);
+    const tinylfu = createTinyLFUCache<number>(100);
+    const hot = Array.from({ length: 50 }, (_, i) => `agent:${i}`);
+    for (const cache of [lru, tinylfu]) {
+      for (let round = 0; round < 5; round++) for (const key of hot) if (cache.get(key) === undefined) cache.set(key, round);
+      for (let i = 0; i < 1000; i++) cache.set(`post:${i}`, i);
+    }
+    assertEqual(hot.filter(key => lru.has(key)).length, 0);
+    // The sketch is approximate, so a colliding crawl key can occasionally displace a hot one
+    assert(hot.filter(key => tinylfu.has(key)).length >= 45);
+    assert(tinylfu.size() <= 100);
+  });
+
+  test('updates values in place and supports the Cache interface', () => {
+    const cache = createTinyLFUCache<string>(10);
+    cache.set('a', '1');
+    cache.set('a', '2');
+    assertEqual(cache.get('a'), '2');
+    assertEqual(cache.get('b'), undefined);
+    assertEqual(cache.stats().hitRate, 0.5);
+    assertEqual(cache.delete('a'), true);
+    assertEqual(cache.size(), 0);
+  });
+});
+
+describe('Cache Keys', () => {
+  test('are independent of key order and distinguish types', () => {
+    assertEqual(cacheKey({ sort: 'new', limit: 25 }), cacheKey({ limit: 25, sort: 'new' }));
+    assertEqual(cacheKey({ a: 1, b: undefined }), cacheKey({ a: 1 }));
+    assertEqual(cacheKey({ b: [1, { d: 2, c: 3 }], a: null }), cacheKey({ a: null, b: [1, { c: 3, d: 2 }] }));
+    assert(cacheKey([1]) !== cacheKey(['1']));
+    assert(cacheKey({ a: 'b\0c' }) !== cacheKey({ 'a\0sb': 'c' }));
+    assert(cacheKey(['a', 'b']) !== cacheKey(['ab']));
+  });
+
+  test('hash to 16 hex characters and back the response cache', () => {
+    const key = requestCacheKey('GET', '/posts', { sort: 'new', limit: 25 }, { hash: true });
+    assert(/^[0-9a-f]{16}$/.test(key));
+    assertEqual(key, requestCacheKey('GET', '/posts', { limit: 25, sort: 'new' }, { hash: true }));
+    assert(key !== requestCacheKey('GET', '/posts', { limit: 26, sort: 'new' }, { hash: true }));
+    assertEqual(requestCacheKey('GET', '/feed'), requestCacheKey('GET', '/feed', {}));
+  });
+});
+
+describe('Memoize', () => {
+  const sleep = (ms: number) => new Promise(resolve => setTimeout(resolve, ms));
+
+  test('concurrent misses share one call and rejections are not cached', async () => {
+    let calls = 0;
+    const fetchFeed = memoize(async (fail: boolean) => { calls++; await sleep(5); if (fail) throw new Error('boom'); return calls; });
+    const values = await Promise.all([fetchFeed(false), fetchFeed(false), fetchFeed(false)]);
+    assertEqual(values.join(), '1,1,1');
+    assertEqual(calls, 1);
+    const failures = await Promise.all([fetchFeed(true), fetchFeed(true)].map(p => Promise.resolve(p).catch((e: Error) => e.message)));
+    assertEqual(failures.join(), 'boom,boom');
+    assertEqual(calls, 2);
+    await Promise.resolve(fetchFeed(true)).catch(() => {});
+    assertEqual(calls, 3);
+  });
+
+  test('serves stale values while one call revalidates', async () => {
+    let calls = 0;
+    const hot = memoize(async () => { calls++; await sleep(10); return calls; }, { ttl: 20, staleWhileRevalidate: 1000 });
+    assertEqual(await hot(), 1);
+    await sleep(25);
+    const stale = await Promise.all([hot(), hot(), hot()]);
+    assertEqual(stale.join(), '1,1,1');
+    assertEqual(calls, 2);
+    await sleep(15);
+    assertEqual(await hot(), 2);
+  });
+
+  test('falls back to the stale value when a refresh fails', async () => {
+    let fail = false;
+    const profile = memoize(async () => { if (fail) throw new Error('down'); return 'ok'; }, { ttl: 10, staleIfError: 1000 });
+    assertEqual(await profile(), 'ok');
+    fail = true;
+    await sleep(15);
+    assertEqual(await profile(), 'ok');
+    const strict = memoize(async () => { if (fail) throw new Error('down'); return 'ok'; }, { ttl: 10 });
+    fail = false;
+    await strict();
+    fail = true;
+    await sleep(15);
+    assertEqual(await Promise.resolve(strict()).catch((e: Error) => e.message), 'down');
+  });
+
+  test('early refresh renews slow values before they expire', async () => {
+    let calls = 0;
+    const slow = memoize(async () => { calls++; await sleep(20); return calls; }, { ttl: 40, earlyRefresh: 100 });
+    await slow();
+    for (let i = 0; i < 5 && calls === 1; i++) { await slow(); await sleep(2); }
+    assertEqual(calls, 2);
+    assertEqual(await slow(), 1);
+  });
+});
+
+describe('Persistent Response Cache', () => {
+  const tempDir = (): Promise<string> => fs.mkdtemp(nodePath.join(os.tmpdir(), 'moltbook-cache-'));
+
+  test('entries survive a restart and load from the index', async () => {
+    const dir = await tempDir();
+    const first = createTieredCache<{ n: number }>({ dir });
+    first.set('a', { n: 1 });
+    first.set('b', { n: 2 });
+    first.set('a', { n: 3 });
+    first.delete('b');
+    first.close();
+    const second = createTieredCache<{ n: number }>({ dir });
+    try {
+      assertEqual(second.get('a')?.n, 3);
+      assertEqual(second.get('b'), undefined);
+      assertEqual(second.size(), 1);
+      assertEqual(second.diskStats().diskHits, 1);
+    } finally {
+      second.close();
+    }
+  });
+
+  test('recovers writes made after the last index flush', async () => {
+    const dir = await tempDir();
+    const crashed = createTieredCache<string>({ dir });
+    crashed.set('indexed', 'x');
+    crashed.flush();
+    crashed.set('tail', 'y');
+    crashed.delete('indexed');
+    const next = createTieredCache<string>({ dir });
+    try {
+      assertEqual(next.get('tail'), 'y');
+      assertEqual(next.has('indexed'), false);
+    } finally {
+      next.close();
+      crashed.close();
+    }
+  });
+
+  test('keeps TTLs across restarts', async () => {
+    const dir = await tempDir();
+    const first = createTieredCache<string>({ dir, ttl: 20 });
+    first.set('short', 'lived');
+    first.close();
+    await new Promise(resolve => setTimeout(resolve, 30));
+    const second = createTieredCache<string>({ dir, ttl: 20 });
+    assertEqual(second.get('short'), undefined);
+    second.close();
+  });
+
+  test('refreshOnAccess extends entries on both tiers', async () => {
+    const dir = await tempDir();
+    const first = createTieredCache<string>({ dir, ttl: 40, refreshOnAccess: true });
+    first.set('hot', 'x');
+    for (let i = 0; i < 4; i++) {
+      await new Promise(resolve => setTimeout(resolve, 15));
+      assertEqual(first.get('hot'), 'x');
+    }
+    first.close();
+    const second = createTieredCache<string>({ dir, ttl: 40, refreshOnAccess: true });
+    try {
+      assertEqual(second.get('hot'), 'x');
+      assertEqual(second.diskStats().diskHits, 1);
+    } finally {
+      second.close();
+    }
+  });
+
+  test('a closed cache is empty and ignores writes', async () => {
+    const dir = await tempDir();
+    const cache = createTieredCache<string>({ dir });
+    cache.set('a', 'x');
+    cache.close();
+    cache.set('b', 'y');
+    assertEqual(cache.get('a'), undefined);
+    assertEqual(cache.delete('a'), false);
+    cache.clear();
+    cache.flush();
+    cache.close();
+    const reopened = createTieredCache<string>({ dir });
+    try {
+      assertEqual(reopened.get('a'), 'x');
+      assertEqual(reopened.has('b'), false);
+    } finally {
+      reopened.close();
+    }
+  });
+
+  test('stays under maxBytes by evicting least recently used entries', async () => {
+    const dir = await tempDir();
+    const cache = createTieredCache<string>({ dir, maxBytes: 8192, segmentSize: 1024, maxSize: 10 });
+    try {
+      const payload = 'x'.repeat(150);
+      cache.set('hot', payload);
+      for (let i = 0; i < 200; i++) {
+        cache.set(`k${i}`, payload);
+        cache.get('hot');
+      }
+      const stats = cache.diskStats();
+      assert(stats.bytes <= 8192, `disk holds ${stats.bytes} bytes`);
+      assert(stats.evictions > 0 && stats.compactions > 0, 'expected eviction and compaction');
+      assertEqual(cache.get('hot'), payload);
+      assertEqual(cache.get('k199'), payload);
+      assertEqual(cache.get('k0'), undefined);
+    } finally {
+      cache.close();
+    }
+  });
+
+  test('a new client revalidates with the ETag persisted by the last one', async () => {
+    const dir = await tempDir();
+    const seen: string[] = [];
+    const transport = async (_url: string, init: { headers: Readonly<Record<string, string>> }) => {
+      seen.push(init.headers['If-None-Match'] ?? '');
+      if (init.headers['If-None-Match'] === '"v1"') return new Response(null, { status: 304, headers: { ETag: '"v1"' } });
+      return new Response(JSON.stringify({ success: true, submolt: { name: 'general' } }), { headers: { ETag: '"v1"' } });
+    };
+    const first = new HttpClient({ apiKey: 'moltbook_test', cache: { persist: { dir } }, transport });
+    await first.get('/submolts/general');
+    first.close();
+    const second = new HttpClient({ apiKey: 'moltbook_test', cache: { persist: { dir } }, transport });
+    const result = await second.get<{ submolt: { name: string } }>('/submolts/general');
+    second.close();
+    assertEqual(result.submolt.name, 'general');
+    assertEqual(seen.join(), ',"v1"');
+  });
+});
+
+describe('Compression', () => {
+  test('pooled transport decodes gzip and brotli and counts wire bytes', async () => {
+    for (const encoding of ['gzip', 'br'] as const) {
+      const server = new MockServer({ encoding });
+      const baseUrl = await server.listen();
+      const client = new MoltbookClient({ baseUrl, pool: {}, compression: true });
+      try {
+        const result = await client.posts.list();
+        assertEqual(result.length, 3);
+        const stats = client.getCompressionStats()!.routes['GET /posts']!;
+        assertEqual(stats.encodedResponses, 1);
+        assertEqual(stats.unmeasured, 0);
+        assert(stats.wireBytes > 0 && stats.wireBytes < stats.decodedBytes, `${encoding} body should be smaller on the wire`);
+      } finally {
+        client.close();
+        await server.close();
+      }
+    }
+  });
+
+  test('compresses large request bodies once the server advertises support', async () => {
+    const server = new MockServer({ encoding: 'gzip' });
+    const baseUrl = await server.listen();
+    const client = new MoltbookClient({ baseUrl, pool: {}, compression: { requestThreshold: 512 } });
+    try {
+      const content = 'molt '.repeat(2000);
+      await client.posts.create({ submolt: 'general', title: 'First', content });
+      await client.posts.create({ submolt: 'general', title: 'Second', content });
+      const requests = server.getRequests();
+      assertEqual(requests[0]!.headers!['content-encoding'], undefined);
+      assertEqual(requests[1]!.headers!['content-encoding'], 'gzip');
+      assertEqual((requests[1]!.body as { content: string }).content, content);
+      const stats = client.getCompressionStats()!;
+      assertEqual(stats.serverEncodings.join(), 'gzip');
+      assert(stats.routes['POST /posts']!.requestBytesSent < stats.routes['POST /posts']!.requestBytes);
+    } finally {
+      client.close();
+      await server.close();
+    }
+  });
+
+  test('falls back to an uncompressed body on 415', async () => {
+    const seen: Array<Readonly<Record<string, string>>> = [];
+    const client = new HttpClient({
+      apiKey: 'moltbook_test',
+      compression: { requestCompression: 'always', requestThreshold: 1 },
+      transport: async (_url, init) => {
+        seen.push(init.headers);
+        return init.headers['Content-Encoding'] ? new Response('{"error":"unsupported"}', { status: 415 }) : new Response('{"ok":true}');
+      }
+    });
+    const body = { title: 'x'.repeat(100) };
+    await client.post('/posts', body);
+    assertEqual(seen.length, 2);
+    assertEqual(seen[1]!['Content-Encoding'], undefined);
+    const stats = client.getCompressionStats()!;
+    assertEqual(stats.requestCompression, false);
+    assertEqual(stats.routes['POST /posts']!.requestBytes, JSON.stringify(body).length);
+  });
+});
+
+describe('Middleware', () => {
+  test('synchronous interceptors run without a promise hop', async () => {
+    const manager = createMiddlewareManager();
+    const order: string[] = [];
+    manager.use({ request: config => { order.push('a'); return { ...config, path: config.path + '/a' }; } });
+    const remove = manager.use({ request: config => { order.push('b'); return { ...config, path: config.path + '/b' }; } });
+    const result = manager.runRequest({ method: 'GET', path: '/posts' });
+    assert(!(result instanceof Promise), 'Sync chain should return synchronously');
+    assertEqual((result as { path: string }).path, '/posts/a/b');
+    remove();
+    assertEqual(((await manager.executeRequest({ method: 'GET', path: '/x' })) as { path: string }).path, '/x/a');
+    assertEqual(order.join(), 'a,b,a');
+  });
+
+  test('short-circuits with a synthetic response', async () => {
+    let sent = 0;
+    const client = new HttpClient({ apiKey: 'moltbook_test', transport: async () => { sent++; return new Response('{"ok":true}'); } });
+    const seen: unknown[] = [];
+    client.use({ request: config => config.path === '/mocked' ? respondWith({ mocked: true }) : config, response: (response) => { seen.push(response); return response; } });
+    client.use({ request: () => { throw new Error('later middleware must not run'); } });
+    const data = await client.get<{ mocked: boolean }>('/mocked');
+    assertEqual(data.mocked, true);
+    assertEqual(sent, 0);
+    assertEqual(seen.length, 1);
+    assert(isSyntheticResponse(respondWith(1)) && !isSyntheticResponse({ data: 1 }));
+  });
+
+  test('cache middleware avoids the network and errors pass through the error chain', async () => {
+    let sent = 0;
+    const client = new HttpClient({ apiKey: 'moltbook_test', retries: 0, transport: async (url) => { sent++; return url.endsWith('/missing') ? new Response('{"error":"gone"}', { status: 404 }) : new Response('{"n":1}'); } });
+    client.use(createCacheMiddleware({ ttl: 1000 }));
+    client.use({ error: error => new Error(`wrapped: ${error.message}`) });
+    await client.get('/posts');
+    await client.get('/posts');
+    assertEqual(sent, 1);
+    const error = await client.get('/missing').catch(e => e as Error);
+    assertEqual(error.message, 'wrapped: gone');
+  });
+
+  test('request interceptor throws reach the error chain as rejections', async () => {
+    let sent = 0;
+    const client = new HttpClient({ apiKey: 'moltbook_test', transport: async () => { sent++; return new Response('{}'); } });
+    client.use({ request: config => { if (config.path === '/sync') throw new Error('sync'); return config; } });
+    client.use({ request: async config => { if (config.path === '/async') throw new Error('async'); return config; } });
+    client.use({ error: (error, config) => new Error(`wrapped ${config.path}: ${error.message}`) });
+    let pending: Promise<unknown> | undefined;
+    try { pending = client.request({ method: 'GET', path: '/sync' }); } catch { assert(false, 'request() threw synchronously'); }
+    assertEqual((await pending!.catch(e => e as Error) as Error).message, 'wrapped /sync: sync');
+    assertEqual((await client.get('/async').catch(e => e as Error) as Error).message, 'wrapped /async: async');
+    assertEqual(sent, 0);
+  });
+});
+
+describe('Request Metrics', () => {
+  test('histogram percentiles stay within bucket precision', async () => {
+    const histogram = createHistogram();
+    for (let i = 1; i <= 1000; i++) histogram.record(i);
+    const within = (actual: number, expected: number) => Math.abs(actual - expected) / expected < 0.02;
+    assert(within(histogram.percentile(0.5), 500), `p50 was ${histogram.percentile(0.5)}`);
+    assert(within(histogram.percentile(0.99), 990), `p99 was ${histogram.percentile(0.99)}`);
+    assertEqual(histogram.max(), 1000);
+    assertEqual(histogram.count(), 1000);
+    assertEqual(createHistogram().percentile(0.5), 0);
+  });
+
+  test('emits request events and records per-route metrics', async () => {
+    const events = createEventEmitter();
+    const seen: string[] = [];
+    events.on(EVENTS.REQUEST_START, e => { seen.push(`start ${e.route}`); });
+    events.on(EVENTS.REQUEST_END, e => { seen.push(`end ${e.route} ${e.status} ${e.retries}`); });
+    events.on(EVENTS.REQUEST_ERROR, e => { seen.push(`error ${e.route}`); });
+    events.on(EVENTS.RETRY, e => { seen.push(`retry ${e.attempt}`); });
+    let calls = 0;
+    const client = new HttpClient({
+      apiKey: 'moltbook_test',
+      retries: 1,
+      retryDelay: 1,
+      events,
+      metrics: true,
+      transport: async url => url.endsWith('/missing') ? new Response('{"error":"gone"}', { status: 404 }) : ++calls === 1 ? new Response('{}', { status: 503 }) : new Response('{"ok":true}')
+    });
+    await client.get('/posts/abc');
+    await client.get('/posts/missing').catch(() => {});
+    assertEqual(seen.join('|'), 'start GET /posts/:id|retry 1|end GET /posts/:id 200 1|start GET /posts/:id|error GET /posts/:id');
+    const metrics = client.getRouteMetrics()!['GET /posts/:id']!;
+    assertEqual(metrics.count, 2);
+    assertEqual(metrics.errors, 1);
+    assertEqual(metrics.retries, 1);
+    assert(metrics.p99 <= metrics.max && metrics.p50 > 0);
+  });
+
+  test('timing middleware keeps concurrent requests apart', async () => {
+    const durations: number[] = [];
+    const client = new HttpClient({
+      apiKey: 'moltbook_test',
+      events: createEventEmitter(),
+      transport: async (url) => { await new Promise(r => setTimeout(r, url.endsWith('slow') ? 40 : 1)); return new Response('{}'); }
+    });
+    client.use(createTimingMiddleware(t => durations.push(t.duration)));
+    await Promise.all([client.get('/posts', { q: 'slow' }), client.get('/posts', { q: 'fast' })]);
+    durations.sort((a, b) => a - b);
+    assertEqual(durations.length, 2);
+    assert(durations[0]! < 30 && durations[1]! >= 35, `durations were ${durations.join(', ')}`);
+  });
+});
+
+describe('Tracing', () => {
+  test('nests queue, attempt, backoff and decode spans under the resource call', async () => {
+    const spans: SpanData[] = [];
+    const tracer = createTracer({ exporter: { export: batch => { spans.push(...batch); } } });
+    let calls = 0;
+    const http = new HttpClient({ apiKey: 'moltbook_test', retries: 1, retryDelay: 1, tracer, events: createEventEmitter(), transport: async () => ++calls === 1 ? new Response('{}', { status: 502 }) : new Response('{"post":{"id":"p1"}}') });
+    const posts = new Posts(http);
+    await posts.create({ submolt: 'general', title: 'Hi', content: 'x' });
+    await tracer.flush();
+    const byName = (name: string) => spans.filter(s => s.name === name);
+    const root = byName('posts.create')[0]!;
+    const request = byName('POST /posts')[0]!;
+    assertEqual(request.parentSpanId, root.spanId);
+    assertEqual(request.traceId, root.traceId);
+    assertEqual(byName('attempt').length, 2);
+    assertEqual(byName('queue').length, 2);
+    assertEqual(byName('backoff').length, 1);
+    assertEqual(byName('decode').length, 1);
+    assert(spans.filter(s => s !== root).every(s => s.traceId === root.traceId));
+    assertEqual(byName('attempt')[0]!.status.code, 'error');
+    assertEqual(request.attributes['moltbook.retries'], 1);
+  });
+
+  test('keeps iterate spans open across pages and writes OTLP JSON lines', async () => {
+    const file = nodePath.join(await fs.mkdtemp(nodePath.join(os.tmpdir(), 'moltbook-trace-')), 'spans.jsonl');
+    const tracer = createTracer({ exporter: createFileSpanExporter(file) });
+    const server = new MockServer();
+    const post = { id: 'p1', title: 'Hi' };
+    server.handle('GET /posts', req => ({ status: 200, body: { success: true, data: req.query?.offset === '0' ? [post, post] : [post] } }));
+    const baseUrl = await server.listen();
+    const client = new MoltbookClient({ baseUrl, tracer });
+    try {
+      let pages = 0;
+      for await (const page of client.posts.iterate({ limit: 2 })) pages += page.length > 0 ? 1 : 0;
+      assertEqual(pages, 2);
+      assertEqual(client.comments.count([]), 0);
+      await tracer.shutdown();
+      const lines = (await fs.readFile(file, 'utf8')).trim().split('\n');
+      const spans = lines.flatMap(line => JSON.parse(line).resourceSpans[0].scopeSpans[0].spans) as Array<{ name: string; spanId: string; parentSpanId?: string; kind: number; startTimeUnixNano: string }>;
+      const iterate = spans.find(s => s.name === 'posts.iterate')!;
+      const lists = spans.filter(s => s.name === 'posts.list');
+      assert(lists.length >= 2, 'Expected one list span per page');
+      assert(lists.every(s => s.parentSpanId === iterate.spanId));
+      assert(spans.some(s => s.name === 'GET /posts' && s.kind === 3));
+      assert(!spans.some(s => s.name === 'comments.count'), 'Sync helpers are not traced');
+      assert(/^\d+$/.test(iterate.startTimeUnixNano));
+    } finally {
+      await server.close();
+    }
+  });
+
+  test('file exporter keeps writing after a failed batch', async () => {
+    const dir = nodePath.join(await fs.mkdtemp(nodePath.join(os.tmpdir(), 'moltbook-trace-')), 'later');
+    const file = nodePath.join(dir, 'spans.jsonl');
+    const exporter = createFileSpanExporter(file);
+    let error: unknown;
+    await exporter.export([]).catch(e => { error = e; });
+    assertEqual((error as NodeJS.ErrnoException | undefined)?.code, 'ENOENT');
+    await fs.mkdir(dir);
+    await exporter.export([]);
+    await exporter.shutdown();
+    assertEqual((await fs.readFile(file, 'utf8')).trim().split('\n').length, 1);
+  });
+});
+
+describe('Cancellation and Deadlines', () => {
+  const failing = async (): Promise<Response> => new Response('{"error":"down"}', { status: 503 });
+  /** Transport that only settles when its signal aborts */
+  const hanging = (_url: string, init: { signal?: AbortSignal }): Promise<Response> => new Promise((_, reject) => init.signal!.addEventListener('abort', () => reject(init.signal!.reason)));
+
+  test('aborting stops a pending backoff sleep', async () => {
+    const client = new HttpClient({ apiKey: 'moltbook_test', retries: 3, retryDelay: 10000, maxRetryDelay: 10000, transport: failing, events: createEventEmitter() });
+    const controller = new AbortController();
+    const started = Date.now();
+    setTimeout(() => controller.abort(), 20);
+    const error = await client.get('/posts', undefined, { signal: controller.signal }).catch(e => e as Error);
+    assertEqual(error.name, 'AbortError');
+    assert(Date.now() - started < 1000, 'Abort should not wait for the backoff');
+  });
+
+  test('the deadline is shared by every attempt and sleep', async () => {
+    let attempts = 0;
+    const client = new HttpClient({ apiKey: 'moltbook_test', retries: 10, retryDelay: 30, circuitBreaker: false, retryBudget: { minRetriesPerSecond: 100 }, transport: async () => { attempts++; return failing(); }, events: createEventEmitter() });
+    const started = Date.now();
+    const error = await client.get('/posts', undefined, { deadline: Date.now() + 100 }).catch(e => e as Error);
+    assert(error instanceof TimeoutError, `Expected TimeoutError, got ${error}`);
+    assert(Date.now() - started < 300, 'Deadline should end the call');
+    assert(attempts < 10, 'Retries should stop at the deadline');
+  });
+
+  test('first-byte timeout aborts a silent attempt', async () => {
+    const client = new HttpClient({ apiKey: 'moltbook_test', retries: 0, timeouts: { firstByte: 30 }, transport: hanging, events: createEventEmitter() });
+    const error = await client.get('/posts').catch(e => e as Error);
+    assert(error instanceof TimeoutError);
+    assert(error.message.includes('headers'));
+  });
+
+  test('aborting releases queued scheduler and iterator work', async () => {
+    const server = new MockServer({ latency: 30 });
+    const baseUrl = await server.listen();
+    const client = new MoltbookClient({ baseUrl, scheduler: { maxConcurrent: 1 } });
+    const controller = new AbortController();
+    try {
+      const blocker = client.posts.get('p1');
+      const queued = client.posts.get('p2', { signal: controller.signal });
+      const pages: number[] = [];
+      const crawl = (async () => { for await (const page of client.posts.iterate({ limit: 3, signal: controller.signal })) pages.push(page.length); })();
+      await new Promise(r => setTimeout(r, 50));
+      controller.abort();
+      const [q, c] = await Promise.all([queued.catch(e => e as Error), crawl.catch(e => e as Error)]);
+      assertEqual((q as Error).name, 'AbortError');
+      assertEqual((c as Error).name, 'AbortError');
+      await blocker;
+      assertEqual(client.getSchedulerStats().queued.background + client.getSchedulerStats().queued.interactive, 0);
+      const requestsAfterAbort = server.getRequests().length;
+      await new Promise(r => setTimeout(r, 80));
+      assertEqual(server.getRequests().length, requestsAfterAbort);
+    } finally {
+      client.close();
+      await server.close();
+    }
+  });
+
+  test('collectAll and streams honour the signal', async () => {
+    const controller = new AbortController();
+    let fetched = 0;
+    const all = collectAll(async ({ signal }) => { fetched++; if (fetched === 2) controller.abort(); signal?.throwIfAborted(); return [1, 2]; }, { limit: 2, delay: 5, signal: controller.signal });
+    assertEqual((await all.catch(e => e as Error) as Error).name, 'AbortError');
+    assertEqual(fetched, 2);
+
+    const streamController = new AbortController();
+    let sent = false;
+    const body = new ReadableStream<Uint8Array>({
+      pull(ctrl) { if (!sent) { sent = true; ctrl.enqueue(new TextEncoder().encode('{"data":[{"id":1},')); } }
+    });
+    const client = new HttpClient({ apiKey: 'moltbook_test', transport: async () => new Response(body), events: createEventEmitter() });
+    const seen: unknown[] = [];
+    const error = await (async () => { for await (const item of client.stream('/posts', undefined, { signal: streamController.signal })) { seen.push(item); streamController.abort(); } })().catch(e => e as Error);
+    assertEqual(seen.length, 1);
+    assertEqual((error as Error).name, 'AbortError');
+  });
+
+  test('body timeout aborts a stalled stream', async () => {
+    let sent = false;
+    const body = new ReadableStream<Uint8Array>({
+      pull(ctrl) { if (!sent) { sent = true; ctrl.enqueue(new TextEncoder().encode('{"data":[{"id":1},')); } }
+    });
+    const client = new HttpClient({ apiKey: 'moltbook_test', retries: 0, timeouts: { body: 30 }, transport: async () => new Response(body), events: createEventEmitter() });
+    const seen: unknown[] = [];
+    const error = await (async () => { for await (const item of client.stream('/posts')) seen.push(item); })().catch(e => e as Error);
+    assertEqual(seen.length, 1);
+    assert(error instanceof TimeoutError, `Expected TimeoutError, got ${error}`);
+    assert(error.message.includes('body'));
+  });
+});
+
+describe('Batch Loading', () => {
+  test('batches keys from one tick and deduplicates them', async () => {
+    const fetched: string[] = [];
+    const loader = createLoader(async (key: string) => { fetched.push(key); return key.toUpperCase(); });
+    const results = await Promise.all(['a', 'b', 'a', 'c', 'b'].map(key => loader.load(key)));
+    assertEqual(results.join(), 'A,B,A,C,B');
+    assertEqual(fetched.join(), 'a,b,c');
+    const stats = loader.stats();
+    assertEqual(stats.batches, 1);
+    assertEqual(stats.deduped, 2);
+    assertEqual(stats.fetches, 3);
+  });
+
+  test('bounds concurrent fetches', async () => {
+    let running = 0;
+    let peak = 0;
+    const loader = createLoader(async (key: string) => {
+      running++;
+      peak = Math.max(peak, running);
+      await new Promise(resolve => setTimeout(resolve, 5));
+      running--;
+      return key;
+    }, { concurrency: 2 });
+    await loader.loadMany(Array.from({ length: 7 }, (_, i) => `k${i}`));
+    assertEqual(peak, 2);
+    assertEqual(loader.stats().queued, 0);
+  });
+
+  test('caches results briefly but never failures', async () => {
+    let calls = 0;
+    const loader = createLoader(async (key: string) => { calls++; if (key === 'bad') throw new NotFoundError('missing'); return calls; }, { cacheTtl: 1000 });
+    const [first, failed] = await loader.loadMany(['x', 'bad']);
+    assertEqual(first, 1);
+    assert(failed instanceof NotFoundError, 'loadMany should return the error in place');
+    assertEqual(await loader.load('x'), 1);
+    await loader.loadMany(['bad']);
+    assertEqual(calls, 3);
+    assertEqual(loader.stats().cacheHits, 1);
+    loader.clear('x');
+    assertEqual(await loader.load('x'), 4);
+  });
+
+  test('posts.loadMany sends one request per distinct id', async () => {
+    const server = new MockServer();
+    const baseUrl = await server.listen();
+    server.handle('GET /posts/:id', req => ({ status: 200, body: { success: true, post: { id: req.path.split('/').pop(), title: 't' } } }));
+    const client = new MoltbookClient({ baseUrl, coalesceRequests: false });
+    try {
+      const posts = await client.posts.loadMany(['p1', 'p2', 'p1', 'p3']);
+      assertEqual(posts.map(p => (p as { id: string }).id).join(), 'p1,p2,p1,p3');
+      assertEqual(server.getRequests().length, 3);
+      await client.posts.load('p2');
+      assertEqual(server.getRequests().length, 3);
+      await client.posts.upvote('p2');
+      await client.posts.load('p2');
+      assertEqual(server.getRequests().length, 5);
+    } finally {
+      await server.close();
+    }
+  });
+});
+
+describe('Vote Queue', () => {
+  /** Server-side toggle semantics: repeating a vote removes it, the opposite vote flips it */
+  const createVoteServer = (initial = 0) => {
+    let vote = initial;
+    const sent: VoteDirection[] = [];
+    const send = async (_target: string, _id: string, direction: VoteDirection) => {
+      sent.push(direction);
+      const wanted = direction === 'up' ? 1 : -1;
+      const action = vote === wanted ? 'removed' : vote === 0 ? (direction === 'up' ? 'upvoted' : 'downvoted') : 'changed';
+      vote = vote === wanted ? 0 : wanted;
+      return { success: true, message: '', action } as const;
+    };
+    return { send, sent, state: () => vote };
+  };
+  const replay = (initial: number, directions: VoteDirection[]): number =>
+    directions.reduce((vote, d) => { const wanted = d === 'up' ? 1 : -1; return vote === wanted ? 0 : wanted; }, initial);
+
+  test('drops bursts that leave a known vote unchanged', async () => {
+    const server = createVoteServer();
+    const queue = createVoteQueue(server.send, { delay: 5 });
+    assertEqual((await queue.upvotePost('p1')).action, 'upvoted');
+    const results = await Promise.all([queue.upvotePost('p1'), queue.upvotePost('p1')]);
+    assertEqual(results[1].action, 'unchanged');
+    assertEqual(server.sent.length, 1);
+    assertEqual(queue.stats().dropped, 1);
+  });
+
+  test('reaches the same vote as sending every call, from any starting vote', async () => {
+    const bursts: VoteDirection[][] = [['up'], ['up', 'down'], ['down', 'up', 'up'], ['up', 'down', 'down', 'up', 'down'], ['down', 'down', 'down']];
+    for (const burst of bursts) {
+      for (const initial of [-1, 0, 1]) {
+        const server = createVoteServer(initial);
+        const queue = createVoteQueue(server.send, { delay: 1 });
+        const vote = (d: VoteDirection) => d === 'up' ? queue.upvoteComment('c1') : queue.downvoteComment('c1');
+        const results = await Promise.all(burst.map(vote));
+        assertEqual(server.state(), replay(initial, burst));
+        assert(server.sent.length <= Math.min(burst.length, 3), `burst ${burst.join()} sent ${server.sent.join()}`);
+        assertEqual(results[0], results[results.length - 1]);
+        // The first batch taught the queue the vote, so a repeat needs one request at most
+        const before = server.sent.length;
+        await Promise.all(burst.map(vote));
+        assertEqual(server.state(), replay(initial, [...burst, ...burst]));
+        assert(server.sent.length - before <= 1, `repeat of ${burst.join()} sent ${server.sent.length - before}`);
+      }
+    }
+  });
+
+  test('bounds concurrency and flushes on demand', async () => {
+    let running = 0;
+    let peak = 0;
+    const queue = createVoteQueue(async () => {
+      running++;
+      peak = Math.max(peak, running);
+      await new Promise(resolve => setTimeout(resolve, 5));
+      running--;
+      return { success: true, message: '', action: 'upvoted' };
+    }, { delay: 60000, concurrency: 2 });
+    const votes = ['a', 'b', 'c', 'd', 'e'].map(id => queue.upvotePost(id));
+    assertEqual(queue.stats().queued, 5);
+    await queue.flush();
+    await Promise.all(votes);
+    assertEqual(peak, 2);
+    assertEqual(queue.stats().sent, 5);
+  });
+
+  test('client.votes sends through posts.upvote', async () => {
+    const server = new MockServer();
+    const baseUrl = await server.listen();
+    const client = new MoltbookClient({ baseUrl, votes: { delay: 5 } });
+    try {
+      assertEqual((await client.votes.upvotePost('p1')).action, 'upvoted');
+      const burst = await Promise.all([client.votes.upvotePost('p1'), client.votes.upvotePost('p1')]);
+      assertEqual(burst[1].action, 'unchanged');
+      assertEqual(server.getRequests().map(r => r.path).join(), '/posts/p1/upvote');
+    } finally {
+      await server.close();
+    }
+  });
+});
+
+describe('Outbox', () => {
+  const tempJournal = async (): Promise<string> => nodePath.join(await fs.mkdtemp(nodePath.join(os.tmpdir(), 'moltbook-outbox-')), 'outbox.jsonl');
+  const post = (title: string) => ({ kind: 'post' as const, data: { submolt: 'general', title } });
+
+  test('journals writes before sending and group-commits fsyncs', async () => {
+    const path = await tempJournal();
+    const journaledAtSend: number[] = [];
+    const outbox = await openOutbox(async write => {
+      journaledAtSend.push((await fs.readFile(path, 'utf8')).split('\n').filter(Boolean).length);
+      return { id: (write.data as { title: string }).title };
+    }, { path });
+    try {
+      const results = await Promise.all(Array.from({ length: 20 }, (_, i) => outbox.enqueue<{ id: string }>(post(`t${i}`))));
+      assertEqual(results[19].id, 't19');
+      assert(journaledAtSend.every(n => n > 0), 'a write was sent before it was journaled');
+      const stats = outbox.stats();
+      assertEqual(stats.delivered, 20);
+      assertEqual(stats.appends, 40);
+      assert(stats.fsyncs < stats.appends, `expected grouped fsyncs, saw ${stats.fsyncs} for ${stats.appends} appends`);
+      assertEqual(stats.pending, 0);
+    } finally {
+      await outbox.close();
+    }
+  });
+
+  test('replays unconfirmed writes after a restart', async () => {
+    const path = await tempJournal();
+    const first = await openOutbox(async () => { throw new NetworkError(); }, { path, retryDelay: 60000 });
+    const lost = [first.enqueue(post('a')), first.enqueue(post('b'))].map(p => p.catch((e: Error) => e));
+    while (first.stats().retries === 0) await new Promise(resolve => setTimeout(resolve, 1));
+    await first.close();
+    assert((await lost[0]) instanceof Error, 'closing should reject unconfirmed writes');
+
+    const delivered: OutboxEntry[] = [];
+    const second = await openOutbox(async write => write.data, { path, onDelivered: entry => delivered.push(entry) });
+    try {
+      await second.drain();
+      assertEqual(second.stats().replayed, 2);
+      assertEqual(delivered.map(e => (e.data as { title: string }).title).join(), 'a,b');
+    } finally {
+      await second.close();
+    }
+    const third = await openOutbox(async write => write.data, { path });
+    assertEqual(third.pending().length, 0);
+    await third.close();
+  });
+
+  test('drain waits for writes still being journaled', async () => {
+    const path = await tempJournal();
+    const sent: string[] = [];
+    const outbox = await openOutbox(async write => { sent.push((write.data as { title: string }).title); return {}; }, { path });
+    try {
+      const writes = [outbox.enqueue(post('a')), outbox.enqueue(post('b'))];
+      await outbox.drain();
+      assertEqual(sent.join(), 'a,b');
+      await Promise.all(writes);
+    } finally {
+      await outbox.close();
+    }
+  });
+
+  test('settles a write whose ack cannot be journaled instead of resending it', async () => {
+    const path = await tempJournal();
+    const probe = await fs.open(path + '.probe', 'w');
+    const proto = Object.getPrototypeOf(probe) as { write: (...args: unknown[]) => Promise<unknown> };
+    await probe.close();
+    const write = proto.write;
+    let diskFull = false;
+    proto.write = function (this: unknown, ...args: unknown[]) {
+      return diskFull ? Promise.reject(Object.assign(new Error('no space left on device'), { code: 'ENOSPC' })) : write.apply(this, args);
+    };
+    let sends = 0;
+    const failed: unknown[] = [];
+    const outbox = await openOutbox(async () => { sends++; diskFull = true; return {}; }, { path, retryDelay: 60000, onFailed: (_entry, error) => failed.push(error) });
+    try {
+      const error = await outbox.enqueue(post('a')).catch(e => e as NodeJS.ErrnoException);
+      diskFull = false;
+      assertEqual((error as NodeJS.ErrnoException).code, 'ENOSPC');
+      await outbox.drain();
+      await new Promise(resolve => setTimeout(resolve, 20));
+      assertEqual(sends, 1);
+      assertEqual(failed.length, 1);
+      assertEqual(outbox.stats().failed, 1);
+    } finally {
+      proto.write = write;
+      await outbox.close();
+    }
+  });
+
+  test('rejects permanent failures without replaying them', async () => {
+    const path = await tempJournal();
+    const outbox = await openOutbox(async () => { throw new ValidationError('Title required'); }, { path });
+    let error: unknown;
+    await outbox.enqueue(post('')).catch(e => { error = e; });
+    assert(error instanceof ValidationError, 'expected the validation error');
+    assertEqual(outbox.stats().failed, 1);
+    await outbox.close();
+    const reopened = await openOutbox(async () => ({}), { path });
+    assertEqual(reopened.stats().replayed, 0);
+    await reopened.close();
+  });
+
+  test('waits for the rate-limit reset before sending', async () => {
+    const path = await tempJournal();
+    const resetAt = new Date(Date.now() + 60);
+    const outbox = await openOutbox(async () => Date.now(), { path, rateLimit: () => ({ limit: 10, remaining: 0, resetAt }) });
+    try {
+      const sentAt = await outbox.enqueue<number>(post('paced'));
+      assert(sentAt >= resetAt.getTime() - 5, 'sent before the rate limit reset');
+    } finally {
+      await outbox.close();
+    }
+  });
+});
+
 describe('Resource Initialization', () => {
   test('client has agents resource', async () => {
     const client = new MoltbookClient();
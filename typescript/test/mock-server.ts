@@ -2,6 +2,9 @@
  * Mock server for testing Moltbook SDK
  */
 
+import * as http from 'node:http';
+import * as zlib from 'node:zlib';
+import type { AddressInfo } from 'node:net';
 import type { Agent, Post, Comment, Submolt, VoteResponse, SearchResults } from '../src/types';
 
 export interface MockResponse<T> {
@@ -15,6 +18,7 @@ export interface MockRequest {
   path: string;
   body?: unknown;
   headers?: Record<string, string>;
+  query?: Record<string, string>;
 }
 
 export type MockHandler = (request: MockRequest) => MockResponse<unknown> | Promise<MockResponse<unknown>>;
@@ -23,9 +27,13 @@ export class MockServer {
   private handlers: Map<string, MockHandler> = new Map();
   private requests: MockRequest[] = [];
   private defaultLatency = 0;
+  private server: http.Server | null = null;
+  private encoding: 'gzip' | 'br' | null;
 
-  constructor(options: { latency?: number } = {}) {
+  /** `encoding` compresses response bodies for clients that accept it and accepts encoded request bodies */
+  constructor(options: { latency?: number; encoding?: 'gzip' | 'br' } = {}) {
     this.defaultLatency = options.latency ?? 0;
+    this.encoding = options.encoding ?? null;
     this.setupDefaultHandlers();
   }
 
@@ -60,6 +68,11 @@ export class MockServer {
       body: { success: true, data: [this.mockPost(), this.mockPost(), this.mockPost()], pagination: { count: 3, limit: 25, offset: 0, hasMore: false } }
     }));
 
+    this.handle('GET /posts/:id', () => ({
+      status: 200,
+      body: { success: true, post: this.mockPost() }
+    }));
+
     this.handle('POST /posts', () => ({
       status: 201,
       body: { success: true, post: this.mockPost() }
@@ -153,6 +166,47 @@ export class MockServer {
     return patternParts.every((part, i) => part.startsWith(':') || part === keyParts[i]);
   }
 
+  /** Serve the handlers over a local HTTP socket, resolving with the base URL */
+  async listen(): Promise<string> {
+    this.server = http.createServer((req, res) => {
+      const chunks: Buffer[] = [];
+      req.on('data', chunk => chunks.push(chunk));
+      req.on('end', async () => {
+        const url = new URL(req.url || '/', 'http://localhost');
+        const received = Buffer.concat(chunks);
+        const requestEncoding = req.headers['content-encoding'];
+        const raw = (requestEncoding === 'gzip' ? zlib.gunzipSync(received) : requestEncoding === 'br' ? zlib.brotliDecompressSync(received) : received).toString();
+        const mock = await this.request({
+          method: req.method || 'GET',
+          path: url.pathname,
+          body: raw ? JSON.parse(raw) : undefined,
+          headers: req.headers as Record<string, string>,
+          query: Object.fromEntries(url.searchParams)
+        });
+        let payload: string | Buffer = mock.body === undefined ? '' : JSON.stringify(mock.body);
+        const headers: Record<string, string> = { 'Content-Type': 'application/json', ...mock.headers };
+        if (this.encoding) {
+          headers['Accept-Encoding'] = this.encoding;
+          if (String(req.headers['accept-encoding'] ?? '').includes(this.encoding)) {
+            payload = this.encoding === 'gzip' ? zlib.gzipSync(payload) : zlib.brotliCompressSync(payload);
+            headers['Content-Encoding'] = this.encoding;
+          }
+        }
+        res.writeHead(mock.status, headers);
+        res.end(mock.status === 304 || mock.status === 204 ? undefined : payload);
+      });
+    });
+    await new Promise<void>(resolve => this.server!.listen(0, '127.0.0.1', resolve));
+    return `http://127.0.0.1:${(this.server.address() as AddressInfo).port}`;
+  }
+
+  async close(): Promise<void> {
+    if (!this.server) return;
+    this.server.closeAllConnections();
+    await new Promise<void>(resolve => this.server!.close(() => resolve()));
+    this.server = null;
+  }
+
   getRequests(): MockRequest[] {
     return [...this.requests];
   }